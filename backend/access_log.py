@@ -0,0 +1,221 @@
+"""
+Structured, sampled access logging as a pure ASGI middleware.
+
+Each request produces at most one log record on the "doha_backend.access"
+logger with the method, route template, status, response size and latency.
+Records are handed to a QueueHandler so the request path never blocks on
+stdout; a QueueListener thread does the actual writing.
+
+Configuration (environment):
+    ACCESS_LOG_ENABLED      "0" disables the middleware entirely (default "1")
+    ACCESS_LOG_SAMPLE_RATE  fraction of ordinary requests logged (default 1.0)
+    ACCESS_LOG_SLOW_MS      requests at least this slow are always logged (default 1000)
+    ACCESS_LOG_FORMAT       "json" or "text" (default "json")
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from typing import Iterable, Optional
+from urllib.parse import parse_qsl, urlencode
+
+logger = logging.getLogger("doha_backend.access")
+
+REDACTED = "[REDACTED]"
+DEFAULT_REDACT = frozenset(
+    {"token", "access_token", "password", "secret", "key", "api_key", "code", "signature"}
+)
+LOGGED_HEADERS = ("origin", "user-agent", "referer")
+
+# Fields copied from a log record into the JSON document
+ACCESS_FIELDS = (
+    "method",
+    "path",
+    "route",
+    "query",
+    "status",
+    "duration_ms",
+    "bytes",
+    "client",
+    "origin",
+    "user_agent",
+    "referer",
+)
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a record as one JSON object per line, including access fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        doc = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in ACCESS_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                doc[field] = value
+        if record.exc_info:
+            doc["exc"] = self.formatException(record.exc_info)
+        return json.dumps(doc, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Single-line key=value rendering for local development."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        parts = [record.getMessage()]
+        for field in ACCESS_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                parts.append(f"{field}={value}")
+        return " ".join(parts)
+
+
+class _AccessQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that enqueues records as-is.
+
+    The stock prepare() formats and copies every record on the calling
+    thread; access records carry no args or exc_info, so formatting is left
+    entirely to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_access_log(fmt: Optional[str] = None, stream=None) -> None:
+    """
+    Route access records through a queue to a background writer thread.
+
+    Safe to call more than once; the existing listener is replaced.
+    """
+    global _listener
+    stop_access_log()
+
+    fmt = (fmt or os.getenv("ACCESS_LOG_FORMAT", "json")).lower()
+    target = logging.StreamHandler(stream or sys.stdout)
+    target.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    log_queue = queue.SimpleQueue()
+    for handler in list(logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            logger.removeHandler(handler)
+    logger.addHandler(_AccessQueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, target)
+    _listener.start()
+
+
+def stop_access_log() -> None:
+    """Flush pending records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def redact_query(query: str, redact: Iterable[str] = DEFAULT_REDACT) -> str:
+    """Replace values of sensitive query parameters with a placeholder."""
+    if not query:
+        return ""
+    pairs = parse_qsl(query, keep_blank_values=True)
+    return urlencode(
+        [(k, REDACTED if k.lower() in redact else v) for k, v in pairs], safe="[]"
+    )
+
+
+class AccessLogMiddleware:
+    """
+    Pure ASGI access logger.
+
+    Response messages are observed as they pass to `send`, never buffered,
+    so streaming responses are unaffected. Server errors and slow requests are always
+    logged; other requests are sampled at `sample_rate`.
+    """
+
+    def __init__(
+        self,
+        app,
+        sample_rate: Optional[float] = None,
+        slow_ms: Optional[float] = None,
+        redact: Iterable[str] = DEFAULT_REDACT,
+    ):
+        self.app = app
+        if sample_rate is None:
+            sample_rate = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+        if slow_ms is None:
+            slow_ms = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.redact = frozenset(k.lower() for k in redact)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        response = {"status": 500, "bytes": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if self._should_log(response["status"], duration_ms):
+                self._log(scope, response, duration_ms)
+
+    def _should_log(self, status: int, duration_ms: float) -> bool:
+        if status >= 500 or duration_ms >= self.slow_ms:
+            return True
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def _log(self, scope, response, duration_ms: float) -> None:
+        headers = {}
+        for name, value in scope.get("headers", ()):
+            name = name.decode("latin-1")
+            if name in LOGGED_HEADERS:
+                headers[name] = value.decode("latin-1")
+
+        route = scope.get("route")
+        query = scope.get("query_string", b"").decode("latin-1")
+        client = scope.get("client")
+        status = response["status"]
+        level = logging.ERROR if status >= 500 else logging.INFO
+        logger.log(
+            level,
+            "request",
+            extra={
+                "method": scope["method"],
+                "path": scope["path"],
+                # Route template (e.g. /api/schools/{school_id}) groups latency per endpoint
+                "route": getattr(route, "path", None),
+                "query": redact_query(query, self.redact) or None,
+                "status": status,
+                "duration_ms": round(duration_ms, 2),
+                "bytes": response["bytes"],
+                "client": client[0] if client else None,
+                "origin": headers.get("origin"),
+                "user_agent": headers.get("user-agent"),
+                "referer": headers.get("referer"),
+            },
+        )
@@ -1,4 +1,5 @@
 from logging.config import fileConfig
+import os
 import sys
 from pathlib import Path
 
@@ -14,7 +15,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 from db import Base  # noqa: E402
 from models import (
     School, User, StagingSchool, Post, Review, Favorite,
-    Teacher, TeacherAvailability, TeacherReview, Booking, Message, TeacherSubject
+    Teacher, TeacherAvailability, TeacherReview, Booking, Message, TeacherSubject,
+    WebsiteCheck, Job, TeacherPayout,
 )  # noqa: F401, E402
 
 # this is the Alembic Config object, which provides
@@ -30,10 +32,10 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
-# other values from the config, defined by the needs of env.py,
-# can be acquired:
-# my_important_option = config.get_main_option("my_important_option")
-# ... etc.
+# The app's DATABASE_URL wins over alembic.ini so `alembic upgrade head`
+# migrates the same database the app serves from.
+if os.getenv("DATABASE_URL"):
+    config.set_main_option("sqlalchemy.url", os.environ["DATABASE_URL"].replace("%", "%%"))
 
 
 def run_migrations_offline() -> None:
@@ -67,6 +69,14 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # migrations.bootstrap() passes its own connection
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -0,0 +1,68 @@
+"""Add payout runs and booking payout linkage
+
+Revision ID: 2b6e9a4c8d31
+Revises: f4a8d2c61e09
+Create Date: 2026-10-19 21:04:37.918264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b6e9a4c8d31'
+down_revision: Union[str, Sequence[str], None] = 'f4a8d2c61e09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('payout_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('through_date', sa.Date(), nullable=True),
+    sa.Column('payout_count', sa.Integer(), nullable=True),
+    sa.Column('booking_count', sa.Integer(), nullable=True),
+    sa.Column('total_amount', sa.Float(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_payout_runs_id'), 'payout_runs', ['id'], unique=False)
+
+    op.add_column('teacher_payouts', sa.Column('run_id', sa.Integer(), nullable=True))
+    op.add_column('teacher_payouts', sa.Column('booking_count', sa.Integer(), nullable=True))
+    op.add_column('teacher_payouts', sa.Column('idempotency_key', sa.String(length=255), nullable=True))
+    op.add_column('teacher_payouts', sa.Column('error', sa.Text(), nullable=True))
+    op.create_index(op.f('ix_teacher_payouts_run_id'), 'teacher_payouts', ['run_id'], unique=False)
+    op.create_index(
+        op.f('ix_teacher_payouts_idempotency_key'), 'teacher_payouts', ['idempotency_key'], unique=True
+    )
+
+    op.add_column('bookings', sa.Column('payout_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_bookings_payout_id'), 'bookings', ['payout_id'], unique=False)
+    op.create_index(
+        'idx_booking_payout_eligible',
+        'bookings',
+        ['status', 'payment_status', 'payout_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_booking_payout_eligible', table_name='bookings')
+    op.drop_index(op.f('ix_bookings_payout_id'), table_name='bookings')
+    op.drop_column('bookings', 'payout_id')
+    op.drop_index(op.f('ix_teacher_payouts_idempotency_key'), table_name='teacher_payouts')
+    op.drop_index(op.f('ix_teacher_payouts_run_id'), table_name='teacher_payouts')
+    op.drop_column('teacher_payouts', 'error')
+    op.drop_column('teacher_payouts', 'idempotency_key')
+    op.drop_column('teacher_payouts', 'booking_count')
+    op.drop_column('teacher_payouts', 'run_id')
+    op.drop_index(op.f('ix_payout_runs_id'), table_name='payout_runs')
+    op.drop_table('payout_runs')
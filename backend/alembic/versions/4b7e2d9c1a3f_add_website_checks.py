@@ -0,0 +1,45 @@
+"""Add website_checks table
+
+Revision ID: 4b7e2d9c1a3f
+Revises: 972641930c9c
+Create Date: 2026-10-19 09:12:40.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2d9c1a3f'
+down_revision: Union[str, Sequence[str], None] = '972641930c9c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('website_checks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('school_id', sa.Integer(), nullable=False),
+    sa.Column('url', sa.String(length=300), nullable=True),
+    sa.Column('checked_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=True),
+    sa.Column('final_url', sa.String(length=500), nullable=True),
+    sa.Column('etag', sa.String(length=255), nullable=True),
+    sa.Column('is_reachable', sa.Boolean(), nullable=True),
+    sa.Column('error', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_website_checks_id'), 'website_checks', ['id'], unique=False)
+    op.create_index(op.f('ix_website_checks_school_id'), 'website_checks', ['school_id'], unique=True)
+    op.create_index(op.f('ix_website_checks_checked_at'), 'website_checks', ['checked_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_website_checks_checked_at'), table_name='website_checks')
+    op.drop_index(op.f('ix_website_checks_school_id'), table_name='website_checks')
+    op.drop_index(op.f('ix_website_checks_id'), table_name='website_checks')
+    op.drop_table('website_checks')
@@ -0,0 +1,53 @@
+"""Add teacher payouts and Stripe connected accounts
+
+Revision ID: 5e2b7c9d4a18
+Revises: 8d3f61a2c5e7
+Create Date: 2026-10-19 15:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b7c9d4a18'
+down_revision: Union[str, Sequence[str], None] = '8d3f61a2c5e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases from before migrations ran on deploy got both from the
+    # create_all workers used to run on boot
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('teacher_payouts'):
+        _create_teacher_payouts()
+    if 'stripe_account_id' not in {c['name'] for c in inspector.get_columns('teachers')}:
+        op.add_column('teachers', sa.Column('stripe_account_id', sa.String(length=255), nullable=True))
+
+
+def _create_teacher_payouts() -> None:
+    op.create_table('teacher_payouts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('teacher_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=True),
+    sa.Column('status', sa.String(length=30), nullable=True),
+    sa.Column('stripe_transfer_id', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_teacher_payouts_id'), 'teacher_payouts', ['id'], unique=False)
+    op.create_index(op.f('ix_teacher_payouts_teacher_id'), 'teacher_payouts', ['teacher_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('teachers', 'stripe_account_id')
+    op.drop_index(op.f('ix_teacher_payouts_teacher_id'), table_name='teacher_payouts')
+    op.drop_index(op.f('ix_teacher_payouts_id'), table_name='teacher_payouts')
+    op.drop_table('teacher_payouts')
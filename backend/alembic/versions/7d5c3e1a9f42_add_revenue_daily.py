@@ -0,0 +1,91 @@
+"""Add revenue_daily booking summary
+
+Revision ID: 7d5c3e1a9f42
+Revises: 2b6e9a4c8d31
+Create Date: 2026-10-19 22:41:08.530117
+
+"""
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d5c3e1a9f42'
+down_revision: Union[str, Sequence[str], None] = '2b6e9a4c8d31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    revenue_daily = op.create_table('revenue_daily',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('week_start', sa.Date(), nullable=False),
+    sa.Column('month_start', sa.Date(), nullable=False),
+    sa.Column('teacher_id', sa.Integer(), nullable=False),
+    sa.Column('subject', sa.String(length=100), nullable=False),
+    sa.Column('session_type', sa.String(length=20), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=False),
+    sa.Column('status', sa.String(length=30), nullable=False),
+    sa.Column('payment_status', sa.String(length=20), nullable=False),
+    sa.Column('booking_count', sa.Integer(), nullable=True),
+    sa.Column('hours', sa.Float(), nullable=True),
+    sa.Column('gross_amount', sa.Float(), nullable=True),
+    sa.Column('commission_amount', sa.Float(), nullable=True),
+    sa.Column('teacher_amount', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('teacher_id', 'day', 'subject', 'session_type', 'currency', 'status',
+                        'payment_status', name='uq_revenue_daily_bucket')
+    )
+    op.create_index('idx_revenue_daily_day', 'revenue_daily', ['day'], unique=False)
+    op.create_index(op.f('ix_revenue_daily_id'), 'revenue_daily', ['id'], unique=False)
+
+    # Backfill from existing bookings; week and month starts are computed
+    # here rather than with dialect-specific date functions
+    groups = op.get_bind().execute(sa.text(
+        """
+        SELECT scheduled_date, teacher_id, subject, session_type,
+               coalesce(currency, 'QAR'), coalesce(status, 'pending'),
+               coalesce(payment_status, 'pending'), count(id),
+               coalesce(sum(duration_hours), 0.0), sum(total_amount),
+               sum(commission_amount), sum(teacher_amount)
+        FROM bookings
+        GROUP BY scheduled_date, teacher_id, subject, session_type,
+                 coalesce(currency, 'QAR'), coalesce(status, 'pending'),
+                 coalesce(payment_status, 'pending')
+        """
+    ).columns(sa.column('scheduled_date', sa.Date()))).all()
+    rows = []
+    for day, teacher_id, subject, session_type, currency, status, payment_status, count, \
+            hours, gross, commission, teacher_amount in groups:
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        rows.append({
+            'day': day,
+            'week_start': day - timedelta(days=day.weekday()),
+            'month_start': day.replace(day=1),
+            'teacher_id': teacher_id,
+            'subject': subject,
+            'session_type': session_type,
+            'currency': currency,
+            'status': status,
+            'payment_status': payment_status,
+            'booking_count': count,
+            'hours': hours,
+            'gross_amount': gross or 0.0,
+            'commission_amount': commission or 0.0,
+            'teacher_amount': teacher_amount or 0.0,
+        })
+    if rows:
+        op.bulk_insert(revenue_daily, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_revenue_daily_id'), table_name='revenue_daily')
+    op.drop_index('idx_revenue_daily_day', table_name='revenue_daily')
+    op.drop_table('revenue_daily')
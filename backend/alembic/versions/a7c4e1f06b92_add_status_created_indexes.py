@@ -0,0 +1,29 @@
+"""Add (status, created_at) indexes on posts and reviews
+
+Revision ID: a7c4e1f06b92
+Revises: 5e2b7c9d4a18
+Create Date: 2026-10-19 17:03:26.441905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c4e1f06b92'
+down_revision: Union[str, Sequence[str], None] = '5e2b7c9d4a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_post_status_created', 'posts', ['status', 'created_at'], unique=False)
+    op.create_index('idx_review_status_created', 'reviews', ['status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_review_status_created', table_name='reviews')
+    op.drop_index('idx_post_status_created', table_name='posts')
@@ -0,0 +1,44 @@
+"""Add maintained rating stats to schools
+
+Revision ID: c3d9f2a7e5b1
+Revises: a7c4e1f06b92
+Create Date: 2026-10-19 18:20:51.307442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d9f2a7e5b1'
+down_revision: Union[str, Sequence[str], None] = 'a7c4e1f06b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('schools', sa.Column('average_rating', sa.Float(), nullable=True))
+    op.add_column('schools', sa.Column('total_reviews', sa.Integer(), nullable=True))
+    # Backfill from the reviews already approved
+    op.execute(
+        """
+        UPDATE schools SET
+            total_reviews = (
+                SELECT count(reviews.id) FROM reviews
+                WHERE reviews.school_id = schools.id AND reviews.status = 'approved'
+            ),
+            average_rating = (
+                SELECT coalesce(avg(reviews.rating), 0.0) FROM reviews
+                WHERE reviews.school_id = schools.id AND reviews.status = 'approved'
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('schools', 'total_reviews')
+    op.drop_column('schools', 'average_rating')
@@ -0,0 +1,52 @@
+"""Add school review feed index and rating histogram
+
+Revision ID: e81b4c6d0f37
+Revises: c3d9f2a7e5b1
+Create Date: 2026-10-19 19:02:13.584120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e81b4c6d0f37'
+down_revision: Union[str, Sequence[str], None] = 'c3d9f2a7e5b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'idx_review_school_status_created',
+        'reviews',
+        ['school_id', 'status', 'created_at'],
+        unique=False,
+    )
+    op.add_column('schools', sa.Column('rating_counts', sa.JSON(), nullable=True))
+
+    # Backfill the histogram from the reviews already approved
+    schools = sa.table('schools', sa.column('id'), sa.column('rating_counts', sa.JSON()))
+    bind = op.get_bind()
+    counts = {}
+    for school_id, rating, n in bind.execute(
+        sa.text(
+            "SELECT school_id, rating, count(id) FROM reviews "
+            "WHERE status = 'approved' GROUP BY school_id, rating"
+        )
+    ):
+        if 1 <= rating <= 5:
+            counts.setdefault(school_id, [0] * 5)[rating - 1] = n
+    for school_id, histogram in counts.items():
+        bind.execute(
+            schools.update().where(schools.c.id == school_id).values(rating_counts=histogram)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('schools', 'rating_counts')
+    op.drop_index('idx_review_school_status_created', table_name='reviews')
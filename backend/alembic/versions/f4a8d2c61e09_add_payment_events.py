@@ -0,0 +1,54 @@
+"""Add payment_events ledger
+
+Revision ID: f4a8d2c61e09
+Revises: e81b4c6d0f37
+Create Date: 2026-10-19 20:11:46.302517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a8d2c61e09'
+down_revision: Union[str, Sequence[str], None] = 'e81b4c6d0f37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('payment_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('stripe_event_id', sa.String(length=255), nullable=False),
+    sa.Column('event_type', sa.String(length=100), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('booking_id', sa.Integer(), nullable=True),
+    sa.Column('stripe_created', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('stripe_event_id')
+    )
+    op.create_index(
+        'idx_payment_event_status_created',
+        'payment_events',
+        ['status', 'stripe_created', 'id'],
+        unique=False,
+    )
+    op.create_index(op.f('ix_payment_events_booking_id'), 'payment_events', ['booking_id'], unique=False)
+    op.create_index(op.f('ix_payment_events_id'), 'payment_events', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_payment_events_id'), table_name='payment_events')
+    op.drop_index(op.f('ix_payment_events_booking_id'), table_name='payment_events')
+    op.drop_index('idx_payment_event_status_created', table_name='payment_events')
+    op.drop_table('payment_events')
@@ -0,0 +1,130 @@
+"""
+Admin diagnostics endpoints.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import List
+
+import profiler
+import schemas
+import sql_profile
+from startup import REPORT as STARTUP_REPORT
+from models import User
+from auth import get_current_admin_user
+
+router = APIRouter()
+
+
+@router.get("/sql/queries", response_model=List[dict])
+def list_query_stats(
+    limit: int = Query(20, ge=1, le=200),
+    order_by: str = Query("total_ms", pattern="^(total_ms|avg_ms|max_ms|count|rows)$"),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Aggregated SQL statement stats for this worker, grouped by fingerprint (admin only).
+
+    Args:
+        limit: Number of query shapes to return
+        order_by: total_ms, avg_ms, max_ms, count or rows
+
+    Returns:
+        Query shapes with call count, total/avg/max time and affected rows
+
+    Requires:
+        Admin authentication
+    """
+    return sql_profile.top_queries(limit=limit, order_by=order_by)
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+def profile_worker(
+    seconds: float = Query(10, gt=0, le=profiler.MAX_SECONDS),
+    interval: float = Query(profiler.DEFAULT_INTERVAL, ge=0.001, le=0.1),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Sample every thread of this worker for `seconds` (admin only).
+
+    Only the worker that serves this request is profiled. The result is a
+    collapsed-stack file; render it with flamegraph.pl or load it in speedscope.
+
+    Args:
+        seconds: Sampling duration (max 60)
+        interval: Seconds between samples
+
+    Returns:
+        Collapsed stacks, one "frame;frame;... count" line per distinct stack
+
+    Raises:
+        409: A profile is already running in this worker
+
+    Requires:
+        Admin authentication
+    """
+    try:
+        sampler = profiler.profile_for(seconds, interval)
+    except profiler.ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return PlainTextResponse(
+        sampler.collapsed(),
+        headers={
+            "Content-Disposition": 'attachment; filename="profile.collapsed"',
+            "X-Profile-Samples": str(sampler.samples),
+        },
+    )
+
+
+@router.get("/profile/requests", response_model=List[dict])
+def list_request_profiles(current_user: User = Depends(get_current_admin_user)):
+    """
+    Slowest sampled requests in this worker, with collapsed stacks (admin only).
+
+    Requests are sampled according to the settings in /profile/sampling.
+
+    Requires:
+        Admin authentication
+    """
+    return profiler.worst_requests()
+
+
+@router.get("/profile/sampling", response_model=schemas.ProfileSampling)
+def get_request_sampling(current_user: User = Depends(get_current_admin_user)):
+    """Current per-request sampling settings of this worker (admin only)."""
+    return profiler.SAMPLING.as_dict()
+
+
+@router.put("/profile/sampling", response_model=schemas.ProfileSampling)
+def update_request_sampling(
+    settings: schemas.ProfileSampling,
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Change per-request sampling for this worker (admin only).
+
+    Set path_prefix (e.g. /api/schools) to start profiling 1 in `every`
+    matching requests, or null to stop. Stored profiles are reset.
+
+    Requires:
+        Admin authentication
+    """
+    for field, value in settings.model_dump().items():
+        setattr(profiler.SAMPLING, field, value)
+    profiler.clear_request_profiles()
+    return profiler.SAMPLING.as_dict()
+
+
+@router.get("/startup", response_model=dict)
+def startup_report(current_user: User = Depends(get_current_admin_user)):
+    """
+    Startup-time report of this worker (admin only).
+
+    Returns:
+        Milliseconds spent on import, app construction, startup hooks and
+        the first request, and which request that was
+
+    Requires:
+        Admin authentication
+    """
+    return STARTUP_REPORT.as_dict()
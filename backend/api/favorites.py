@@ -36,12 +36,37 @@ def remove_favorite(
     return None
 
 
-@router.get("/", response_model=List[schemas.FavoriteOut])
+@router.get("/", response_model=List[schemas.FavoriteWithSchool])
 def get_my_favorites(
     current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
 ):
-    """Get current user's favorite schools."""
-    return crud.get_user_favorites(db, current_user.id)
+    """Get current user's favorite schools, newest first, with a summary of each school."""
+    return [
+        schemas.FavoriteWithSchool(
+            **schemas.FavoriteOut.model_validate(favorite).model_dump(),
+            school=schemas.SchoolSummary.model_validate(school) if school else None,
+        )
+        for favorite, school in crud.get_user_favorites(db, current_user.id)
+    ]
+
+
+@router.post("/check", response_model=schemas.FavoriteCheckResult)
+def check_favorites(
+    check: schemas.FavoriteCheck,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Check which of up to 200 schools the current user has favorited.
+
+    Answers a whole listing page in one request and one query instead of
+    a GET /check/{school_id} per school card.
+
+    Returns:
+        The favorited school IDs among those given, sorted
+    """
+    favorited = crud.favorited_school_ids(db, current_user.id, check.school_ids)
+    return {"favorited": sorted(favorited)}
 
 
 @router.get("/check/{school_id}", response_model=dict)
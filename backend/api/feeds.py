@@ -0,0 +1,111 @@
+"""
+Sitemap and blog feed, rendered by the backend and cached in page_cache.
+
+Absolute URLs are built from SITE_URL (the public frontend address, e.g.
+https://dohaeducationhub.com). The sitemap protocol only allows absolute
+locations, so without SITE_URL the sitemap is not served and the frontend
+renders its own; feed links are then site-relative.
+"""
+
+import os
+from email.utils import format_datetime
+from typing import Optional
+from xml.sax.saxutils import escape
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.orm import Session
+
+import crud
+import page_cache
+from db import get_db
+
+router = APIRouter()
+
+FEED_SIZE = 20
+STATIC_PAGES = ("/", "/schools", "/blog")
+
+
+def site_url() -> str:
+    return os.getenv("SITE_URL", "").rstrip("/")
+
+
+def _lastmod(value) -> Optional[str]:
+    return value.date().isoformat() if value else None
+
+
+def render_sitemap(db: Session) -> bytes:
+    base = site_url()
+    schools, posts = crud.list_sitemap_entries(db)
+    urls = [(path, None) for path in STATIC_PAGES]
+    urls += [(f"/schools/{school_id}", _lastmod(changed)) for school_id, changed in schools]
+    urls += [(f"/blog/{slug}", _lastmod(changed)) for slug, changed in posts]
+
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for path, lastmod in urls:
+        entry = f"  <url><loc>{escape(base + path)}</loc>"
+        if lastmod:
+            entry += f"<lastmod>{lastmod}</lastmod>"
+        lines.append(entry + "</url>")
+    lines.append("</urlset>")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def render_feed(db: Session) -> bytes:
+    base = site_url()
+    _, posts = crud.list_posts(db, 0, FEED_SIZE, status="published")
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0">',
+        "<channel>",
+        "  <title>Doha Education Hub Blog</title>",
+        f"  <link>{escape(base + '/blog')}</link>",
+        "  <description>News and guides about schools in Doha</description>",
+    ]
+    for post in posts:
+        link = escape(f"{base}/blog/{post.slug}")
+        lines += [
+            "  <item>",
+            f"    <title>{escape(post.title)}</title>",
+            f"    <link>{link}</link>",
+            f'    <guid isPermaLink="false">post-{post.id}</guid>',
+        ]
+        if post.excerpt:
+            lines.append(f"    <description>{escape(post.excerpt)}</description>")
+        published = post.published_at or post.created_at
+        if published:
+            lines.append(f"    <pubDate>{format_datetime(published)}</pubDate>")
+        lines.append("  </item>")
+    lines += ["</channel>", "</rss>"]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _cached(key: str, render, media_type: str) -> Response:
+    body = page_cache.CACHE.get_or_render(key, render)
+    max_age = int(page_cache.CACHE.ttl)
+    return Response(
+        body, media_type=media_type, headers={"Cache-Control": f"public, max-age={max_age}"}
+    )
+
+
+@router.get("/sitemap.xml", response_class=Response)
+def sitemap(db: Session = Depends(get_db)):
+    """
+    Sitemap of the static pages, published schools and published posts (public).
+
+    Raises:
+        404: SITE_URL is not set, so locations could not be absolute
+    """
+    if not site_url():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Sitemap requires SITE_URL"
+        )
+    return _cached(page_cache.SITEMAP, lambda: render_sitemap(db), "application/xml")
+
+
+@router.get("/feed.xml", response_class=Response)
+def feed(db: Session = Depends(get_db)):
+    """RSS 2.0 feed of the latest published posts (public)."""
+    return _cached(page_cache.FEED, lambda: render_feed(db), "application/rss+xml")
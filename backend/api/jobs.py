@@ -0,0 +1,100 @@
+"""
+Admin API for queueing and monitoring background jobs.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+import crud
+import jobs
+import schemas
+from db import get_db
+from models import User
+from auth import get_current_admin_user
+
+router = APIRouter()
+
+
+@router.get("/types", response_model=List[str])
+def list_job_types(current_user: User = Depends(get_current_admin_user)):
+    """List registered job types (admin only)."""
+    return sorted(jobs.JOB_TYPES)
+
+
+@router.post("/", response_model=schemas.JobOut, status_code=status.HTTP_202_ACCEPTED)
+def create_job(
+    job_in: schemas.JobCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Queue a background job (admin only).
+
+    A worker process picks the job up; poll GET /api/admin/jobs/{id} for
+    progress. Repeating a request with the same idempotency_key returns the
+    existing job with status 200 instead of queueing another one.
+
+    Raises:
+        400: Unknown job type or params that don't fit it
+    """
+    try:
+        jobs.validate_job(job_in.job_type, job_in.params)
+    except jobs.InvalidJob as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    job, created = crud.create_job(
+        db,
+        job_in.job_type,
+        params=job_in.params,
+        idempotency_key=job_in.idempotency_key,
+        created_by=current_user.id,
+    )
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return job
+
+
+@router.get("/", response_model=List[schemas.JobOut])
+def list_jobs(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    job_type: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """List jobs, newest first (admin only)."""
+    return crud.list_jobs(db, status=status_filter, job_type=job_type, skip=skip, limit=limit)
+
+
+@router.get("/{job_id}", response_model=schemas.JobOut)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """Get a job with its progress and result (admin only)."""
+    job = crud.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=schemas.JobOut)
+def cancel_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Cancel a job (admin only).
+
+    Queued jobs are cancelled at once; running jobs stop at their next
+    progress report.
+    """
+    job = crud.cancel_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
@@ -0,0 +1,32 @@
+"""
+Prometheus scrape endpoint.
+"""
+
+import hmac
+import os
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+
+import metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def scrape_metrics(authorization: Optional[str] = Header(None)):
+    """
+    Current metrics in Prometheus text format.
+
+    When METRICS_TOKEN is set, scrapers must send it as a bearer token.
+
+    Raises:
+        401: METRICS_TOKEN is set and the request does not carry it
+    """
+    token = os.getenv("METRICS_TOKEN")
+    if token and not hmac.compare_digest(authorization or "", f"Bearer {token}"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token"
+        )
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
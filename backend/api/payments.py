@@ -2,26 +2,68 @@
 Payment processing API endpoints using Stripe.
 """
 
+import json
+import math
 import os
-try:
-    import stripe
-except Exception:
-    stripe = None
+from contextlib import contextmanager
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 from typing import Dict, Any
 
 import crud
+import payment_events
+import payment_gateway
+import payouts
+import revenue
 from db import get_db
-from models import User, Booking
+from models import User, Booking, TeacherPayout
 from auth import get_current_user
 
 router = APIRouter()
 
-# Initialize Stripe with secret key if library is available
-if stripe is not None:
-    stripe.api_key = os.getenv('STRIPE_SECRET_KEY', 'sk_test_...')
+# The Stripe SDK costs ~70 ms to import, so it is loaded on the first
+# webhook rather than on every worker boot (see _stripe()). API calls to
+# Stripe go through payment_gateway, which loads it the same way.
+stripe = None
+_stripe_loaded = False
+
+
+def _stripe():
+    """Return the Stripe SDK, imported and keyed on first use, or None if not installed."""
+    global stripe, _stripe_loaded
+    if stripe is None and not _stripe_loaded:
+        _stripe_loaded = True
+        try:
+            import stripe as sdk
+        except Exception:
+            sdk = None
+        # Initialize Stripe with secret key if library is available
+        if sdk is not None:
+            sdk.api_key = os.getenv('STRIPE_SECRET_KEY', 'sk_test_...')
+        stripe = sdk
+    return stripe
+
+
+@contextmanager
+def _gateway_errors(action: str):
+    """Turn gateway errors into HTTP errors: 503 while the provider is unavailable."""
+    try:
+        yield
+    except payment_gateway.GatewayNotConfigured as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    except payment_gateway.GatewayUnavailable as e:
+        headers = {"Retry-After": str(math.ceil(e.retry_after))} if e.retry_after else None
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Payment provider unavailable, please retry shortly",
+            headers=headers,
+        )
+    except payment_gateway.GatewayError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"{action}: {str(e)}"
+        )
+
 
 @router.post("/create-payment-intent")
 def create_payment_intent(
@@ -54,38 +96,36 @@ def create_payment_intent(
             detail="Payment already completed"
         )
 
-    if stripe is None:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Stripe library not configured on server")
-
-    try:
-        # Create PaymentIntent
-        intent = stripe.PaymentIntent.create(
-            amount=int(booking.total_amount * 100),  # Convert to cents
-            currency=booking.currency.lower(),
-            metadata={
-                'booking_id': booking_id,
-                'teacher_id': booking.teacher_id,
-                'parent_id': booking.parent_id,
-            },
-            description=f"Booking with {booking.teacher.full_name} - {booking.subject}",
-            automatic_payment_methods={
-                'enabled': True,
-            },
-        )
-
-        return {
-            'clientSecret': intent.client_secret,
-            'paymentIntentId': intent.id,
-            'amount': booking.total_amount,
-            'currency': booking.currency,
-        }
-
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Payment creation failed: {str(e)}"
+    teacher = crud.get_teacher_by_id(db, booking.teacher_id)
+    teacher_name = teacher.full_name if teacher else "teacher"
+    amount = int(round(booking.total_amount * 100))  # Convert to cents
+    currency = booking.currency.lower()
+    total_amount, booking_currency = booking.total_amount, booking.currency
+    description = f"Booking with {teacher_name} - {booking.subject}"
+    metadata = {
+        'booking_id': booking_id,
+        'teacher_id': booking.teacher_id,
+        'parent_id': booking.parent_id,
+    }
+    # Don't hold a pooled DB connection while waiting on the payment provider
+    db.close()
+
+    with _gateway_errors("Payment creation failed"):
+        intent = payment_gateway.get_gateway().create_intent(
+            amount,
+            currency,
+            metadata,
+            description,
+            idempotency_key=payment_gateway.booking_intent_key(booking_id, amount, currency),
         )
 
+    return {
+        'clientSecret': intent.client_secret,
+        'paymentIntentId': intent.id,
+        'amount': total_amount,
+        'currency': booking_currency,
+    }
+
 
 @router.post("/confirm-payment/{payment_intent_id}")
 def confirm_payment(
@@ -96,34 +136,36 @@ def confirm_payment(
     """
     Confirm payment completion and update booking status.
     """
-    try:
-        # Retrieve the PaymentIntent
-        intent = stripe.PaymentIntent.retrieve(payment_intent_id)
-
-        # Extract booking ID from metadata
-        booking_id = intent.metadata.get('booking_id')
-        if not booking_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid payment intent"
-            )
-
-        # Get and update the booking
-        booking = crud.get_booking_by_id(db, int(booking_id))
-        if not booking:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Booking not found"
-            )
-
-        # Verify user owns this booking
-        if booking.parent_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Unauthorized"
-            )
-
-        # Update booking status based on payment status
+    db.close()  # release the connection taken by authentication while Stripe answers
+    with _gateway_errors("Payment confirmation failed"):
+        intent = payment_gateway.get_gateway().retrieve_intent(payment_intent_id)
+
+    # Extract booking ID from metadata
+    booking_id = intent.metadata.get('booking_id')
+    if not booking_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid payment intent"
+        )
+
+    # Get and update the booking
+    booking = crud.get_booking_by_id(db, int(booking_id))
+    if not booking:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Booking not found"
+        )
+
+    # Verify user owns this booking
+    if booking.parent_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Unauthorized"
+        )
+
+    # Update booking status based on payment status; as with webhook events,
+    # a settled payment is never moved back
+    if booking.payment_status not in payment_events.SETTLED:
         if intent.status == 'succeeded':
             booking.payment_status = 'paid'
             booking.status = 'confirmed'
@@ -132,19 +174,14 @@ def confirm_payment(
         elif intent.status == 'requires_payment_method':
             booking.payment_status = 'failed'
 
+        revenue.refresh(db, [(booking.teacher_id, booking.scheduled_date)])
         db.commit()
 
-        return {
-            'status': intent.status,
-            'booking_status': booking.status,
-            'payment_status': booking.payment_status,
-        }
-
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Payment confirmation failed: {str(e)}"
-        )
+    return {
+        'status': intent.status,
+        'booking_status': booking.status,
+        'payment_status': booking.payment_status,
+    }
 
 
 @router.post("/payout/{booking_id}")
@@ -175,80 +212,90 @@ def create_payout(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Booking must be completed and paid before payout"
         )
+    if booking.payout_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Booking has already been paid out"
+        )
+    teacher = crud.get_teacher_by_id(db, booking.teacher_id)
+    if not teacher or not teacher.stripe_account_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Teacher does not have a connected Stripe account"
+        )
 
-    try:
-        # In a real implementation, you'd need the teacher's Stripe account ID
-        # For now, we'll simulate the payout
-        # payout = stripe.Payout.create(
-        #     amount=int(booking.teacher_amount * 100),
-        #     currency=booking.currency.lower(),
-        #     destination=teacher.stripe_account_id,
-        # )
-
-        # Mark payout as completed
-        booking.payout_status = 'completed'
+    # A payout run of one booking, so it is linked and never paid twice;
+    # weekly payouts go through POST /api/admin/payouts/runs instead
+    run = payouts.create_run(db, booking_ids=[booking_id], created_by=current_user.id)
+    if not run.payout_count:
+        # Claimed by a concurrent run since the checks above; keep no empty run
+        db.delete(run)
         db.commit()
-
-        return {
-            'status': 'success',
-            'message': f'Payout of {booking.teacher_amount} {booking.currency} processed to teacher',
-            'amount': booking.teacher_amount,
-            'currency': booking.currency,
-        }
-
-    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Booking is already part of another payout"
+        )
+    payouts.submit_run(db, run.id)
+    payout = db.query(TeacherPayout).filter(TeacherPayout.run_id == run.id).one()
+    if payout.status != 'paid':
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Payout failed: {str(e)}"
+            detail=f"Payout failed: {payout.error}"
         )
 
+    return {
+        'status': 'success',
+        'message': f'Payout of {payout.amount} {payout.currency} processed to teacher',
+        'amount': payout.amount,
+        'currency': payout.currency,
+        'payout_id': payout.id,
+    }
 
-from fastapi import Request, Header, Depends
+
+from fastapi import BackgroundTasks, Request, Header, Depends
 
 # Webhook endpoint for Stripe events with optional signature verification
 @router.post("/webhook")
-async def stripe_webhook(request: Request, stripe_signature: str = Header(None), db: Session = Depends(get_db)):
+async def stripe_webhook(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    stripe_signature: str = Header(None),
+    db: Session = Depends(get_db),
+):
     """
-    Handle Stripe webhook events. If `STRIPE_WEBHOOK_SECRET` is set, verify signature; otherwise accept
-    and attempt to parse the payload (useful for local testing).
+    Record a Stripe webhook event and acknowledge it.
+
+    If `STRIPE_WEBHOOK_SECRET` is set, verify the signature; otherwise accept
+    and parse the payload (useful for local testing). The event is stored in
+    the payment_events ledger and applied to its booking after the response
+    is sent, so Stripe gets its 200 without waiting on booking updates, and a
+    redelivered event (same id) is acknowledged without being applied again.
     """
     payload = await request.body()
     endpoint_secret = os.getenv('STRIPE_WEBHOOK_SECRET')
 
     try:
-        if endpoint_secret and stripe_signature and stripe is not None:
-            # Validate signature
-            event = stripe.Webhook.construct_event(payload, stripe_signature, endpoint_secret)
-        else:
-            # Fallback: parse payload without verification (not recommended for production)
-            import json
-            event = json.loads(payload)
-
-        evt_type = event.get('type')
-        data = event.get('data', {}).get('object', {})
-
-        # Handle relevant PaymentIntent events
-        if evt_type == 'payment_intent.succeeded':
-            booking_id = data.get('metadata', {}).get('booking_id')
-            if booking_id:
-                booking = crud.get_booking_by_id(db, int(booking_id))
-                if booking:
-                    booking.payment_status = 'paid'
-                    booking.status = 'confirmed'
-                    db.commit()
-        elif evt_type == 'payment_intent.payment_failed':
-            booking_id = data.get('metadata', {}).get('booking_id')
-            if booking_id:
-                booking = crud.get_booking_by_id(db, int(booking_id))
-                if booking:
-                    booking.payment_status = 'failed'
-                    db.commit()
-
-        return {"status": "received"}
-
+        stripe = _stripe() if endpoint_secret and stripe_signature else None
+        if stripe is not None:
+            # Validate signature; the verified body is stored as sent
+            stripe.Webhook.construct_event(payload, stripe_signature, endpoint_secret)
+        # Without a secret the payload is not verified (not recommended for production)
+        event = json.loads(payload)
+        if not isinstance(event, dict):
+            raise ValueError("Event payload must be a JSON object")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Webhook processing failed: {str(e)}"
         )
 
+    row, created = payment_events.record_event(db, event)
+    if created or row.status == "pending":
+        background_tasks.add_task(
+            payment_events.process_pending, sessionmaker(bind=db.get_bind(), autoflush=False)
+        )
+    return {
+        "status": "received",
+        "event_id": payment_events.event_id(event),
+        "duplicate": not created,
+    }
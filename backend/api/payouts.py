@@ -0,0 +1,96 @@
+"""
+Admin API for batched teacher payout runs (see payouts.py).
+"""
+
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
+
+import crud
+import models
+import payouts
+import schemas
+from auth import get_current_admin_user
+from db import get_db
+from models import User
+
+router = APIRouter()
+
+
+@router.get("/eligible", response_model=List[schemas.EligiblePayout])
+def list_eligible_payouts(
+    through_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """What a payout run would pay now, per teacher and currency (admin only)."""
+    return payouts.eligible_totals(db, through_date)
+
+
+@router.post("/runs", response_model=schemas.JobOut, status_code=status.HTTP_202_ACCEPTED)
+def create_payout_run(
+    run_in: schemas.PayoutRunCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Queue a payout run as a `payout_run` background job (admin only).
+
+    The job pays every teacher with a connected Stripe account for their
+    completed, paid bookings not yet paid out; its result names the run.
+    Repeating a request with the same idempotency_key returns the existing
+    job with status 200.
+    """
+    params = {"concurrency": run_in.concurrency}
+    if run_in.through_date:
+        params["through_date"] = run_in.through_date.isoformat()
+    job, created = crud.create_job(
+        db,
+        "payout_run",
+        params=params,
+        idempotency_key=run_in.idempotency_key,
+        created_by=current_user.id,
+    )
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return job
+
+
+@router.get("/runs", response_model=List[schemas.PayoutRunOut])
+def list_payout_runs(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """Most recent payout runs first (admin only)."""
+    return db.query(models.PayoutRun).order_by(models.PayoutRun.id.desc()).limit(limit).all()
+
+
+@router.get("/runs/{run_id}", response_model=schemas.PayoutRunDetail)
+def get_payout_run(
+    run_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    A payout run with its payouts (admin only).
+
+    Raises:
+        404: Run not found
+    """
+    run = db.get(models.PayoutRun, run_id)
+    if run is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Payout run not found")
+    run_payouts = (
+        db.query(models.TeacherPayout)
+        .filter(models.TeacherPayout.run_id == run_id)
+        .order_by(models.TeacherPayout.id)
+        .all()
+    )
+    return schemas.PayoutRunDetail(
+        **schemas.PayoutRunOut.model_validate(run).model_dump(),
+        payouts=[schemas.TeacherPayoutOut.model_validate(p) for p in run_payouts],
+    )
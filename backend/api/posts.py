@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 import crud
+import page_cache
 import schemas
 from db import get_db
 from models import User
@@ -37,14 +38,24 @@ def list_all_posts(
 
 @router.get("/{slug}", response_model=schemas.PostOut)
 def get_post(slug: str, db: Session = Depends(get_db)):
-    """Get a single blog post by slug."""
-    post = crud.get_post_by_slug(db, slug)
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-    # Only show published posts to non-admins
-    if post.status != "published":
+    """
+    Get a single published blog post by slug.
+
+    The rendered body is served from page_cache; crud invalidates it when
+    the post changes.
+    """
+
+    def render():
+        post = crud.get_post_by_slug(db, slug)
+        # Only show published posts to non-admins
+        if not post or post.status != "published":
+            return None
+        return schemas.PostOut.model_validate(post).model_dump_json().encode()
+
+    body = page_cache.get_post(slug, render)
+    if body is None:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    return Response(body, media_type="application/json")
 
 
 @router.get("/id/{post_id}", response_model=schemas.PostOut)
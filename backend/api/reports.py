@@ -0,0 +1,80 @@
+"""
+Admin financial reports, served from the revenue_daily summary (see revenue.py).
+"""
+
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+import revenue
+import schemas
+from auth import get_current_admin_user
+from db import get_db
+from models import User
+
+router = APIRouter()
+
+
+@router.get("/revenue", response_model=schemas.RevenueReport)
+def revenue_report(
+    period: str = Query("month", pattern="^(day|week|month)$"),
+    group_by: List[str] = Query([]),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    teacher_id: Optional[int] = None,
+    booking_status: Optional[List[str]] = Query(None, alias="status"),
+    payment_status: str = Query(
+        revenue.REVENUE_PAYMENT_STATUS, pattern="^(pending|paid|failed|refunded|any)$"
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Gross booking value, commission and teacher earnings per period (admin only).
+
+    Args:
+        period: day, week (starting Monday) or month, by session date
+        group_by: Repeatable; teacher, subject and/or session_type
+        date_from: First session day included
+        date_to: Last session day included
+        teacher_id: Only this teacher's bookings
+        status: Repeatable; only bookings in these statuses
+        payment_status: Only bookings with this payment status (default paid; any for all)
+
+    Returns:
+        One row per period, group and currency, with totals per currency
+
+    Raises:
+        400: Unknown group_by dimension or date_from after date_to
+    """
+    unknown = [name for name in group_by if name not in revenue.DIMENSIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot group by {', '.join(unknown)}; use {', '.join(revenue.DIMENSIONS)}",
+        )
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="date_from is after date_to"
+        )
+    group_by = list(dict.fromkeys(group_by))
+    rows = revenue.report(
+        db,
+        period=period,
+        group_by=group_by,
+        date_from=date_from,
+        date_to=date_to,
+        teacher_id=teacher_id,
+        statuses=booking_status,
+        payment_status=None if payment_status == "any" else payment_status,
+    )
+    return {
+        "period": period,
+        "group_by": group_by,
+        "date_from": date_from,
+        "date_to": date_to,
+        "rows": rows,
+        "totals": revenue.totals(rows),
+    }
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 import crud
+import page_cache
 import schemas
 from db import get_db
 from models import User
@@ -22,10 +23,54 @@ def create_review(
     return review
 
 
-@router.get("/school/{school_id}", response_model=List[schemas.ReviewOut])
-def get_school_reviews(school_id: int, db: Session = Depends(get_db)):
-    """Get approved reviews for a school (public endpoint)."""
-    return crud.get_reviews_for_school(db, school_id, status="approved")
+@router.get("/school/{school_id}", response_model=schemas.SchoolReviewPage)
+def get_school_reviews(
+    school_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    summary: bool = False,
+    db: Session = Depends(get_db),
+):
+    """
+    Get approved reviews for a school, newest first (public endpoint).
+
+    First pages are served from page_cache; moderation actions on the
+    school's reviews invalidate them.
+
+    Args:
+        school_id: School ID
+        limit: Page size
+        cursor: next_cursor from the previous page
+        summary: Include the review count, average rating and rating histogram
+
+    Returns:
+        One page of reviews, the next cursor and the optional summary
+
+    Raises:
+        400: Malformed cursor
+    """
+
+    def render():
+        try:
+            results, next_cursor = crud.list_school_reviews(db, school_id, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        page = {"results": results, "next_cursor": next_cursor}
+        stats = crud.get_school_review_summary(db, school_id) if summary else None
+        if stats:
+            count, average_rating, histogram = stats
+            page["summary"] = {
+                "count": count or 0,
+                "average_rating": average_rating or 0.0,
+                "histogram": histogram or [0] * 5,
+            }
+        return schemas.SchoolReviewPage.model_validate(page).model_dump_json().encode()
+
+    if cursor:
+        body = render()
+    else:
+        body = page_cache.get_school_reviews(school_id, f"{limit}:{int(summary)}", render)
+    return Response(body, media_type="application/json")
 
 
 @router.get("/my-reviews", response_model=List[schemas.ReviewOut])
@@ -38,16 +83,101 @@ def get_my_reviews(
 
 @router.get("/pending", response_model=List[schemas.ReviewOut])
 def list_pending_reviews(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db),
 ):
-    """List pending reviews for moderation (admin only)."""
+    """List pending reviews for moderation (admin only); the total is in X-Total-Count."""
     total, results = crud.list_pending_reviews(db, skip, limit)
+    response.headers["X-Total-Count"] = str(total)
     return results
 
 
+@router.get("/moderation", response_model=schemas.ReviewPage)
+def moderation_queue(
+    review_status: str = Query(
+        "pending", alias="status", pattern="^(pending|approved|rejected)$"
+    ),
+    school_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Moderation queue, newest first, with keyset pagination (admin only).
+
+    Args:
+        review_status: Review status to list (default: pending)
+        school_id: Only reviews of this school
+        limit: Page size
+        cursor: next_cursor from the previous page
+
+    Returns:
+        Total reviews in the status, one page of reviews and the next cursor
+
+    Raises:
+        400: Malformed cursor
+
+    Requires:
+        Admin authentication
+    """
+    try:
+        total, results, next_cursor = crud.list_review_queue(
+            db, review_status, school_id=school_id, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"total": total, "results": results, "next_cursor": next_cursor}
+
+
+@router.patch("/status", response_model=schemas.ReviewStatusBatchResult)
+def update_review_statuses(
+    batch: schemas.ReviewStatusBatch,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Approve or reject many reviews at once (admin only).
+
+    Matching reviews are updated in a single transaction and the rating
+    stats of the affected schools are refreshed once. Reviews already in
+    the target status are skipped, so retrying the same request is safe.
+
+    Args:
+        batch: New status plus review IDs and/or school_id/user_id/current_status filter
+
+    Returns:
+        Counts of requested and updated reviews and of affected schools
+
+    Raises:
+        400: No selection criteria given
+
+    Requires:
+        Admin authentication
+    """
+    if (
+        batch.ids is None
+        and batch.school_id is None
+        and batch.user_id is None
+        and not batch.current_status
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide ids or at least one filter (school_id, user_id, current_status)",
+        )
+    return crud.update_review_statuses(
+        db,
+        batch.status,
+        review_ids=batch.ids,
+        school_id=batch.school_id,
+        user_id=batch.user_id,
+        current_status=batch.current_status,
+    )
+
+
 @router.patch("/{review_id}/status", response_model=schemas.ReviewOut)
 def update_review_status(
     review_id: int,
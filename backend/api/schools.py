@@ -3,14 +3,18 @@ Schools API endpoints for listing, searching, and managing schools.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 import crud
+import export
+import fast_json
+import models
 import schemas
 from db import get_db
 from models import User
-from auth import get_current_admin_user
+from auth import get_current_admin_user, get_optional_current_user
 
 router = APIRouter()
 
@@ -31,10 +35,14 @@ def list_schools(
         None, description="Filter by status (default: published)"
     ),
     db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_current_user),
 ):
     """
     List schools with filtering and pagination.
 
+    With a valid access token each result also carries is_favorited,
+    looked up for the whole page in one query.
+
     Filters:
     - curriculum: Filter by curriculum type
     - type: Filter by school type
@@ -49,8 +57,8 @@ def list_schools(
     # Calculate skip
     skip = (page - 1) * page_size
 
-    # Get filtered and paginated results
-    total, results = crud.list_schools(
+    # Get filtered and paginated results (only the SchoolOut columns, see fast_json.py)
+    total, rows = crud.list_schools(
         db=db,
         skip=skip,
         limit=page_size,
@@ -59,9 +67,62 @@ def list_schools(
         status=status,
         search=search,
         location=location,
+        columns=fast_json.columns_for(schemas.SchoolOut, models.School),
+    )
+
+    results = fast_json.dump_rows(schemas.SchoolOut, rows)
+    if current_user is not None:
+        favorited = crud.favorited_school_ids(db, current_user.id, (r["id"] for r in results))
+        for result in results:
+            result["is_favorited"] = result["id"] in favorited
+
+    return ORJSONResponse(
+        {"total": total, "page": page, "page_size": page_size, "results": results}
     )
 
-    return {"total": total, "page": page, "page_size": page_size, "results": results}
+
+@router.get("/export")
+def export_schools(
+    format: str = Query("csv", description="Export format: csv, jsonl or parquet"),
+    table: str = Query("schools", description="Table: schools or staging_schools"),
+    status_filter: Optional[str] = Query(
+        None, alias="status", description="Filter by status (default: all)"
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Stream a full export of schools (admin only).
+
+    Rows are fetched and encoded in batches as the response is sent, so
+    exports of any size use constant memory and start immediately.
+
+    Args:
+        format: csv, jsonl or parquet
+        table: schools or staging_schools
+        status: Optional status filter
+        current_user: Current admin user
+
+    Returns:
+        Streaming file download
+
+    Raises:
+        400: Unknown format or table, or parquet support not installed
+
+    Requires:
+        Admin authentication
+    """
+    try:
+        chunks = export.stream_export(db, format, table=table, status=status_filter)
+    except export.ExportError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    filename = f"{table}_export.{format}"
+    return StreamingResponse(
+        chunks,
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/{school_id}", response_model=schemas.SchoolOut)
@@ -192,7 +253,9 @@ def list_staging(
     Requires:
         Admin authentication
     """
-    return crud.list_staging(db, skip=skip, limit=limit)
+    columns = fast_json.columns_for(schemas.StagingOut, models.StagingSchool)
+    rows = crud.list_staging(db, skip=skip, limit=limit, columns=columns)
+    return ORJSONResponse(fast_json.dump_rows(schemas.StagingOut, rows))
 
 
 @router.get("/staging/{staging_id}", response_model=schemas.StagingOut)
@@ -225,6 +288,45 @@ def get_staging(
     return s
 
 
+@router.post("/staging/accept-batch", response_model=schemas.StagingAcceptBatchResult)
+def accept_staging_batch(
+    selection: schemas.StagingAcceptBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Accept many staging schools at once (admin only).
+
+    Matching rows are moved to the main schools table with 'published'
+    status in a single transaction. Rows already accepted are no longer in
+    staging, so retrying the same request is safe.
+
+    Args:
+        selection: Staging IDs and/or min_score/status filter
+        current_user: Current admin user
+
+    Returns:
+        Counts of requested, matched, accepted and removed rows
+
+    Raises:
+        400: No selection criteria given
+
+    Requires:
+        Admin authentication
+    """
+    if selection.ids is None and selection.min_score is None and not selection.status:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide ids, min_score or status to select staging schools",
+        )
+    return crud.accept_staging_batch(
+        db,
+        staging_ids=selection.ids,
+        min_score=selection.min_score,
+        status=selection.status,
+    )
+
+
 @router.post("/staging/{staging_id}/accept", response_model=schemas.SchoolOut)
 def accept_staging(
     staging_id: int,
@@ -3,11 +3,14 @@ Teachers API endpoints for the teacher marketplace.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date, datetime
 
 import crud
+import fast_json
+import models
 import schemas
 from db import get_db
 from models import User
@@ -147,7 +150,8 @@ def list_all_teachers(
     """Admin-only: return all teachers."""
     if not current_user.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
-    return crud.list_all_teachers(db)
+    rows = crud.list_all_teachers(db, columns=fast_json.columns_for(Teacher, models.Teacher))
+    return ORJSONResponse(fast_json.dump_rows(Teacher, rows))
 
 
 @router.get("/", response_model=List[Teacher])
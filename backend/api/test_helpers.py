@@ -1,8 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
+from sqlalchemy.orm import sessionmaker
 import os
+import time
+import uuid
 
 import models
+import payment_events
 import db
 import auth
 
@@ -38,6 +42,7 @@ def create_teacher(payload: CreateTeacherReq, _=Depends(_ensure_enabled), db=Dep
 class SimulatePaymentReq(BaseModel):
     booking_id: int
     event_type: str = "payment_intent.succeeded"
+    event_id: str | None = None  # reuse an id to simulate Stripe redelivering an event
 
 
 @router.post("/simulate-payment-event")
@@ -47,21 +52,37 @@ def simulate_payment_event(payload: SimulatePaymentReq, _=Depends(_ensure_enable
     booking = s.query(models.Booking).filter(models.Booking.id == payload.booking_id).one_or_none()
     if not booking:
         raise HTTPException(status_code=404, detail="booking not found")
-
-    # mimic webhook handling: set payment_status and status
-    if payload.event_type == "payment_intent.succeeded":
-        booking.payment_status = "paid"
-        booking.status = "confirmed"
-    elif payload.event_type == "payment_intent.payment_failed":
-        booking.payment_status = "failed"
-        booking.status = "failed"
-    else:
+    if payload.event_type not in payment_events.EVENT_HANDLERS:
         raise HTTPException(status_code=400, detail="unsupported event_type")
 
-    s.add(booking)
-    s.commit()
-    s.refresh(booking)
-    return {"booking_id": booking.id, "status": booking.status, "payment_status": booking.payment_status}
+    # Build the event Stripe would send and take it through the webhook's
+    # ledger, applying it right away so the caller sees the result
+    event = {
+        "id": payload.event_id or f"evt_sim_{uuid.uuid4().hex}",
+        "object": "event",
+        "type": payload.event_type,
+        "created": int(time.time()),
+        "data": {
+            "object": {
+                "id": f"pi_sim_{booking.id}",
+                "object": "payment_intent",
+                "metadata": {"booking_id": str(booking.id)},
+                "status": "succeeded" if payload.event_type.endswith("succeeded") else "requires_payment_method",
+            }
+        },
+    }
+    _, created = payment_events.record_event(s, event)
+    payment_events.process_pending(sessionmaker(bind=s.get_bind(), autoflush=False))
+
+    s.expire_all()
+    booking = s.get(models.Booking, payload.booking_id)
+    return {
+        "booking_id": booking.id,
+        "status": booking.status,
+        "payment_status": booking.payment_status,
+        "event_id": event["id"],
+        "duplicate": not created,
+    }
 
 
 class CreatePayoutReq(BaseModel):
@@ -22,6 +22,8 @@ REFRESH_TOKEN_EXPIRE_DAYS = 7
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+# Same, for public endpoints where the token is optional
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
 
 def hash_password(password: str) -> str:
@@ -120,12 +122,17 @@ def decode_token(token: str) -> dict:
         )
 
 
-async def get_current_user(
+def get_current_user(
     token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
 ) -> User:
     """
     Dependency to get the current authenticated user from a JWT token.
 
+    Declared sync so FastAPI runs the user lookup in the threadpool. As an
+    async dependency its blocking query ran on the event loop; under a
+    burst that exhausted the connection pool, the loop then waited for a
+    connection that only loop-driven requests could release.
+
     Args:
         token: JWT access token from request header
         db: Database session
@@ -166,6 +173,28 @@ async def get_current_user(
     return user
 
 
+def get_optional_current_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme), db: Session = Depends(get_db)
+) -> Optional[User]:
+    """
+    Dependency for public endpoints that personalize responses when signed in.
+
+    Args:
+        token: JWT access token from request header, if any
+        db: Database session
+
+    Returns:
+        Current authenticated user, or None when the token is missing,
+        invalid or expired (the request is then served anonymously)
+    """
+    if not token:
+        return None
+    try:
+        return get_current_user(token, db)
+    except HTTPException:
+        return None
+
+
 async def get_current_admin_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -0,0 +1,235 @@
+"""
+Synthetic, reproducible dataset for benchmarks.
+
+Seeds schools, users, teachers with weekly availability, and bookings in
+bulk (multi-row INSERTs in chunks) into any SQLAlchemy URL, SQLite or a
+local Postgres. The same seed and scale always produce the same rows, so
+results from different commits are comparable.
+
+Run from the `backend` directory as:
+    python -m benchmarks.datagen --url sqlite:///./bench.db [--scale 0.1]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, asdict
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+import models
+import revenue
+from auth import hash_password
+from db import Base
+
+CURRICULA = ["British", "American", "IB", "Indian", "French", "Qatari", "German", "Canadian"]
+SCHOOL_TYPES = ["Primary", "Secondary", "KG", "All-through"]
+AREAS = ["West Bay", "Al Waab", "Al Sadd", "Lusail", "Al Wakrah", "The Pearl", "Al Rayyan"]
+SUBJECTS = ["Mathematics", "English", "Science", "Arabic", "Physics", "Chemistry", "French"]
+GRADES = ["KG", "Primary", "Secondary"]
+LANGUAGES = ["English", "Arabic", "French", "Hindi", "Urdu"]
+CITIES = ["Doha", "Al Wakrah", "Lusail", "Al Rayyan", "Al Khor"]
+BOOKING_STATUSES = ["pending", "confirmed", "completed", "completed", "completed", "cancelled"]
+
+BENCH_PASSWORD = "bench-password"
+BOOKING_START = date(2025, 1, 1)
+BOOKING_DAYS = 365
+CHUNK = 5000
+
+
+@dataclass
+class DatasetSize:
+    schools: int = 50_000
+    teachers: int = 5_000
+    parents: int = 20_000
+    bookings: int = 500_000
+
+    def scaled(self, scale: float) -> "DatasetSize":
+        return DatasetSize(**{k: max(1, int(v * scale)) for k, v in asdict(self).items()})
+
+
+def parent_email(i: int) -> str:
+    return f"parent{i}@bench.test"
+
+
+def teacher_email(i: int) -> str:
+    return f"teacher{i}@bench.test"
+
+
+def _insert_chunks(conn, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= CHUNK:
+            conn.execute(insert(table), batch)
+            batch = []
+    if batch:
+        conn.execute(insert(table), batch)
+
+
+def _schools(rng, n):
+    for i in range(n):
+        curriculum = rng.choice(CURRICULA)
+        yield {
+            "name": f"{rng.choice(AREAS)} {curriculum} School {i}",
+            "type": rng.choice(SCHOOL_TYPES),
+            "curriculum": curriculum,
+            "address": f"{rng.randint(1, 999)} Street, {rng.choice(AREAS)}, Doha",
+            "latitude": 25.2 + rng.random() * 0.3,
+            "longitude": 51.4 + rng.random() * 0.2,
+            "contact": f"+974 4{rng.randint(1000000, 9999999)}",
+            "website": f"https://school{i}.example.qa",
+            "fee_structure": {"annual": rng.randrange(20_000, 90_000, 500)},
+            "facilities": rng.sample(["Pool", "Library", "Labs", "Sports", "Arts"], 3),
+            "status": "published" if rng.random() < 0.9 else "pending",
+            "completeness_score": rng.randint(30, 100),
+        }
+
+
+def _users(size, hashed):
+    for i in range(size.parents):
+        yield {
+            "email": parent_email(i),
+            "hashed_password": hashed,
+            "full_name": f"Parent {i}",
+            "is_active": True,
+            "is_admin": False,
+        }
+    for i in range(size.teachers):
+        yield {
+            "email": teacher_email(i),
+            "hashed_password": hashed,
+            "full_name": f"Teacher {i}",
+            "is_active": True,
+            "is_admin": False,
+        }
+
+
+def _teachers(rng, size):
+    # Teacher i belongs to user id parents + i + 1 (users are inserted in order)
+    for i in range(size.teachers):
+        rate = rng.randrange(100, 400, 10)
+        yield {
+            "user_id": size.parents + i + 1,
+            "full_name": f"Teacher {i}",
+            "bio": "Experienced tutor.",
+            "years_experience": rng.randint(1, 25),
+            "languages": rng.sample(LANGUAGES, rng.randint(1, 3)),
+            "city": rng.choice(CITIES),
+            "areas_served": rng.sample(AREAS, 2),
+            "specializations": rng.sample(SUBJECTS, rng.randint(1, 3)),
+            "grade_levels": rng.sample(GRADES, rng.randint(1, 3)),
+            "curricula_expertise": rng.sample(CURRICULA, rng.randint(1, 3)),
+            "teaches_online": rng.random() < 0.8,
+            "teaches_in_person": True,
+            "is_verified": rng.random() < 0.6,
+            "background_check_status": "approved",
+            "average_rating": round(rng.uniform(3.0, 5.0), 2),
+            "total_reviews": rng.randint(0, 200),
+            "total_sessions": 0,
+            "hourly_rate_qatari": rate,
+            "hourly_rate_online": rate - 20,
+            "currency": "QAR",
+            "is_active": True,
+            "is_featured": rng.random() < 0.05,
+        }
+
+
+def _availability(size):
+    for teacher_id in range(1, size.teachers + 1):
+        for day in range(7):
+            yield {
+                "teacher_id": teacher_id,
+                "day_of_week": day,
+                "start_time": "08:00",
+                "end_time": "20:00",
+                "is_recurring": True,
+            }
+
+
+def _bookings(rng, size):
+    for _ in range(size.bookings):
+        hour = rng.randint(8, 18)
+        rate = rng.randrange(100, 400, 10)
+        status = rng.choice(BOOKING_STATUSES)
+        yield {
+            "teacher_id": rng.randint(1, size.teachers),
+            "parent_id": rng.randint(1, size.parents),
+            "subject": rng.choice(SUBJECTS),
+            "grade_level": rng.choice(GRADES),
+            "session_type": rng.choice(["online", "in_person"]),
+            "duration_hours": 1.0,
+            "scheduled_date": BOOKING_START + timedelta(days=rng.randrange(BOOKING_DAYS)),
+            "start_time": f"{hour:02d}:00",
+            "end_time": f"{hour + 1:02d}:00",
+            "hourly_rate": rate,
+            "total_amount": rate,
+            "currency": "QAR",
+            "commission_amount": rate * 0.15,
+            "teacher_amount": rate * 0.85,
+            "status": status,
+            "payment_status": "paid" if status in ("confirmed", "completed") else "pending",
+        }
+
+
+def generate(engine, size: DatasetSize = None, seed: int = 42, log=print) -> dict:
+    """
+    Drop and recreate all tables, then seed `size` rows.
+
+    Every bench user's password is BENCH_PASSWORD.
+
+    Returns:
+        Seconds spent seeding each table
+    """
+    size = size or DatasetSize()
+    rng = random.Random(seed)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    hashed = hash_password(BENCH_PASSWORD)  # bcrypt once, shared by every user
+
+    steps = [
+        ("schools", models.School.__table__, _schools(rng, size.schools)),
+        ("users", models.User.__table__, _users(size, hashed)),
+        ("teachers", models.Teacher.__table__, _teachers(rng, size)),
+        ("teacher_availability", models.TeacherAvailability.__table__, _availability(size)),
+        ("bookings", models.Booking.__table__, _bookings(rng, size)),
+    ]
+    report = {}
+    for name, table, rows in steps:
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            _insert_chunks(conn, table, rows)
+        elapsed = time.perf_counter() - start
+        report[name] = round(elapsed, 2)
+        log(f"  {name:<22} {elapsed:6.1f}s")
+
+    # Bulk inserts bypass the summary's incremental refresh
+    start = time.perf_counter()
+    with Session(engine) as db:
+        revenue.rebuild(db)
+    elapsed = time.perf_counter() - start
+    report["revenue_daily"] = round(elapsed, 2)
+    log(f"  {'revenue_daily':<22} {elapsed:6.1f}s")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic benchmark dataset")
+    parser.add_argument("--url", default="sqlite:///./bench.db", help="SQLAlchemy database URL")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply the default sizes")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    size = DatasetSize().scaled(args.scale)
+    print(f"Seeding {args.url}: {asdict(size)}")
+    generate(create_engine(args.url), size, args.seed)
+
+
+if __name__ == "__main__":
+    main()
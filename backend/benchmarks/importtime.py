@@ -0,0 +1,131 @@
+"""
+Import-cost benchmark based on `python -X importtime`.
+
+Imports a module (default: main) in fresh interpreters, parses the
+importtime report from stderr and prints the total, the most expensive
+modules and the cost per top-level package, so a new module-level import
+of a heavy SDK shows up as a regression. Results can be saved as JSON and
+compared with an earlier run:
+
+    python -m benchmarks.importtime --output results/imports.json
+    python -m benchmarks.importtime --compare results/imports.json --budget-ms 1500
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse(stderr: str) -> dict:
+    """Parse an importtime report into {module: {"self_us", "cumulative_us", "depth"}}."""
+    modules = {}
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = {
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": len(indent) // 2,
+            }
+    return modules
+
+
+def measure(module: str = "main", runs: int = 5, env: dict = None) -> dict:
+    """
+    Import `module` in `runs` fresh interpreters and return median timings.
+
+    A first, unmeasured run compiles any stale .pyc files.
+
+    Returns:
+        {"total_ms", "modules": {name: {"self_ms", "cumulative_ms"}}, "packages": {name: ms}}
+    """
+    command = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    env = {**os.environ, **(env or {})}
+    reports = []
+    for i in range(runs + 1):
+        out = subprocess.run(
+            command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        if i:
+            reports.append(parse(out.stderr))
+
+    names = set().union(*reports)
+    modules = {}
+    for name in names:
+        samples = [r[name] for r in reports if name in r]
+        modules[name] = {
+            "self_ms": round(statistics.median(s["self_us"] for s in samples) / 1000, 2),
+            "cumulative_ms": round(
+                statistics.median(s["cumulative_us"] for s in samples) / 1000, 2
+            ),
+        }
+
+    packages = defaultdict(float)
+    for name, timing in modules.items():
+        packages[name.split(".")[0]] += timing["self_ms"]
+    return {
+        "module": module,
+        "total_ms": modules[module]["cumulative_ms"],
+        "modules": modules,
+        "packages": {k: round(v, 2) for k, v in sorted(packages.items(), key=lambda kv: -kv[1])},
+    }
+
+
+def compare(current: dict, baseline: dict, top: int = 15) -> str:
+    """Per-package self time against a baseline run, biggest changes first."""
+    names = set(current["packages"]) | set(baseline["packages"])
+    deltas = sorted(
+        names,
+        key=lambda n: -abs(current["packages"].get(n, 0) - baseline["packages"].get(n, 0)),
+    )
+    lines = [f"total {baseline['total_ms']:.1f} -> {current['total_ms']:.1f} ms"]
+    for name in deltas[:top]:
+        old, new = baseline["packages"].get(name, 0.0), current["packages"].get(name, 0.0)
+        lines.append(f"  {name:<28} {old:8.1f} -> {new:8.1f} ms")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import cost with -X importtime")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    parser.add_argument("--budget-ms", type=float, help="Exit with status 1 above this total")
+    args = parser.parse_args()
+
+    result = measure(args.module, args.runs)
+    print(f"import {args.module}: {result['total_ms']:.1f} ms (median of {args.runs})")
+    print(f"Slowest modules (cumulative, top {args.top}):")
+    ranked = sorted(result["modules"].items(), key=lambda kv: -kv[1]["cumulative_ms"])
+    for name, timing in ranked[1:args.top + 1]:
+        print(f"  {name:<40} {timing['cumulative_ms']:8.1f} ms  (self {timing['self_ms']:.1f})")
+    print("Self time by package:")
+    for name, ms in list(result["packages"].items())[:args.top]:
+        print(f"  {name:<40} {ms:8.1f} ms")
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(result, indent=2))
+    if args.compare:
+        print(compare(result, json.loads(Path(args.compare).read_text()), args.top))
+    if args.budget_ms is not None and result["total_ms"] > args.budget_ms:
+        print(f"Import budget exceeded: {result['total_ms']:.1f} > {args.budget_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
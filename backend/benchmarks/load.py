@@ -0,0 +1,357 @@
+"""
+Scripted load scenarios against the full API app, in-process.
+
+Each scenario issues a fixed number of requests with a fixed concurrency
+through httpx's ASGI transport against a database seeded by
+benchmarks.datagen, and reports throughput and p50/p95/p99 latency.
+Results are written as JSON tagged with the git commit so runs can be
+compared:
+
+    python -m benchmarks.load --url sqlite:///./bench.db --seed-data --scale 0.1
+    python -m benchmarks.load --url sqlite:///./bench.db --compare results/old.json
+
+Scenarios:
+    directory_browsing  GET /api/schools/ pages with filters, plus school details
+    teacher_search      GET /api/teachers/ with filter and sort combinations
+    booking_burst       concurrent POST /api/bookings/ from many parents
+    login_storm         concurrent POST /api/auth/login
+    payment_checkout    POST /api/payments/create-payment-intent for unpaid bookings,
+                        against payment_gateway.FakeGateway (no network)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+import models
+import payment_gateway
+from auth import create_access_token
+from benchmarks import datagen
+from db import get_db
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+BURST_START = date(2030, 1, 1)  # booking_burst dates, after all seeded bookings
+UNPAID_SAMPLE = 1000  # unpaid bookings payment_checkout picks from
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies, statuses, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        "errors": sum(n for code, n in statuses.items() if code >= 500),
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+    }
+
+
+class Dataset:
+    """Row counts of the seeded database, used to pick valid IDs."""
+
+    def __init__(self, session_factory):
+        with session_factory() as db:
+            def count(model):
+                return db.scalar(select(func.count()).select_from(model))
+
+            self.schools = count(models.School)
+            self.teachers = count(models.Teacher)
+            self.users = count(models.User)
+            self.bookings = count(models.Booking)
+            self.unpaid = (
+                db.query(models.Booking.id, models.Booking.parent_id)
+                .filter(models.Booking.payment_status == "pending")
+                .order_by(models.Booking.id)
+                .limit(UNPAID_SAMPLE)
+                .all()
+            )
+        # datagen inserts parents first, then one user per teacher
+        self.parents = self.users - self.teachers
+
+    def as_dict(self) -> dict:
+        return {
+            "schools": self.schools,
+            "teachers": self.teachers,
+            "users": self.users,
+            "bookings": self.bookings,
+        }
+
+
+# ==================== SCENARIOS ====================
+# Each scenario is a function (rng, dataset) -> request spec
+# (method, url, kwargs) called once per request.
+
+
+def directory_browsing(rng, data):
+    if rng.random() < 0.3:
+        return "GET", f"/api/schools/{rng.randint(1, data.schools)}", {}
+    params = {"page": rng.randint(1, 50), "page_size": 20}
+    roll = rng.random()
+    if roll < 0.3:
+        params["curriculum"] = rng.choice(datagen.CURRICULA)
+    elif roll < 0.5:
+        params["type"] = rng.choice(datagen.SCHOOL_TYPES)
+    elif roll < 0.7:
+        params["search"] = rng.choice(datagen.CURRICULA)
+    elif roll < 0.8:
+        params["location"] = rng.choice(datagen.AREAS)
+    return "GET", "/api/schools/", {"params": params}
+
+
+def teacher_search(rng, data):
+    params = {"page": rng.randint(1, 10), "page_size": 20}
+    for key, values in (
+        ("city", datagen.CITIES),
+        ("language", datagen.LANGUAGES),
+        ("teaches_online", ["true", "false"]),
+        ("min_rating", ["3.5", "4.0", "4.5"]),
+        ("max_hourly_rate", ["150", "250", "350"]),
+        ("is_verified", ["true"]),
+    ):
+        if rng.random() < 0.3:
+            params[key] = rng.choice(values)
+    params["sort_by"] = rng.choice(["average_rating", "hourly_rate_qatari", "total_reviews"])
+    params["sort_order"] = rng.choice(["asc", "desc"])
+    return "GET", "/api/teachers/", {"params": params}
+
+
+def booking_burst(rng, data):
+    parent = rng.randrange(data.parents)
+    token = create_access_token({"sub": datagen.parent_email(parent)})
+    # Future dates only, so bursts contend with each other rather than history
+    day = BURST_START + timedelta(days=rng.randrange(30))
+    body = {
+        "teacher_id": rng.randint(1, data.teachers),
+        "subject": rng.choice(datagen.SUBJECTS),
+        "session_type": "in_person",
+        "duration_hours": 1.0,
+        "scheduled_date": day.isoformat(),
+        "start_time": f"{rng.randint(8, 18):02d}:00",
+    }
+    return "POST", "/api/bookings/", {
+        "json": body,
+        "headers": {"Authorization": f"Bearer {token}"},
+    }
+
+
+def login_storm(rng, data):
+    email = datagen.parent_email(rng.randrange(data.parents))
+    return "POST", "/api/auth/login", {
+        "json": {"email": email, "password": datagen.BENCH_PASSWORD}
+    }
+
+
+def payment_checkout(rng, data):
+    booking_id, parent_id = rng.choice(data.unpaid)
+    # datagen inserts parents first, so parent user N has email index N - 1
+    token = create_access_token({"sub": datagen.parent_email(parent_id - 1)})
+    return "POST", "/api/payments/create-payment-intent", {
+        "params": {"booking_id": booking_id},
+        "headers": {"Authorization": f"Bearer {token}"},
+    }
+
+
+def reset_burst_bookings(session_factory):
+    """Remove bookings left by earlier bursts so every run starts the same."""
+    with session_factory() as db:
+        db.query(models.Booking).filter(
+            models.Booking.scheduled_date >= BURST_START
+        ).delete(synchronize_session=False)
+        db.query(models.RevenueDaily).filter(
+            models.RevenueDaily.day >= BURST_START
+        ).delete(synchronize_session=False)
+        db.commit()
+
+
+SETUP = {"booking_burst": reset_burst_bookings}
+
+# Scenarios drawing from rows a small dataset may lack: (what, present(data))
+REQUIRES = {"payment_checkout": ("unpaid bookings", lambda data: data.unpaid)}
+
+SCENARIOS = {
+    "directory_browsing": (directory_browsing, 2000, 16),
+    "teacher_search": (teacher_search, 1000, 16),
+    "booking_burst": (booking_burst, 500, 32),
+    "login_storm": (login_storm, 100, 16),
+    "payment_checkout": (payment_checkout, 500, 32),
+}
+
+
+async def run_scenario(app, make_request, data, requests: int, concurrency: int, seed: int):
+    import httpx
+
+    rng = random.Random(seed)
+    specs = [make_request(rng, data) for _ in range(requests)]
+    latencies = []
+    statuses = Counter()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        pending = iter(specs)
+
+        async def worker():
+            for method, url, kwargs in pending:
+                start = time.perf_counter()
+                response = await client.request(method, url, **kwargs)
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return summarize(latencies, statuses, elapsed)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def run(url: str, scenarios=None, scale: float = 1.0, seed: int = 42, seed_data=False, log=print):
+    """
+    Run the named scenarios (default: all) and return the results document.
+
+    Args:
+        url: Database URL, seeded by benchmarks.datagen
+        scenarios: Names of the scenarios to run
+        scale: Request-count multiplier (and dataset scale with seed_data)
+        seed: Seed for request generation and data
+        seed_data: Regenerate the dataset before running
+    """
+    from main import app
+
+    engine = create_engine(
+        url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {}
+    )
+    if seed_data:
+        log("Seeding dataset...")
+        datagen.generate(engine, datagen.DatasetSize().scaled(scale), seed, log=log)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    data = Dataset(session_factory)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    # Payments never leave the process; FAKE_GATEWAY_LATENCY_MS simulates Stripe
+    latency = float(os.getenv("FAKE_GATEWAY_LATENCY_MS", "0")) / 1000
+    previous_gateway = payment_gateway.set_gateway(payment_gateway.FakeGateway(latency=latency))
+    results, skipped = {}, {}
+    try:
+        for name in scenarios or SCENARIOS:
+            if name in REQUIRES and not REQUIRES[name][1](data):
+                skipped[name] = f"no {REQUIRES[name][0]} in the dataset"
+                log(f"Skipping {name}: {skipped[name]}")
+                continue
+            make_request, requests, concurrency = SCENARIOS[name]
+            requests = max(1, int(requests * scale))
+            if name in SETUP:
+                SETUP[name](session_factory)
+            log(f"Running {name}: {requests} requests, concurrency {concurrency}")
+            results[name] = asyncio.run(
+                run_scenario(app, make_request, data, requests, concurrency, seed)
+            )
+            results[name]["concurrency"] = concurrency
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        payment_gateway.set_gateway(previous_gateway)
+        engine.dispose()
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "dataset": data.as_dict(),
+        "scale": scale,
+        "seed": seed,
+        "scenarios": results,
+        "skipped": skipped,
+    }
+
+
+def compare(current: dict, baseline: dict) -> str:
+    """Render a side-by-side of p95 and throughput against a baseline run."""
+    lines = [f"{'scenario':<20} {'p95 ms':^28}   {'req/s':^28}"]
+    for name, now in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+
+        def delta(key):
+            old, new = before[key], now[key]
+            change = (new - old) / old * 100 if old else 0.0
+            return f"{old:>9} -> {new:<9} {change:+5.0f}%"
+
+        lines.append(f"{name:<20} {delta('p95_ms')}   {delta('throughput_rps')}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run API load scenarios")
+    parser.add_argument("--url", default="sqlite:///./bench.db", help="SQLAlchemy database URL")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--seed-data", action="store_true", help="Regenerate the dataset first")
+    parser.add_argument("--output", help="Results file (default: results/<commit>.json)")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    args = parser.parse_args()
+
+    # Keep per-request logging out of the measurements (read when main is imported)
+    os.environ.setdefault("ACCESS_LOG_ENABLED", "0")
+    doc = run(args.url, args.scenario, args.scale, args.seed, args.seed_data)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{doc['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(doc, indent=2))
+
+    for name, r in doc["scenarios"].items():
+        print(
+            f"{name:<20} {r['throughput_rps']:>8} req/s  p50 {r['p50_ms']:>8} ms  "
+            f"p95 {r['p95_ms']:>8} ms  p99 {r['p99_ms']:>8} ms  errors {r['errors']}"
+        )
+    print(f"Results written to {output}")
+
+    if args.compare:
+        print(compare(doc, json.loads(Path(args.compare).read_text())))
+
+
+if __name__ == "__main__":
+    main()
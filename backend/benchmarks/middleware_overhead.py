@@ -0,0 +1,191 @@
+"""
+Micro-benchmark: requests/s for GET /api/schools/ under different middleware stacks.
+
+Compares the old stack (CORSMiddleware plus two BaseHTTPMiddleware
+functions that printed diagnostics) against the current pure-ASGI stack.
+Requests are driven in-process through httpx's ASGI transport against a
+throwaway SQLite database, so the numbers measure framework and middleware
+overhead rather than network I/O.
+
+Run from the `backend` directory as:
+    python -m benchmarks.middleware_overhead [--requests 2000] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import access_log
+from access_log import AccessLogMiddleware
+from api import schools
+from db import Base, get_db
+from metrics import MetricsMiddleware, instrument_engine
+from middleware import CORSFallbackMiddleware
+from models import School
+
+
+def _base_app(session_factory) -> FastAPI:
+    app = FastAPI()
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.include_router(schools.router, prefix="/api/schools")
+    app.dependency_overrides[get_db] = override_get_db
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=False,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    return app
+
+
+def legacy_app(session_factory) -> FastAPI:
+    """The stack as it was: two @app.middleware("http") layers."""
+    app = _base_app(session_factory)
+
+    @app.middleware("http")
+    async def ensure_cors_header(request, call_next):
+        response = await call_next(request)
+        origin = request.headers.get("origin")
+        if origin:
+            if "access-control-allow-origin" not in (k.lower() for k in response.headers.keys()):
+                response.headers["Access-Control-Allow-Origin"] = origin
+                response.headers["Access-Control-Allow-Credentials"] = "true"
+                print(f"CORS fallback applied: origin={origin} path={request.url.path}")
+        return response
+
+    @app.middleware("http")
+    async def log_request_and_response_headers(request, call_next):
+        response = await call_next(request)
+        origin = request.headers.get("origin")
+        print(
+            f"REQ_LOG: method={request.method} path={request.url.path} origin={origin} "
+            f"response_headers={list(response.headers.keys())}"
+        )
+        return response
+
+    return app
+
+
+def asgi_app(session_factory) -> FastAPI:
+    """The current stack: raw ASGI fallback, metrics and access log."""
+    app = _base_app(session_factory)
+    app.add_middleware(CORSFallbackMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(AccessLogMiddleware)
+    return app
+
+
+def asgi_sampled_app(session_factory) -> FastAPI:
+    """The current stack with 10% access-log sampling, as in production."""
+    app = _base_app(session_factory)
+    app.add_middleware(CORSFallbackMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(AccessLogMiddleware, sample_rate=0.1)
+    return app
+
+
+def bare_app(session_factory) -> FastAPI:
+    """CORSMiddleware only, as a floor."""
+    return _base_app(session_factory)
+
+
+STACKS = {
+    "bare": bare_app,
+    "legacy": legacy_app,
+    "asgi": asgi_app,
+    "asgi-10%": asgi_sampled_app,
+}
+
+
+async def _drive(app, requests: int, concurrency: int) -> float:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Origin": "http://localhost:3000"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up routing, pydantic and the connection pool
+        for _ in range(20):
+            (await client.get("/api/schools/", headers=headers)).raise_for_status()
+
+        remaining = iter(range(requests))
+
+        async def worker():
+            for _ in remaining:
+                (await client.get("/api/schools/", headers=headers)).raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+def run(requests: int = 2000, concurrency: int = 8, schools_count: int = 50, rounds: int = 3):
+    """Benchmark each stack and return {stack: best requests/s}."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False}
+        )
+        instrument_engine(engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        Base.metadata.create_all(bind=engine)
+        with session_factory() as db:
+            db.add_all(
+                School(name=f"School {i}", curriculum="British", status="published")
+                for i in range(schools_count)
+            )
+            db.commit()
+
+        # Both stacks log to a real line-buffered file, like unbuffered
+        # container stdout, so each log line costs a write() as in production
+        sink = open(os.path.join(tmp, "stdout.log"), "w", buffering=1)
+        access_log.configure_access_log(stream=sink)
+        results = {}
+        try:
+            with contextlib.redirect_stdout(sink):
+                for name, factory in STACKS.items():
+                    app = factory(session_factory)
+                    results[name] = max(
+                        asyncio.run(_drive(app, requests, concurrency)) for _ in range(rounds)
+                    )
+        finally:
+            access_log.stop_access_log()
+            sink.close()
+            engine.dispose()
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Middleware overhead benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--schools", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    results = run(args.requests, args.concurrency, args.schools, args.rounds)
+    legacy = results["legacy"]
+    print(f"GET /api/schools/ - {args.requests} requests, concurrency {args.concurrency}")
+    for name, rps in results.items():
+        print(f"  {name:<9} {rps:8.1f} req/s  ({rps / legacy:5.2f}x legacy)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Micro-benchmark: per-request CPU of the large list endpoints, default vs fast path.
+
+"default" mounts the handlers as they were before fast_json.py: ORM
+objects validated against the route's response_model and encoded by
+FastAPI. "fast" is the current routers (column-selected rows, one
+TypeAdapter call, orjson). Requests are driven sequentially through
+httpx's ASGI transport against a benchmarks.datagen database; CPU time is
+time.process_time() per request, so it excludes waiting on I/O.
+
+Run from the `backend` directory as:
+    python -m benchmarks.serialization [--requests 200] [--scale 0.02]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+import crud
+import models
+import schemas
+from api import schools, teachers
+from auth import get_current_admin_user, get_current_user
+from benchmarks import datagen
+from db import get_db
+
+ENDPOINTS = {
+    "schools (100/page)": "/api/schools/?page_size=100",
+    "staging (limit 500)": "/api/schools/staging/list?limit=500",
+    "teachers/all": "/api/teachers/all",
+}
+
+
+def default_app() -> FastAPI:
+    """The three routes as they were: ORM objects through response_model."""
+    app = FastAPI()
+
+    @app.get("/api/schools/", response_model=schemas.SchoolListResponse)
+    def list_schools(page: int = 1, page_size: int = 20, db: Session = Depends(get_db)):
+        total, results = crud.list_schools(db, skip=(page - 1) * page_size, limit=page_size)
+        return {"total": total, "page": page, "page_size": page_size, "results": results}
+
+    @app.get("/api/schools/staging/list", response_model=List[schemas.StagingOut])
+    def list_staging(skip: int = 0, limit: int = 200, db: Session = Depends(get_db)):
+        return crud.list_staging(db, skip=skip, limit=limit)
+
+    @app.get("/api/teachers/all", response_model=List[teachers.Teacher])
+    def list_all_teachers(db: Session = Depends(get_db)):
+        return crud.list_all_teachers(db)
+
+    return app
+
+
+def fast_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(schools.router, prefix="/api/schools")
+    app.include_router(teachers.router, prefix="/api/teachers")
+    return app
+
+
+async def _drive(app, url: str, requests: int) -> tuple:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(10):  # warm up
+            (await client.get(url)).raise_for_status()
+        cpu = time.process_time()
+        for _ in range(requests):
+            response = await client.get(url)
+        cpu = time.process_time() - cpu
+        return cpu / requests * 1000, len(response.content)
+
+
+def run(requests: int = 200, scale: float = 0.02) -> dict:
+    """Return {endpoint: {stack: (cpu ms per request, response bytes)}}."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False}
+        )
+        datagen.generate(engine, datagen.DatasetSize().scaled(scale), log=lambda *a: None)
+        # Staging rows look like imported schools awaiting review
+        with engine.begin() as conn:
+            conn.execute(
+                insert(models.StagingSchool),
+                [{**row, "status": "staging"} for row in datagen._schools(random.Random(1), 500)],
+            )
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def override_get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        admin = SimpleNamespace(id=1, is_admin=True, is_active=True)
+        results = {name: {} for name in ENDPOINTS}
+        try:
+            for stack, factory in (("default", default_app), ("fast", fast_app)):
+                app = factory()
+                app.dependency_overrides[get_db] = override_get_db
+                app.dependency_overrides[get_current_user] = lambda: admin
+                app.dependency_overrides[get_current_admin_user] = lambda: admin
+                for name, url in ENDPOINTS.items():
+                    results[name][stack] = asyncio.run(_drive(app, url, requests))
+        finally:
+            engine.dispose()
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List endpoint serialization benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--scale", type=float, default=0.02, help="datagen dataset scale")
+    args = parser.parse_args()
+
+    results = run(args.requests, args.scale)
+    print(f"CPU ms per request (mean of {args.requests})")
+    for name, stacks in results.items():
+        (before, size), (after, _) = stacks["default"], stacks["fast"]
+        print(
+            f"  {name:<20} default {before:7.2f}  fast {after:7.2f}  "
+            f"({before / after:4.2f}x, {size / 1024:.0f} KiB)"
+        )
+
+
+if __name__ == "__main__":
+    main()
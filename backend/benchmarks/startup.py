@@ -0,0 +1,86 @@
+"""
+Cold-start benchmark: import, app construction, startup hooks and first request.
+
+Each run boots a fresh interpreter against a migrated SQLite database,
+imports main, runs the startup hooks and serves one request through
+TestClient, then prints the worker's startup report (see startup.py). The
+median of each phase is reported, together with the time the old
+create_all-on-startup took against the same database for comparison.
+
+Run from the `backend` directory as:
+    python -m benchmarks.startup [--runs 5] [--path /api/schools/]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+
+from migrations import bootstrap
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, sys, time
+from fastapi.testclient import TestClient
+import main, db
+from startup import REPORT
+
+start = time.perf_counter()
+db.Base.metadata.create_all(bind=db.engine)
+create_all = time.perf_counter() - start
+with TestClient(main.app) as client:
+    client.get(sys.argv[1]).raise_for_status()
+print(json.dumps({**REPORT.as_dict()["phases_ms"], "create_all": round(create_all * 1000, 2)}))
+"""
+
+
+def run(runs: int = 5, path: str = "/api/schools/") -> dict:
+    """Boot `runs` fresh workers and return {phase: median ms}."""
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/startup.db"
+        engine = create_engine(url)
+        bootstrap(engine, log=lambda *a: None)
+        engine.dispose()
+
+        env = {**os.environ, "DATABASE_URL": url, "ACCESS_LOG_ENABLED": "0"}
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            out = subprocess.run(
+                [sys.executable, "-c", CHILD, path],
+                cwd=BACKEND_DIR,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            phases = json.loads(out.stdout.strip().splitlines()[-1])
+            phases["process"] = round((time.perf_counter() - start) * 1000, 2)
+            samples.append(phases)
+    return {phase: statistics.median(s[phase] for s in samples) for phase in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/api/schools/", help="First request to serve")
+    args = parser.parse_args()
+
+    results = run(args.runs, args.path)
+    print(f"Median of {args.runs} cold starts (first request: GET {args.path})")
+    for phase in ("import", "app", "startup", "first_request", "process"):
+        print(f"  {phase:<14} {results[phase]:8.1f} ms")
+    print(f"  create_all on startup (removed) would add {results['create_all']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
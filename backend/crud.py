@@ -1,7 +1,14 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from typing import Optional, List
+import base64
+import re
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import or_, and_, select, insert, update, delete, func, literal, bindparam
+from typing import Iterable, Optional, List, Sequence
 import models
+import page_cache
+import revenue
 import schemas
 
 
@@ -18,6 +25,7 @@ def list_schools(
     status: Optional[str] = None,
     search: Optional[str] = None,
     location: Optional[str] = None,
+    columns: Optional[Sequence] = None,
 ):
     """
     List schools with optional filtering.
@@ -31,11 +39,12 @@ def list_schools(
         status: Filter by publication status (default: published)
         search: Search in school name
         location: Search in address
+        columns: Select only these School columns and return rows instead of objects
 
     Returns:
         Tuple of (total_count, results)
     """
-    query = db.query(models.School)
+    query = db.query(*columns) if columns else db.query(models.School)
 
     # Default to published schools only
     if status is None:
@@ -69,6 +78,7 @@ def create_school(db: Session, school: schemas.SchoolCreate):
     db_obj = models.School(**school.model_dump())
     db.add(db_obj)
     db.commit()
+    page_cache.invalidate_schools()
     db.refresh(db_obj)
     return db_obj
 
@@ -95,6 +105,7 @@ def update_school(db: Session, school_id: int, school_update: schemas.SchoolUpda
         setattr(db_school, field, value)
 
     db.commit()
+    page_cache.invalidate_schools()
     db.refresh(db_school)
     return db_school
 
@@ -116,11 +127,13 @@ def delete_school(db: Session, school_id: int):
 
     db.delete(db_school)
     db.commit()
+    page_cache.invalidate_schools()
     return True
 
 
-def list_staging(db: Session, skip: int = 0, limit: int = 200):
-    return db.query(models.StagingSchool).offset(skip).limit(limit).all()
+def list_staging(db: Session, skip: int = 0, limit: int = 200, columns: Optional[Sequence] = None):
+    query = db.query(*columns) if columns else db.query(models.StagingSchool)
+    return query.order_by(models.StagingSchool.id).offset(skip).limit(limit).all()
 
 
 def get_staging(db: Session, staging_id: int):
@@ -165,10 +178,110 @@ def accept_staging(db: Session, staging_id: int):
     # remove staging after adding main record
     db.delete(s)
     db.commit()
+    page_cache.invalidate_schools()
     db.refresh(db_obj)
     return db_obj
 
 
+# Columns copied verbatim from a staging row when it is promoted to a school.
+STAGING_PROMOTED_FIELDS = (
+    "name",
+    "type",
+    "curriculum",
+    "address",
+    "latitude",
+    "longitude",
+    "contact",
+    "website",
+    "fee_structure",
+    "facilities",
+    "photos",
+    "completeness_score",
+)
+
+
+def accept_staging_batch(
+    db: Session,
+    staging_ids: Optional[List[int]] = None,
+    min_score: Optional[int] = None,
+    status: Optional[str] = None,
+):
+    """
+    Promote many staging rows to published schools in one transaction.
+
+    Rows are copied with a single INSERT ... SELECT and removed with a single
+    DELETE instead of one get/insert/delete/commit per row. Accepted rows
+    leave the staging table, so repeating the call only matches what is
+    still pending and is safe to retry.
+
+    Args:
+        db: Database session
+        staging_ids: Restrict to these staging IDs
+        min_score: Minimum completeness score required
+        status: Restrict to staging rows with this status
+
+    Returns:
+        dict with requested, matched, accepted and removed counts
+    """
+    staging = models.StagingSchool
+    conditions = []
+    if staging_ids is not None:
+        conditions.append(staging.id.in_(staging_ids))
+    if min_score is not None:
+        conditions.append(staging.completeness_score >= min_score)
+    if status:
+        conditions.append(staging.status == status)
+
+    stats = {
+        "requested": len(staging_ids) if staging_ids is not None else None,
+        "matched": 0,
+        "accepted": 0,
+        "removed": 0,
+    }
+
+    matched, max_id = (
+        db.query(func.count(staging.id), func.max(staging.id))
+        .filter(*conditions)
+        .one()
+    )
+    if not matched:
+        return stats
+    stats["matched"] = matched
+
+    # Bound both statements by the highest matching id so rows staged
+    # concurrently are neither copied nor deleted by this run.
+    conditions.append(staging.id <= max_id)
+    source = (
+        select(
+            *(getattr(staging, field) for field in STAGING_PROMOTED_FIELDS),
+            literal("published"),
+        )
+        .where(*conditions)
+        .order_by(staging.id)
+    )
+
+    try:
+        inserted = db.execute(
+            insert(models.School).from_select(
+                [*STAGING_PROMOTED_FIELDS, "status"], source
+            )
+        )
+        removed = db.execute(
+            delete(staging)
+            .where(*conditions)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    page_cache.invalidate_schools()
+
+    stats["accepted"] = inserted.rowcount
+    stats["removed"] = removed.rowcount
+    return stats
+
+
 # ==================== REVIEW CRUD ====================
 
 
@@ -181,13 +294,33 @@ def create_review(db: Session, review: schemas.ReviewCreate, user_id: int):
     return db_obj
 
 
-def get_reviews_for_school(db: Session, school_id: int, status: str = "approved"):
-    """Get all reviews for a school by status."""
+def list_school_reviews(
+    db: Session, school_id: int, limit: int = 20, cursor: Optional[str] = None
+):
+    """
+    A school's approved reviews, newest first, one keyset page at a time.
+
+    Served by idx_review_school_status_created; see list_review_queue for
+    how pages seek.
+
+    Returns:
+        Tuple of (results, next_cursor or None on the last page)
+
+    Raises:
+        ValueError: Malformed cursor
+    """
+    Review = models.Review
+    query = db.query(Review).filter(Review.school_id == school_id, Review.status == "approved")
+    return _keyset_page(query, Review, limit, cursor)
+
+
+def get_school_review_summary(db: Session, school_id: int):
+    """Maintained rating stats of a school: (total_reviews, average_rating, rating_counts)."""
+    School = models.School
     return (
-        db.query(models.Review)
-        .filter(models.Review.school_id == school_id, models.Review.status == status)
-        .order_by(models.Review.created_at.desc())
-        .all()
+        db.query(School.total_reviews, School.average_rating, School.rating_counts)
+        .filter(School.id == school_id)
+        .first()
     )
 
 
@@ -201,10 +334,101 @@ def get_reviews_by_user(db: Session, user_id: int):
     )
 
 
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    """Opaque keyset cursor naming the last row of a page."""
+    raw = f"{row_id}|{created_at.isoformat() if created_at else ''}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """
+    Split a cursor from encode_cursor into (row_id, created_at).
+
+    Raises:
+        ValueError: Malformed cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        row_id, created_at = raw.split("|", 1)
+        return int(row_id), (datetime.fromisoformat(created_at) if created_at else None)
+    except (ValueError, UnicodeDecodeError) as e:  # binascii.Error is a ValueError
+        raise ValueError("Invalid cursor") from e
+
+
+def seek_after(model, cursor: str):
+    """
+    Condition for rows after `cursor` in (created_at desc, id desc) order.
+
+    The cursor row's created_at is read back from the table so stored values
+    are compared with stored values (SQLite keeps server-default timestamps
+    without the microseconds a bound datetime has). The timestamp carried in
+    the cursor is only used when that row has since been deleted.
+
+    Raises:
+        ValueError: Malformed cursor
+    """
+    row_id, created_at = decode_cursor(cursor)
+    anchor = func.coalesce(
+        select(model.created_at).where(model.id == row_id).scalar_subquery(), created_at
+    )
+    return or_(model.created_at < anchor, and_(model.created_at == anchor, model.id < row_id))
+
+
+def _keyset_page(query, model, limit: int, cursor: Optional[str]):
+    """Apply (created_at desc, id desc) order and seek; return (rows, next_cursor)."""
+    if cursor:
+        query = query.filter(seek_after(model, cursor))
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+
+def list_review_queue(
+    db: Session,
+    status: str = "pending",
+    school_id: Optional[int] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+):
+    """
+    Reviews in a status, newest first, one keyset page at a time.
+
+    Pages seek past the previous page's last (created_at, id) instead of
+    using OFFSET, so deep pages cost the same as the first and moderating
+    reviews between requests doesn't shift rows across pages.
+
+    Args:
+        db: Database session
+        status: Review status to list (served by idx_review_status_created)
+        school_id: Only reviews of this school
+        limit: Page size
+        cursor: next_cursor of the previous page
+
+    Returns:
+        Tuple of (total in status, results, next_cursor or None on the last page)
+
+    Raises:
+        ValueError: Malformed cursor
+    """
+    Review = models.Review
+    filters = [Review.status == status]
+    if school_id is not None:
+        filters.append(Review.school_id == school_id)
+    if cursor:
+        decode_cursor(cursor)  # reject a bad cursor before counting
+
+    total = db.query(func.count(Review.id)).filter(*filters).scalar()
+    rows, next_cursor = _keyset_page(db.query(Review).filter(*filters), Review, limit, cursor)
+    return total, rows, next_cursor
+
+
 def list_pending_reviews(db: Session, skip: int = 0, limit: int = 50):
-    """List all pending reviews for admin moderation."""
-    query = db.query(models.Review).filter(models.Review.status == "pending")
-    total = query.count()
+    """List all pending reviews for admin moderation, newest first."""
+    pending = models.Review.status == "pending"  # served by idx_review_status_created
+    query = db.query(models.Review).filter(pending)
+    total = db.query(func.count(models.Review.id)).filter(pending).scalar()
     results = (
         query.order_by(models.Review.created_at.desc()).offset(skip).limit(limit).all()
     )
@@ -217,18 +441,147 @@ def update_review_status(db: Session, review_id: int, status: str):
     if not review:
         return None
     review.status = status
+    db.flush()
+    refresh_school_rating_stats(db, [review.school_id])
     db.commit()
+    page_cache.invalidate_school_reviews([review.school_id])
     db.refresh(review)
     return review
 
 
+def update_review_statuses(
+    db: Session,
+    status: str,
+    review_ids: Optional[List[int]] = None,
+    school_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    current_status: Optional[str] = None,
+):
+    """
+    Set the status of many reviews in one transaction.
+
+    Matching reviews are changed with a single UPDATE ... RETURNING instead
+    of a fetch and commit per review, and the rating stats of every school
+    with a changed review are refreshed once, in one more statement.
+    Reviews already in `status` are left alone, so retrying is safe. The
+    cached first review pages of those schools are invalidated.
+
+    Args:
+        db: Database session
+        status: New status
+        review_ids: Restrict to these review IDs
+        school_id: Restrict to reviews of this school
+        user_id: Restrict to reviews by this user
+        current_status: Restrict to reviews currently in this status
+
+    Returns:
+        dict with requested, updated and schools counts
+    """
+    Review = models.Review
+    conditions = [Review.status != status]
+    if review_ids is not None:
+        conditions.append(Review.id.in_(review_ids))
+    if school_id is not None:
+        conditions.append(Review.school_id == school_id)
+    if user_id is not None:
+        conditions.append(Review.user_id == user_id)
+    if current_status:
+        conditions.append(Review.status == current_status)
+
+    try:
+        school_ids = (
+            db.execute(
+                update(Review)
+                .where(*conditions)
+                .values(status=status, updated_at=func.now())
+                .returning(Review.school_id)
+                .execution_options(synchronize_session=False)
+            )
+            .scalars()
+            .all()
+        )
+        refresh_school_rating_stats(db, school_ids)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    page_cache.invalidate_school_reviews(school_ids)
+
+    return {
+        "requested": len(review_ids) if review_ids is not None else None,
+        "updated": len(school_ids),
+        "schools": len(set(school_ids)),
+    }
+
+
+def refresh_school_rating_stats(db: Session, school_ids: Iterable[int]):
+    """
+    Recompute total_reviews, average_rating and rating_counts from approved reviews.
+
+    One grouped SELECT reads the per-star counts of all `school_ids` and one
+    executemany UPDATE writes each school's stats back. Runs in the
+    caller's transaction and does not commit.
+
+    The school rows are locked (in id order) before the counts are read, so
+    concurrent moderation of the same school takes turns and the second
+    transaction counts the first one's committed reviews.
+    """
+    school_ids = sorted(set(school_ids))
+    if not school_ids:
+        return
+    db.execute(
+        select(models.School.id)
+        .where(models.School.id.in_(school_ids))
+        .order_by(models.School.id)
+        .with_for_update()
+    ).all()
+    Review = models.Review
+    counts = {school_id: [0] * 5 for school_id in school_ids}
+    rows = (
+        db.query(Review.school_id, Review.rating, func.count(Review.id))
+        .filter(Review.school_id.in_(school_ids), Review.status == "approved")
+        .group_by(Review.school_id, Review.rating)
+    )
+    for school_id, rating, n in rows:
+        if 1 <= rating <= 5:
+            counts[school_id][rating - 1] = n
+
+    params = []
+    for school_id, histogram in counts.items():
+        total = sum(histogram)
+        rated = sum(stars * n for stars, n in enumerate(histogram, start=1))
+        params.append({
+            "school_id": school_id,
+            "total": total,
+            "average": rated / total if total else 0.0,
+            "histogram": histogram,
+        })
+    # Core UPDATE on the table: the ORM bulk form fails on deleted schools
+    schools = models.School.__table__
+    db.execute(
+        update(schools)
+        .where(schools.c.id == bindparam("school_id"))
+        .values(
+            total_reviews=bindparam("total"),
+            average_rating=bindparam("average"),
+            rating_counts=bindparam("histogram"),
+        ),
+        params,
+    )
+
+
 def delete_review(db: Session, review_id: int):
     """Delete a review."""
     review = db.query(models.Review).filter(models.Review.id == review_id).first()
     if not review:
         return False
+    school_id, approved = review.school_id, review.status == "approved"
     db.delete(review)
+    if approved:
+        db.flush()
+        refresh_school_rating_stats(db, [school_id])
     db.commit()
+    page_cache.invalidate_school_reviews([school_id])
     return True
 
 
@@ -274,9 +627,53 @@ def delete_favorite(db: Session, user_id: int, school_id: int):
     return True
 
 
+# Columns needed by schemas.SchoolSummary
+SCHOOL_SUMMARY_COLUMNS = (
+    models.School.id,
+    models.School.name,
+    models.School.type,
+    models.School.curriculum,
+    models.School.address,
+    models.School.photos,
+    models.School.average_rating,
+    models.School.total_reviews,
+)
+
+
 def get_user_favorites(db: Session, user_id: int):
-    """Get all favorite schools for a user."""
-    return db.query(models.Favorite).filter(models.Favorite.user_id == user_id).all()
+    """
+    Get a user's favorites, newest first, each with a summary of its school.
+
+    Schools are outer-joined in the same query (loading only
+    SCHOOL_SUMMARY_COLUMNS), so the favorites page needs no request per
+    school.
+
+    Returns:
+        List of (favorite, school) tuples; school is None if it was deleted
+    """
+    return (
+        db.query(models.Favorite, models.School)
+        .outerjoin(models.School, models.School.id == models.Favorite.school_id)
+        .options(load_only(*SCHOOL_SUMMARY_COLUMNS))
+        .filter(models.Favorite.user_id == user_id)
+        .order_by(models.Favorite.created_at.desc(), models.Favorite.id.desc())
+        .all()
+    )
+
+
+def favorited_school_ids(db: Session, user_id: int, school_ids: Iterable[int]) -> set:
+    """
+    Which of `school_ids` the user has saved, in one query.
+
+    Served by the (user_id, school_id) unique index.
+    """
+    school_ids = set(school_ids)
+    if not school_ids:
+        return set()
+    rows = db.query(models.Favorite.school_id).filter(
+        models.Favorite.user_id == user_id, models.Favorite.school_id.in_(school_ids)
+    )
+    return {school_id for (school_id,) in rows}
 
 
 def is_school_favorited(db: Session, user_id: int, school_id: int):
@@ -294,58 +691,89 @@ def is_school_favorited(db: Session, user_id: int, school_id: int):
 # ==================== POST CRUD ====================
 
 
-def create_post(db: Session, post: schemas.PostCreate, author_id: int):
-    """Create a new blog post with auto-generated slug."""
-    import re
-    from sqlalchemy.sql import func
+SLUG_RETRIES = 5  # attempts when a concurrent writer takes the chosen slug first
+
+
+def slugify(title: str) -> str:
+    """Lowercase a title and join its alphanumeric runs with hyphens."""
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")
 
-    # Generate slug from title
-    slug = re.sub(r"[^a-z0-9]+", "-", post.title.lower()).strip("-")
 
-    # Ensure slug uniqueness
-    base_slug = slug
+def next_free_slug(db: Session, base_slug: str, exclude_post_id: Optional[int] = None) -> str:
+    """
+    Return `base_slug`, or `base_slug-N` with the smallest free N, in one query.
+
+    All slugs equal to `base_slug` or starting with `base_slug-` are fetched
+    at once instead of probing slug-1, slug-2, ... one SELECT each. Slugs
+    only contain [a-z0-9-], so the LIKE pattern needs no escaping.
+
+    Args:
+        db: Database session
+        base_slug: Slug derived from the title
+        exclude_post_id: Post whose own slug doesn't count (when updating it)
+    """
+    query = db.query(models.Post.slug).filter(
+        or_(models.Post.slug == base_slug, models.Post.slug.like(f"{base_slug}-%"))
+    )
+    if exclude_post_id is not None:
+        query = query.filter(models.Post.id != exclude_post_id)
+    taken = {slug for (slug,) in query}
+
+    if base_slug not in taken:
+        return base_slug
     counter = 1
-    while db.query(models.Post).filter(models.Post.slug == slug).first():
-        slug = f"{base_slug}-{counter}"
+    while f"{base_slug}-{counter}" in taken:
         counter += 1
+    return f"{base_slug}-{counter}"
+
+
+def create_post(db: Session, post: schemas.PostCreate, author_id: int):
+    """
+    Create a new blog post with auto-generated slug.
+
+    If another request commits the same slug between the lookup and the
+    insert, the unique index rejects ours and a fresh slug is picked.
+
+    Raises:
+        IntegrityError: Still conflicting after SLUG_RETRIES attempts
+    """
+    base_slug = slugify(post.title)
 
     post_data = post.model_dump()
-    db_obj = models.Post(**post_data, author_id=author_id, slug=slug)
+    db_obj = models.Post(**post_data, author_id=author_id)
 
     # Set published_at if status is published
     if post.status == "published":
         db_obj.published_at = func.now()
 
-    db.add(db_obj)
-    db.commit()
+    for attempt in range(SLUG_RETRIES):
+        db_obj.slug = next_free_slug(db, base_slug)
+        db.add(db_obj)
+        try:
+            db.commit()
+            break
+        except IntegrityError:
+            db.rollback()
+            if attempt == SLUG_RETRIES - 1:
+                raise
     db.refresh(db_obj)
+    page_cache.invalidate_post(db_obj.slug)
     return db_obj
 
 
 def update_post(db: Session, post_id: int, post_update: schemas.PostUpdate):
-    """Update a blog post."""
-    import re
-    from sqlalchemy.sql import func
+    """
+    Update a blog post.
 
+    Raises:
+        IntegrityError: A regenerated slug still conflicts after SLUG_RETRIES attempts
+    """
     post = db.query(models.Post).filter(models.Post.id == post_id).first()
     if not post:
         return None
 
     update_data = post_update.model_dump(exclude_unset=True)
-
-    # Regenerate slug if title changed
-    if "title" in update_data:
-        slug = re.sub(r"[^a-z0-9]+", "-", update_data["title"].lower()).strip("-")
-        base_slug = slug
-        counter = 1
-        while (
-            db.query(models.Post)
-            .filter(models.Post.slug == slug, models.Post.id != post_id)
-            .first()
-        ):
-            slug = f"{base_slug}-{counter}"
-            counter += 1
-        update_data["slug"] = slug
+    old_slug = post.slug
 
     # Set published_at when first published
     if (
@@ -355,10 +783,24 @@ def update_post(db: Session, post_id: int, post_update: schemas.PostUpdate):
     ):
         update_data["published_at"] = func.now()
 
-    for field, value in update_data.items():
-        setattr(post, field, value)
+    for attempt in range(SLUG_RETRIES):
+        # Regenerate slug if title changed
+        if "title" in update_data:
+            update_data["slug"] = next_free_slug(
+                db, slugify(update_data["title"]), exclude_post_id=post_id
+            )
 
-    db.commit()
+        for field, value in update_data.items():
+            setattr(post, field, value)
+
+        try:
+            db.commit()
+            break
+        except IntegrityError:
+            db.rollback()
+            if "title" not in update_data or attempt == SLUG_RETRIES - 1:
+                raise
+    page_cache.invalidate_post(old_slug)
     db.refresh(post)
     return post
 
@@ -373,30 +815,75 @@ def get_post_by_slug(db: Session, slug: str):
     return db.query(models.Post).filter(models.Post.slug == slug).first()
 
 
+# Columns needed by schemas.PostListItem; list pages never load `content`
+POST_LIST_COLUMNS = (
+    models.Post.id,
+    models.Post.title,
+    models.Post.slug,
+    models.Post.excerpt,
+    models.Post.created_at,
+    models.Post.published_at,
+)
+
+
 def list_posts(
     db: Session, skip: int = 0, limit: int = 20, status: Optional[str] = "published"
 ):
-    """List blog posts with pagination and status filter."""
-    query = db.query(models.Post)
+    """
+    List blog posts with pagination and status filter.
 
-    if status:
-        query = query.filter(models.Post.status == status)
+    Only POST_LIST_COLUMNS are loaded; other attributes (such as the article
+    body) are fetched on access, one query per post.
+    """
+    filters = [models.Post.status == status] if status else []
 
-    total = query.count()
+    # count(id) rather than Query.count(), whose subquery selects every column
+    total = db.query(func.count(models.Post.id)).filter(*filters).scalar()
     results = (
-        query.order_by(models.Post.created_at.desc()).offset(skip).limit(limit).all()
+        db.query(models.Post)
+        .options(load_only(*POST_LIST_COLUMNS))
+        .filter(*filters)
+        .order_by(models.Post.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
     )
     return total, results
 
 
+def list_sitemap_entries(db: Session):
+    """
+    URLs for the sitemap: published schools and posts with their last change.
+
+    Returns:
+        Tuple of (school rows of (id, lastmod), post rows of (slug, lastmod))
+    """
+    School, Post = models.School, models.Post
+    schools = (
+        db.query(School.id, func.coalesce(School.updated_at, School.created_at))
+        .filter(School.status == "published")
+        .order_by(School.id)
+        .all()
+    )
+    posts = (
+        db.query(Post.slug, func.coalesce(Post.updated_at, Post.published_at, Post.created_at))
+        .filter(Post.status == "published")
+        .order_by(Post.created_at.desc())
+        .all()
+    )
+    return schools, posts
+
+
 def delete_post(db: Session, post_id: int):
     """Delete a blog post."""
     post = db.query(models.Post).filter(models.Post.id == post_id).first()
     if not post:
         return False
 
+    slug = post.slug
     db.delete(post)
     db.commit()
+    page_cache.invalidate_post(slug)
     return True
 
 
@@ -548,9 +1035,10 @@ def search_teachers(db: Session, filters, sort_by: str = "average_rating", sort_
     return query.offset(offset).limit(page_size).all()
 
 
-def list_all_teachers(db: Session):
-    """Return all teacher records (admin use)."""
-    return db.query(models.Teacher).order_by(models.Teacher.created_at.desc()).all()
+def list_all_teachers(db: Session, columns: Optional[Sequence] = None):
+    """Return all teacher records (admin use), or rows of only `columns`."""
+    query = db.query(*columns) if columns else db.query(models.Teacher)
+    return query.order_by(models.Teacher.created_at.desc()).all()
 
 
 def is_slot_available(db: Session, teacher_id: int, scheduled_date, start_time: str, duration_hours: float) -> bool:
@@ -705,6 +1193,7 @@ def create_booking(db: Session, booking_data):
     """Create a new booking."""
     db_booking = models.Booking(**booking_data)
     db.add(db_booking)
+    revenue.refresh(db, [(db_booking.teacher_id, db_booking.scheduled_date)])
     db.commit()
     db.refresh(db_booking)
     return db_booking
@@ -717,7 +1206,9 @@ def get_booking_by_id(db: Session, booking_id: int):
 
 def get_user_bookings(db: Session, user_id: int, status_filter: str = None, page: int = 1, page_size: int = 20):
     """Get bookings for a user (as parent or teacher)."""
-    query = db.query(models.Booking).join(models.Teacher).filter(
+    query = db.query(models.Booking).join(
+        models.Teacher, models.Teacher.id == models.Booking.teacher_id
+    ).filter(
         or_(
             models.Booking.parent_id == user_id,
             models.Teacher.user_id == user_id
@@ -746,6 +1237,7 @@ def update_booking(db: Session, booking_id: int, booking_data):
                 booking.completed_at = None
             elif booking_data.status == "cancelled" and not booking.cancelled_at:
                 booking.cancelled_at = None
+            revenue.refresh(db, [(booking.teacher_id, booking.scheduled_date)])
 
         db.commit()
         db.refresh(booking)
@@ -760,6 +1252,7 @@ def cancel_booking(db: Session, booking_id: int, cancellation_reason: str = None
         booking.cancelled_at = None
         if cancellation_reason:
             booking.teacher_notes = f"Cancellation reason: {cancellation_reason}"
+        revenue.refresh(db, [(booking.teacher_id, booking.scheduled_date)])
         db.commit()
         return True
     return False
@@ -792,4 +1285,100 @@ def get_available_slots(db: Session, teacher_id: int, date):
 
     # Calculate available slots (this is a simplified version)
     # TODO: Implement proper availability calculation
-    return availability
\ No newline at end of file
+    return availability
+
+# ==================== JOB CRUD ====================
+
+
+def create_job(
+    db: Session,
+    job_type: str,
+    params: Optional[dict] = None,
+    idempotency_key: Optional[str] = None,
+    created_by: Optional[int] = None,
+):
+    """
+    Queue a background job, reusing an existing job with the same key.
+
+    Returns:
+        Tuple of (job, created)
+    """
+    from sqlalchemy.exc import IntegrityError
+
+    if idempotency_key:
+        existing = get_job_by_idempotency_key(db, idempotency_key)
+        if existing:
+            return existing, False
+
+    job = models.Job(
+        job_type=job_type,
+        params=params or {},
+        idempotency_key=idempotency_key,
+        created_by=created_by,
+        status="queued",
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request queued the same key concurrently
+        db.rollback()
+        return get_job_by_idempotency_key(db, idempotency_key), False
+    db.refresh(job)
+    return job, True
+
+
+def get_job(db: Session, job_id: int):
+    """Get a job by ID."""
+    return db.query(models.Job).filter(models.Job.id == job_id).first()
+
+
+def get_job_by_idempotency_key(db: Session, idempotency_key: str):
+    """Get the job queued under an idempotency key."""
+    return (
+        db.query(models.Job)
+        .filter(models.Job.idempotency_key == idempotency_key)
+        .first()
+    )
+
+
+def list_jobs(
+    db: Session,
+    status: Optional[str] = None,
+    job_type: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+):
+    """List jobs, newest first."""
+    query = db.query(models.Job)
+    if status:
+        query = query.filter(models.Job.status == status)
+    if job_type:
+        query = query.filter(models.Job.job_type == job_type)
+    return query.order_by(models.Job.id.desc()).offset(skip).limit(limit).all()
+
+
+def cancel_job(db: Session, job_id: int):
+    """
+    Cancel a job.
+
+    Queued jobs are cancelled immediately; running jobs are flagged and stop
+    at their next progress report.
+    """
+    job = get_job(db, job_id)
+    if not job:
+        return None
+    # Guard on status so a job claimed by a worker meanwhile is not
+    # flipped straight to cancelled while it runs.
+    jobs = db.query(models.Job).filter(models.Job.id == job_id)
+    cancelled = jobs.filter(models.Job.status == "queued").update(
+        {"status": "cancelled", "finished_at": func.now()},
+        synchronize_session=False,
+    )
+    if not cancelled:
+        jobs.filter(models.Job.status == "running").update(
+            {"cancel_requested": True}, synchronize_session=False
+        )
+    db.commit()
+    db.refresh(job)
+    return job
@@ -299,6 +299,8 @@ def import_from_csv(path: str, dry_run: bool = False, staging: bool = False):
 
     print(f'{"=" * 60}\n')
 
+    return {"created": created, "skipped": skipped, "validation_errors": validation_errors}
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Import schools from CSV")
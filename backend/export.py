@@ -0,0 +1,234 @@
+"""
+Streaming export of school rows to CSV, JSON Lines or Parquet.
+
+Rows are read with a column-only SELECT using `yield_per`, which turns on
+server-side cursors on PostgreSQL, and are encoded one batch at a time.
+Memory use therefore depends on the batch size, not on the table size.
+The same generators back both the CLI script and the admin HTTP endpoint.
+"""
+
+import csv
+import functools
+import io
+import json
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import models
+
+
+DEFAULT_COLUMNS = (
+    "id",
+    "name",
+    "type",
+    "curriculum",
+    "address",
+    "latitude",
+    "longitude",
+    "contact",
+    "website",
+    "status",
+    "completeness_score",
+)
+
+EXPORT_TABLES = {
+    "schools": models.School,
+    "staging_schools": models.StagingSchool,
+}
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ExportError(ValueError):
+    """Raised for an unknown table, column or format, or a missing library."""
+
+
+def iter_school_batches(
+    db: Session,
+    table: str = "schools",
+    status: Optional[str] = None,
+    columns: Sequence[str] = DEFAULT_COLUMNS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[list]:
+    """
+    Yield lists of row tuples from `table`, ordered by id.
+
+    Args:
+        db: Database session
+        table: 'schools' or 'staging_schools'
+        status: Only export rows with this status (default: all rows)
+        columns: Column names to select
+        batch_size: Rows fetched per round trip
+
+    Yields:
+        Lists of at most `batch_size` tuples in `columns` order
+    """
+    model = EXPORT_TABLES.get(table)
+    if model is None:
+        raise ExportError(f"Unknown table: {table}")
+    unknown = [c for c in columns if c not in model.__table__.columns]
+    if unknown:
+        raise ExportError(f"Unknown columns: {', '.join(unknown)}")
+
+    stmt = select(*(getattr(model, c) for c in columns)).order_by(model.id)
+    if status:
+        stmt = stmt.where(model.status == status)
+
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    try:
+        for partition in result.partitions():
+            yield partition
+    finally:
+        result.close()
+
+
+def _csv_chunks(batches, columns) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def _jsonl_chunks(batches, columns) -> Iterator[bytes]:
+    for batch in batches:
+        lines = (
+            json.dumps(dict(zip(columns, row)), default=str, ensure_ascii=False)
+            for row in batch
+        )
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to the caller.
+
+    Parquet writers record byte offsets via tell(), so the position keeps
+    counting even though the buffered bytes are drained after each batch.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+@functools.lru_cache(maxsize=1)
+def _pyarrow():
+    """pyarrow with its parquet module, or None; imported on the first Parquet export."""
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except Exception:
+        return None
+    return pyarrow
+
+
+def _parquet_chunks(batches, columns) -> Iterator[bytes]:
+    pyarrow = _pyarrow()
+    if pyarrow is None:
+        raise ExportError("Parquet export requires the 'pyarrow' package")
+
+    sink = _ChunkSink()
+    writer = None
+    for batch in batches:
+        # Each batch becomes one row group; the schema is inferred from the
+        # first batch and later batches are cast to it.
+        table = pyarrow.Table.from_pylist([dict(zip(columns, row)) for row in batch])
+        if writer is None:
+            writer = pyarrow.parquet.ParquetWriter(sink, table.schema)
+        else:
+            table = table.cast(writer.schema)
+        writer.write_table(table)
+        yield sink.drain()
+
+    if writer is None:
+        writer = pyarrow.parquet.ParquetWriter(
+            sink, pyarrow.schema([(c, pyarrow.string()) for c in columns])
+        )
+    writer.close()
+    yield sink.drain()
+
+
+_ENCODERS = {
+    "csv": _csv_chunks,
+    "jsonl": _jsonl_chunks,
+    "parquet": _parquet_chunks,
+}
+
+
+def stream_export(
+    db: Session,
+    fmt: str = "csv",
+    table: str = "schools",
+    status: Optional[str] = None,
+    columns: Sequence[str] = DEFAULT_COLUMNS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """
+    Encode an export as a stream of byte chunks, one per fetched batch.
+
+    Arguments are validated eagerly so callers can report errors before
+    the first chunk is sent.
+
+    Raises:
+        ExportError: Unknown format, table or column, or pyarrow missing
+    """
+    encoder = _ENCODERS.get(fmt)
+    if encoder is None:
+        raise ExportError(f"Unknown format: {fmt}")
+    if fmt == "parquet" and _pyarrow() is None:
+        raise ExportError("Parquet export requires the 'pyarrow' package")
+    columns = tuple(columns)
+    batches = iter_school_batches(db, table, status, columns, batch_size)
+    # Prime the generator so table/column errors surface here.
+    first = next(batches, None)
+
+    def all_batches():
+        if first is not None:
+            yield first
+            yield from batches
+
+    return encoder(all_batches(), columns)
+
+
+def write_export(db: Session, path, fmt: str = "csv", **kwargs) -> int:
+    """
+    Stream an export to a file.
+
+    Returns:
+        Number of bytes written
+    """
+    written = 0
+    with open(path, "wb") as fh:
+        for chunk in stream_export(db, fmt, **kwargs):
+            fh.write(chunk)
+            written += len(chunk)
+    return written
@@ -0,0 +1,358 @@
+"""
+Database-backed background jobs for long-running admin operations.
+
+Jobs are rows in the `jobs` table. The admin API queues them and worker
+processes (`python -m scripts.job_worker`) claim and run them, so staging
+acceptance, rescoring, website verification and imports never tie up a
+request worker. Handlers receive a JobContext for progress reporting and
+cooperative cancellation.
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+import models
+from db import SessionLocal
+
+
+JOB_LEASE = timedelta(minutes=15)  # running jobs silent this long are presumed dead
+HEARTBEAT_INTERVAL = 60.0  # seconds between heartbeats of a running job
+PROGRESS_INTERVAL = 1.0  # minimum seconds between progress writes
+MAX_ATTEMPTS = 3  # claims allowed before a repeatedly lost job is failed
+IMPORT_DIR = Path(
+    os.getenv("IMPORT_DIR", Path(__file__).resolve().parent / "etl")
+).resolve()
+
+JOB_TYPES: Dict[str, Callable] = {}
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when an admin cancelled the running job."""
+
+
+class InvalidJob(ValueError):
+    """Raised when a job type is unknown or its params don't fit the handler."""
+
+
+def register_job(name: str):
+    """Register a handler as job type `name`.
+
+    Handlers are called as handler(ctx, **params) and should return a
+    JSON-serialisable result.
+    """
+
+    def decorator(fn):
+        JOB_TYPES[name] = fn
+        return fn
+
+    return decorator
+
+
+def validate_job(job_type: str, params: Optional[dict]) -> None:
+    """Check that `params` can be passed to the handler for `job_type`."""
+    handler = JOB_TYPES.get(job_type)
+    if handler is None:
+        raise InvalidJob(f"Unknown job type: {job_type}")
+    try:
+        inspect.signature(handler).bind(None, **(params or {}))
+    except TypeError as e:
+        raise InvalidJob(f"Invalid params for {job_type}: {e}")
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobContext:
+    """Handed to job handlers: a DB session plus progress/cancel hooks.
+
+    Progress is written through a separate short-lived session so it is
+    visible while the handler's own transaction is still open. Writes are
+    throttled to PROGRESS_INTERVAL, and each write also checks whether
+    cancellation was requested.
+    """
+
+    def __init__(self, job_id: int, db: Session, session_factory=SessionLocal):
+        self.job_id = job_id
+        self.db = db
+        self._session_factory = session_factory
+        self._last_write = 0.0
+
+    def report(
+        self,
+        progress: Optional[int] = None,
+        message: Optional[str] = None,
+        force: bool = False,
+    ) -> None:
+        """Record progress (0-100) and raise JobCancelled if requested."""
+        now = time.monotonic()
+        if not force and now - self._last_write < PROGRESS_INTERVAL:
+            return
+        self._last_write = now
+
+        values = {models.Job.heartbeat_at: _now()}
+        if progress is not None:
+            values[models.Job.progress] = max(0, min(100, int(progress)))
+        if message is not None:
+            values[models.Job.progress_message] = message[:255]
+
+        s = self._session_factory()
+        try:
+            s.query(models.Job).filter(models.Job.id == self.job_id).update(
+                values, synchronize_session=False
+            )
+            s.commit()
+            cancel = (
+                s.query(models.Job.cancel_requested)
+                .filter(models.Job.id == self.job_id)
+                .scalar()
+            )
+        except Exception:
+            # Progress is best effort (e.g. SQLite busy with the handler's write)
+            s.rollback()
+            cancel = False
+        finally:
+            s.close()
+        if cancel:
+            raise JobCancelled()
+
+    def check_cancelled(self) -> None:
+        """Raise JobCancelled now if cancellation was requested."""
+        self.report(force=True)
+
+
+def _recover_lost_jobs(db: Session) -> None:
+    """Requeue running jobs whose worker stopped heartbeating."""
+    lost = db.query(models.Job).filter(
+        models.Job.status == "running",
+        models.Job.heartbeat_at < _now() - JOB_LEASE,
+    )
+    lost.filter(models.Job.attempts >= MAX_ATTEMPTS).update(
+        {
+            "status": "failed",
+            "error": "Worker lost too many times",
+            "finished_at": _now(),
+        },
+        synchronize_session=False,
+    )
+    lost.filter(models.Job.attempts < MAX_ATTEMPTS).update(
+        {"status": "queued", "worker_id": None}, synchronize_session=False
+    )
+
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[models.Job]:
+    """
+    Atomically claim the oldest queued job for `worker_id`.
+
+    The claim is a conditional UPDATE on status='queued', so when several
+    workers race for the same row exactly one wins; losers try the next one.
+    """
+    _recover_lost_jobs(db)
+    db.commit()
+
+    for _ in range(5):
+        job_id = (
+            db.query(models.Job.id)
+            .filter(models.Job.status == "queued")
+            .order_by(models.Job.id)
+            .limit(1)
+            .scalar()
+        )
+        if job_id is None:
+            return None
+        now = _now()
+        claimed = (
+            db.query(models.Job)
+            .filter(models.Job.id == job_id, models.Job.status == "queued")
+            .update(
+                {
+                    "status": "running",
+                    "worker_id": worker_id,
+                    "started_at": now,
+                    "heartbeat_at": now,
+                    "attempts": models.Job.attempts + 1,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed:
+            return db.get(models.Job, job_id)
+    return None
+
+
+def _heartbeat(job_id: int, session_factory, stop: threading.Event) -> None:
+    while not stop.wait(HEARTBEAT_INTERVAL):
+        s = session_factory()
+        try:
+            s.query(models.Job).filter(models.Job.id == job_id).update(
+                {"heartbeat_at": _now()}, synchronize_session=False
+            )
+            s.commit()
+        except Exception:
+            s.rollback()
+        finally:
+            s.close()
+
+
+def _finish(db: Session, job_id: int, status: str, **values) -> None:
+    values.update(status=status, finished_at=_now())
+    db.query(models.Job).filter(models.Job.id == job_id).update(
+        values, synchronize_session=False
+    )
+    db.commit()
+
+
+def run_job(job_id: int, session_factory=SessionLocal) -> str:
+    """
+    Execute a claimed job and record its outcome.
+
+    Returns:
+        Final job status
+    """
+    db = session_factory()
+    stop = threading.Event()
+    beat = threading.Thread(
+        target=_heartbeat, args=(job_id, session_factory, stop), daemon=True
+    )
+    beat.start()
+    try:
+        job = db.get(models.Job, job_id)
+        handler = JOB_TYPES.get(job.job_type)
+        params = dict(job.params or {})
+        ctx = JobContext(job_id, db, session_factory)
+        try:
+            if handler is None:
+                raise InvalidJob(f"Unknown job type: {job.job_type}")
+            result = handler(ctx, **params)
+        except JobCancelled:
+            db.rollback()
+            _finish(db, job_id, "cancelled")
+            return "cancelled"
+        except Exception:
+            db.rollback()
+            _finish(db, job_id, "failed", error=traceback.format_exc()[-4000:])
+            return "failed"
+
+        # Round-trip through JSON so dates and other objects are stored as text
+        result = json.loads(json.dumps(result, default=str))
+        _finish(db, job_id, "succeeded", result=result, progress=100)
+        return "succeeded"
+    finally:
+        stop.set()
+        db.close()
+
+
+def run_next_job(
+    worker_id: Optional[str] = None, session_factory=SessionLocal
+) -> Optional[int]:
+    """Claim and run one job. Returns its ID, or None if the queue was empty."""
+    db = session_factory()
+    try:
+        job = claim_next_job(db, worker_id or default_worker_id())
+        job_id = job.id if job else None
+    finally:
+        db.close()
+    if job_id is not None:
+        run_job(job_id, session_factory)
+    return job_id
+
+
+# ==================== BUILT-IN JOB TYPES ====================
+# Script modules are imported inside the handlers so the API process does
+# not pay for aiohttp/rapidfuzz imports it never uses.
+
+
+@register_job("accept_staging")
+def accept_staging_job(ctx: JobContext, min_score: int = 70):
+    """Promote staging schools scoring at least `min_score`."""
+    from scripts.batch_staging import batch_accept_staging
+
+    ctx.report(0, f"Accepting staging schools with score >= {min_score}", force=True)
+    return batch_accept_staging(ctx.db, min_score)
+
+
+@register_job("rescore_completeness")
+def rescore_completeness_job(ctx: JobContext, tables=("schools", "staging_schools")):
+    """Recompute completeness scores for the given tables."""
+    from scripts.data_quality import update_all_scores
+
+    results = {}
+    for i, table in enumerate(tables):
+        ctx.report(i * 100 // len(tables), f"Rescoring {table}", force=True)
+        results[table] = update_all_scores(ctx.db, table)
+    return results
+
+
+@register_job("verify_websites")
+def verify_websites_job(ctx: JobContext, stale_days: float = 7, recheck_all: bool = False):
+    """Re-check stale school websites."""
+    from scripts import verify_websites
+
+    def progress(stats):
+        ctx.report(message=f"Checked {stats['checked']} websites")
+
+    stale_after = None if recheck_all else timedelta(days=stale_days)
+    return asyncio.run(verify_websites.async_main(stale_after, progress=progress))
+
+
+@register_job("import_schools")
+def import_schools_job(
+    ctx: JobContext, path: str, dry_run: bool = False, staging: bool = True
+):
+    """Import schools from a CSV file located under IMPORT_DIR."""
+    from etl.import_schools import import_from_csv
+
+    csv_path = (IMPORT_DIR / path).resolve()
+    if not csv_path.is_relative_to(IMPORT_DIR) or not csv_path.is_file():
+        raise InvalidJob(f"CSV not found in import directory: {path}")
+
+    ctx.report(0, f"Importing {csv_path.name}", force=True)
+    return import_from_csv(str(csv_path), dry_run=dry_run, staging=staging)
+
+
+@register_job("payout_run")
+def payout_run_job(ctx: JobContext, through_date: Optional[str] = None, concurrency: int = 8):
+    """Pay teachers for their completed, paid bookings (scheduled on or before through_date)."""
+    import payouts
+
+    ctx.report(0, "Collecting eligible bookings", force=True)
+    through = date.fromisoformat(through_date) if through_date else None
+    run = payouts.create_run(ctx.db, through_date=through)
+    ctx.report(5, f"Run {run.id}: {run.payout_count} payouts", force=True)
+
+    def progress(done, total):
+        ctx.report(5 + done * 95 // total, f"Submitted {done} of {total} transfers")
+
+    counts = payouts.submit_run(ctx.db, run.id, concurrency=concurrency, progress=progress)
+    return {
+        "run_id": run.id,
+        "payouts": run.payout_count,
+        "bookings": run.booking_count,
+        "total_amount": run.total_amount,
+        "statuses": counts,
+    }
+
+
+@register_job("rebuild_revenue")
+def rebuild_revenue_job(ctx: JobContext):
+    """Recompute the revenue_daily summary from every booking."""
+    import revenue
+
+    ctx.report(0, "Summing bookings", force=True)
+    return {"rows": revenue.rebuild(ctx.db)}
@@ -1,10 +1,22 @@
+# First import, so the "import" phase of the startup report covers the rest
+from startup import REPORT as STARTUP_REPORT, FirstRequestMiddleware
 import os
 import logging
+import time
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import db
-from api import schools, auth, reviews, favorites, posts, teachers, bookings, payments
-from api import test_helpers
+import migrations
+from access_log import AccessLogMiddleware, configure_access_log, stop_access_log
+from metrics import MetricsMiddleware, instrument_engine
+from middleware import CORSFallbackMiddleware
+import sql_profile
+from profiler import RequestSamplerMiddleware
+from api import schools, auth, reviews, favorites, posts, feeds, jobs
+from api import metrics as metrics_api, admin
+
+_app_start = time.perf_counter()
+STARTUP_REPORT.record("import", _app_start - STARTUP_REPORT.created_at)
 
 app = FastAPI(
     title="Doha Education Hub API",
@@ -18,8 +30,16 @@ logger = logging.getLogger("doha_backend")
 
 @app.on_event("startup")
 def on_startup():
-    # create local dev tables
-    db.Base.metadata.create_all(bind=db.engine)
+    # Schema changes run once per deploy in scripts/run_migrations.py; workers
+    # only check the revision (cached for the worker's lifetime).
+    with STARTUP_REPORT.phase("startup"):
+        migrations.verify_schema(db.engine)
+        configure_access_log()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_access_log()
 
 
 @app.get("/")
@@ -91,51 +111,31 @@ app.add_middleware(
 )
 
 
-# Fallback middleware: some deployment platforms (edge proxies or CDNs)
-# may strip or alter CORS headers. As a defensive measure, after the
-# response is generated ensure the Access-Control-Allow-Origin header is
-# present for requests with an Origin header that matches our allowed list.
-@app.middleware("http")
-async def ensure_cors_header(request, call_next):
-    response = await call_next(request)
-    origin = request.headers.get("origin")
-    try:
-            # TEMPORARY: For immediate diagnosis and to unblock frontend in production,
-            # set the `Access-Control-Allow-Origin` header to the request's Origin
-            # when present, even if it isn't in `origins`. This is a short-lived
-            # emergency measure and will be tightened after root cause is found.
-            if origin:
-                if "access-control-allow-origin" not in (k.lower() for k in response.headers.keys()):
-                    response.headers["Access-Control-Allow-Origin"] = origin
-                    response.headers["Access-Control-Allow-Credentials"] = "true"
-                    # Diagnostic log to help confirm middleware execution in deployed logs
-                    # Print and log a diagnostic message so it's visible in deployed logs
-                    try:
-                        print(f"CORS fallback applied: origin={origin} path={request.url.path}")
-                    except Exception:
-                        pass
-                    try:
-                        logger.warning("CORS fallback applied", extra={"origin": origin, "path": request.url.path})
-                    except Exception:
-                        pass
-    except Exception:
-        pass
-    return response
-
-
-# Diagnostic middleware: log request origin and final response headers for
-# every request to help determine whether headers are being set or stripped
-# further upstream. This is temporary and will be removed after verification.
-@app.middleware("http")
-async def log_request_and_response_headers(request, call_next):
-    response = await call_next(request)
-    try:
-        origin = request.headers.get("origin")
-        # Print a concise summary so logs remain readable
-        print(f"REQ_LOG: method={request.method} path={request.url.path} origin={origin} response_headers={list(response.headers.keys())}")
-    except Exception:
-        pass
-    return response
+# Fallback for platforms that strip CORS headers (see middleware.py).
+# TEMPORARY: echoes any request Origin back, even if it isn't in `origins`,
+# to unblock the frontend in production until the root cause is found.
+app.add_middleware(CORSFallbackMiddleware)
+
+# Slow-query log and admin X-Debug-Profile breakdown (see sql_profile.py).
+# Fed by the metrics engine events and per-request stats, so added inside them.
+sql_profile.instrument_engine(db.engine)
+app.add_middleware(sql_profile.SQLProfileMiddleware)
+
+# Request/SQL metrics served at /metrics
+instrument_engine(db.engine)
+app.add_middleware(MetricsMiddleware)
+
+# 1-in-N request profiling, off until PROFILE_SAMPLE_PATH or
+# PUT /api/admin/profile/sampling sets a path prefix (see profiler.py)
+app.add_middleware(RequestSamplerMiddleware)
+
+# Structured access log (pure ASGI, sampled, written off the request path).
+# Added last so it is the outermost layer and times the whole stack.
+if os.getenv("ACCESS_LOG_ENABLED", "1") != "0":
+    app.add_middleware(AccessLogMiddleware)
+
+# Times the worker's first request for the startup report (see startup.py)
+app.add_middleware(FirstRequestMiddleware)
 
 
 # Debug endpoint: only enabled in non-production environments to avoid exposing
@@ -167,9 +167,30 @@ app.include_router(auth.router)
 app.include_router(reviews.router, prefix="/api/reviews", tags=["reviews"])
 app.include_router(favorites.router, prefix="/api/favorites", tags=["favorites"])
 app.include_router(posts.router, prefix="/api/posts", tags=["posts"])
-app.include_router(teachers.router, prefix="/api/teachers", tags=["teachers"])
-app.include_router(bookings.router, prefix="/api/bookings", tags=["bookings"])
-app.include_router(payments.router, prefix="/api/payments", tags=["payments"])
+app.include_router(feeds.router, prefix="/api", tags=["feeds"])
+app.include_router(jobs.router, prefix="/api/admin/jobs", tags=["jobs"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(metrics_api.router)
+
+
+# Optional subsystems are imported only when enabled, so instances that
+# don't serve them skip their import cost on every cold start.
+# Teacher marketplace: teachers, bookings and Stripe payments (on by default)
+MARKETPLACE_ENABLED = os.getenv("ENABLE_MARKETPLACE", "1") != "0"
+# E2E test helpers (never in production); the endpoints also re-check the flag
+TEST_ENDPOINTS_ENABLED = os.getenv("ENABLE_TEST_ENDPOINTS") == "1"
+
+if MARKETPLACE_ENABLED:
+    from api import teachers, bookings, payments, payouts, reports
+
+    app.include_router(teachers.router, prefix="/api/teachers", tags=["teachers"])
+    app.include_router(bookings.router, prefix="/api/bookings", tags=["bookings"])
+    app.include_router(payments.router, prefix="/api/payments", tags=["payments"])
+    app.include_router(payouts.router, prefix="/api/admin/payouts", tags=["payouts"])
+    app.include_router(reports.router, prefix="/api/admin/reports", tags=["reports"])
+if TEST_ENDPOINTS_ENABLED:
+    from api import test_helpers
+
+    app.include_router(test_helpers.router)
 
-# Test helpers router is always included; endpoints are guarded by ENABLE_TEST_ENDPOINTS
-app.include_router(test_helpers.router)
+STARTUP_REPORT.record("app", time.perf_counter() - _app_start)
@@ -0,0 +1,374 @@
+"""
+In-process Prometheus metrics for the API.
+
+A small, dependency-free implementation of counters, gauges and histograms
+rendered in the Prometheus text exposition format (served at GET /metrics).
+Recording is a dict lookup and a few additions under a lock, cheap enough to
+leave on in production.
+
+What is collected:
+- HTTP requests by route template, method and status (count + latency)
+- In-flight requests
+- SQL statements per request and their total time (engine events)
+- SQL statement latency and compiled-statement cache hits/misses
+- Connection pool utilisation, sampled at scrape time
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, object] = {}
+
+    def _key(self, labels: dict) -> Tuple:
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield from self._samples(key, value)
+
+    def _samples(self, key, value) -> Iterable[str]:
+        yield f"{self.name}{_labels(self.labelnames, key)} {_fmt(value)}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        # Per-bucket (non-cumulative) counts; the +Inf slot is the last one
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def sum(self, **labels) -> float:
+        state = self._values.get(self._key(labels))
+        return state[1] if state else 0.0
+
+    def _samples(self, key, value) -> Iterable[str]:
+        counts, total, n = value[0][:], value[1], value[2]
+        cumulative = 0
+        for bound, c in zip(self.buckets + (float("inf"),), counts):
+            cumulative += c
+            le = 'le="' + _fmt(bound) + '"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+        yield f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}"
+        yield f"{self.name}_count{_labels(self.labelnames, key)} {n}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, fn) -> None:
+        """Register a callable run before each render (e.g. pool sampling)."""
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        for fn in self._collectors:
+            try:
+                fn()
+            except Exception:
+                pass
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(
+    Counter("http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+)
+HTTP_LATENCY = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route template",
+        ("method", "route", "status"),
+    )
+)
+HTTP_IN_FLIGHT = REGISTRY.register(
+    Gauge("http_requests_in_flight", "HTTP requests currently being served")
+)
+REQUEST_DB_STATEMENTS = REGISTRY.register(
+    Histogram(
+        "http_request_db_statements",
+        "SQL statements executed per request",
+        ("route",),
+        buckets=COUNT_BUCKETS,
+    )
+)
+REQUEST_DB_SECONDS = REGISTRY.register(
+    Histogram(
+        "http_request_db_seconds",
+        "Time spent in SQL per request",
+        ("route",),
+        buckets=DB_BUCKETS,
+    )
+)
+DB_STATEMENTS = REGISTRY.register(
+    Counter("db_statements_total", "SQL statements executed", ("operation",))
+)
+DB_LATENCY = REGISTRY.register(
+    Histogram(
+        "db_statement_duration_seconds", "SQL statement latency", ("operation",), DB_BUCKETS
+    )
+)
+CACHE_REQUESTS = REGISTRY.register(
+    Counter(
+        "cache_requests_total",
+        "Cache lookups by cache name and result (hit/miss)",
+        ("cache", "result"),
+    )
+)
+POOL_SIZE = REGISTRY.register(Gauge("db_pool_size", "Configured connection pool size"))
+POOL_CHECKED_OUT = REGISTRY.register(
+    Gauge("db_pool_checked_out", "Connections currently checked out of the pool")
+)
+POOL_OVERFLOW = REGISTRY.register(
+    Gauge("db_pool_overflow", "Connections open beyond the pool size")
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a lookup against an application cache."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+# ==================== PER-REQUEST DB ACCOUNTING ====================
+
+
+class RequestStats:
+    """
+    SQL totals for the current request, shared with threadpool workers.
+
+    `queries` (fingerprint -> [count, seconds]) stays None unless a
+    statement hook collects it for this request (see sql_profile.py).
+    """
+
+    __slots__ = ("scope", "statements", "db_seconds", "queries")
+
+    def __init__(self, scope=None):
+        self.scope = scope or {}
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.queries: Optional[dict] = None
+
+    @property
+    def route(self) -> Optional[str]:
+        """Route template of the request, or its path when no route matched."""
+        return getattr(self.scope.get("route"), "path", None) or self.scope.get("path")
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+# Called after every statement on instrumented engines as
+# hook(statement, elapsed_seconds, cursor, request_stats_or_None)
+_statement_hooks: List[Callable] = []
+
+
+def add_statement_hook(hook: Callable) -> None:
+    """Run `hook` after each statement, from the same engine event as the metrics."""
+    if hook not in _statement_hooks:
+        _statement_hooks.append(hook)
+
+
+def _operation(statement: str) -> str:
+    head = statement.lstrip()[:10].split(None, 1)
+    return head[0].upper() if head else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    op = _operation(statement)
+    DB_STATEMENTS.inc(operation=op)
+    DB_LATENCY.observe(elapsed, operation=op)
+
+    cache_hit = getattr(context, "cache_hit", None)
+    if cache_hit is not None:
+        name = getattr(cache_hit, "name", str(cache_hit))
+        if name in ("CACHE_HIT", "CACHE_MISS"):
+            record_cache("sql_compiled", name == "CACHE_HIT")
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+    for hook in _statement_hooks:
+        hook(statement, elapsed, cursor, stats)
+
+
+def instrument_engine(engine) -> None:
+    """Attach statement timing and pool sampling to a SQLAlchemy engine."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    pool = engine.pool
+
+    def sample_pool():
+        for gauge, attr in (
+            (POOL_SIZE, "size"),
+            (POOL_CHECKED_OUT, "checkedout"),
+            (POOL_OVERFLOW, "overflow"),
+        ):
+            fn = getattr(pool, attr, None)
+            if fn is not None:
+                # QueuePool.overflow() counts up from -size before the pool fills
+                gauge.set(max(0, fn()))
+
+    REGISTRY.add_collector(sample_pool)
+
+
+# ==================== ASGI MIDDLEWARE ====================
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency and SQL usage.
+
+    Routes are labelled by template (e.g. /api/schools/{school_id}), so
+    label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        stats = RequestStats(scope)
+        token = _request_stats.set(stats)
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            _request_stats.reset(token)
+
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            labels = {"method": scope["method"], "route": route, "status": str(status[0])}
+            HTTP_REQUESTS.inc(**labels)
+            HTTP_LATENCY.observe(elapsed, **labels)
+            REQUEST_DB_STATEMENTS.observe(stats.statements, route=route)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, route=route)
@@ -0,0 +1,58 @@
+"""
+Raw ASGI middleware used by the API app.
+
+These replace `@app.middleware("http")` functions: BaseHTTPMiddleware runs
+every request in an extra task and re-wraps the response body stream, which
+costs throughput and breaks streaming responses. Here headers are edited on
+the `http.response.start` message as it passes through `send`; bodies are
+never touched.
+"""
+
+import logging
+
+logger = logging.getLogger("doha_backend")
+
+ACAO = b"access-control-allow-origin"
+
+
+class CORSFallbackMiddleware:
+    """
+    Ensure cross-origin responses carry Access-Control-Allow-Origin.
+
+    Some deployment platforms (edge proxies or CDNs) strip or alter CORS
+    headers. When the request has an Origin header and the response does
+    not already allow it, echo the origin back with credentials allowed.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+                break
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                if not any(name.lower() == ACAO for name, _ in headers):
+                    headers.append((ACAO, origin))
+                    headers.append((b"access-control-allow-credentials", b"true"))
+                    message = {**message, "headers": headers}
+                    logger.debug(
+                        "CORS fallback applied: origin=%s path=%s",
+                        origin.decode("latin-1"),
+                        scope["path"],
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
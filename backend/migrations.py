@@ -0,0 +1,156 @@
+"""
+Schema bootstrap and the serve-time revision check.
+
+Schema changes are applied once per deploy by a one-shot command, never by
+the web workers:
+
+    python scripts/run_migrations.py
+
+Workers only compare the database's alembic_version with the head of
+alembic/versions, once per process (check_schema). With several workers
+booting at once this is a single indexed read each instead of every worker
+inspecting every table and racing on CREATE TABLE.
+"""
+
+import functools
+import logging
+import os
+import re
+from pathlib import Path
+
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger("doha_backend.schema")
+
+BACKEND_DIR = Path(__file__).resolve().parent
+VERSIONS_DIR = BACKEND_DIR / "alembic" / "versions"
+
+_REVISION_LINE = re.compile(
+    r"^(revision|down_revision)\b[^=\n]*=\s*(?:['\"](\w+)['\"]|None)", re.M
+)
+
+
+# The schema the old create_all on startup produced, before this
+# migration series; unstamped databases with tables are upgraded from it
+LEGACY_REVISION = "972641930c9c"
+
+
+class SchemaOutOfDate(RuntimeError):
+    """Raised at startup when the database is not at the head revision."""
+
+
+def _config(connection=None):
+    from alembic.config import Config
+
+    # No ini file: env.py then leaves logging alone and uses `connection`
+    cfg = Config()
+    cfg.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    if connection is not None:
+        cfg.attributes["connection"] = connection
+    return cfg
+
+
+@functools.lru_cache(maxsize=1)
+def head_revision() -> str:
+    """
+    The newest revision in alembic/versions.
+
+    Read from the revision files with a regex rather than through Alembic,
+    whose import alone costs more than the rest of the startup check.
+    """
+    revisions, parents = set(), set()
+    for path in VERSIONS_DIR.glob("*.py"):
+        for name, value in _REVISION_LINE.findall(path.read_text()):
+            if name == "revision":
+                revisions.add(value)
+            elif value:
+                parents.add(value)
+    heads = revisions - parents
+    if len(heads) != 1:
+        raise RuntimeError(f"Expected one Alembic head, found {sorted(heads)}")
+    return heads.pop()
+
+
+def current_revision(connection):
+    """The revision stamped in the database, or None if it has never been stamped."""
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def bootstrap(engine, log=logger.info) -> str:
+    """
+    Bring the database to the head revision.
+
+    - Stamped database: apply pending migrations.
+    - Empty database: create all tables from the models and stamp head
+      (the early migrations use ALTER statements SQLite cannot run).
+    - Tables but no alembic_version (created by the old create_all on
+      startup): stamp LEGACY_REVISION, the schema that create_all produced,
+      and apply every migration since. A failing migration rolls back the
+      stamp with it, so startup fails instead of serving a mismatched schema.
+
+    Returns:
+        The action taken: "upgraded", "created" or "stamped"
+    """
+    from alembic import command
+
+    import models  # noqa: F401  (registers every table on Base.metadata)
+    from db import Base
+
+    with engine.begin() as conn:
+        cfg = _config(conn)
+        revision = current_revision(conn)
+        if revision is not None:
+            log(f"Upgrading from {revision} to {head_revision()}...")
+            command.upgrade(cfg, "head")
+            return "upgraded"
+
+        if set(inspect(conn).get_table_names()) - {"alembic_version"}:
+            log(f"Upgrading existing schema from {LEGACY_REVISION} to {head_revision()}...")
+            command.stamp(cfg, LEGACY_REVISION)
+            command.upgrade(cfg, "head")
+            return "stamped"
+
+        Base.metadata.create_all(bind=conn)
+        command.stamp(cfg, "head")
+        log(f"Created schema at {head_revision()}")
+        return "created"
+
+
+@functools.lru_cache(maxsize=None)
+def check_schema(engine) -> dict:
+    """Compare the database revision with head, once per engine per process."""
+    with engine.connect() as conn:
+        current = current_revision(conn)
+    head = head_revision()
+    return {"current": current, "head": head, "up_to_date": current == head}
+
+
+def verify_schema(engine, mode: str = None) -> dict:
+    """
+    Startup check run by each worker.
+
+    Args:
+        engine: Engine the app serves from
+        mode: "strict" raises, "warn" logs, "off" skips. Defaults to
+            SCHEMA_CHECK, else strict in production and warn elsewhere.
+
+    Raises:
+        SchemaOutOfDate: In strict mode, when the database is not at head
+    """
+    if mode is None:
+        production = os.getenv("ENVIRONMENT", "development").lower() == "production"
+        mode = os.getenv("SCHEMA_CHECK", "strict" if production else "warn")
+    if mode == "off":
+        return {}
+    status = check_schema(engine)
+    if not status["up_to_date"]:
+        message = (
+            f"Database schema is at {status['current'] or 'no revision'}, "
+            f"expected {status['head']}; run `python scripts/run_migrations.py`"
+        )
+        if mode == "strict":
+            raise SchemaOutOfDate(message)
+        logger.warning(message)
+    return status
@@ -32,6 +32,12 @@ class School(Base):
     photos = Column(JSON, nullable=True)
     status = Column(String(50), default="pending")
     completeness_score = Column(Integer, default=0)  # 0-100 data quality score
+
+    # Approved reviews, maintained by crud.refresh_school_rating_stats
+    average_rating = Column(Float, default=0.0)
+    total_reviews = Column(Integer, default=0)
+    rating_counts = Column(JSON, nullable=True)  # [1-star, ..., 5-star] counts
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -69,6 +75,22 @@ class StagingSchool(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
 
+class WebsiteCheck(Base):
+    """Last website verification result for a school (one row per school)."""
+
+    __tablename__ = "website_checks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    school_id = Column(Integer, nullable=False, unique=True, index=True)
+    url = Column(String(300), nullable=True)  # website value the check applies to
+    checked_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    status_code = Column(Integer, nullable=True)  # None when no response was received
+    final_url = Column(String(500), nullable=True)  # after redirects
+    etag = Column(String(255), nullable=True)
+    is_reachable = Column(Boolean, default=False)
+    error = Column(String(255), nullable=True)
+
+
 class Review(Base):
     __tablename__ = "reviews"
 
@@ -83,6 +105,13 @@ class Review(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # Moderation queue: pending reviews, newest first
+        Index('idx_review_status_created', 'status', 'created_at'),
+        # Public feed: a school's approved reviews, newest first
+        Index('idx_review_school_status_created', 'school_id', 'status', 'created_at'),
+    )
+
 
 class Favorite(Base):
     __tablename__ = "favorites"
@@ -111,6 +140,11 @@ class Post(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     published_at = Column(DateTime(timezone=True), nullable=True)
 
+    __table_args__ = (
+        # Blog index: published posts, newest first
+        Index('idx_post_status_created', 'status', 'created_at'),
+    )
+
 
 class Teacher(Base):
     __tablename__ = "teachers"
@@ -257,11 +291,15 @@ class Booking(Base):
     completed_at = Column(DateTime(timezone=True), nullable=True)
     cancelled_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Payout that paid the teacher's share out (set by a payout run)
+    payout_id = Column(Integer, nullable=True, index=True)
+
     # Relationships for efficient queries
     __table_args__ = (
         Index('idx_booking_teacher_date', 'teacher_id', 'scheduled_date'),
         Index('idx_booking_parent_status', 'parent_id', 'status'),
         Index('idx_booking_status_date', 'status', 'scheduled_date'),
+        Index('idx_booking_payout_eligible', 'status', 'payment_status', 'payout_id'),
     )
 
 
@@ -310,4 +348,114 @@ class TeacherPayout(Base):
     status = Column(String(30), default="pending")  # pending/processing/paid/failed
     stripe_transfer_id = Column(String(255), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    processed_at = Column(DateTime(timezone=True), nullable=True)
\ No newline at end of file
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Set for payouts made by a payout run, which links the bookings paid out
+    run_id = Column(Integer, nullable=True, index=True)
+    booking_count = Column(Integer, default=0)
+    idempotency_key = Column(String(255), nullable=True, unique=True, index=True)
+    error = Column(Text, nullable=True)
+
+
+class PayoutRun(Base):
+    """A batch of teacher payouts covering all completed, paid bookings at the time."""
+
+    __tablename__ = "payout_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String(20), default="pending")  # pending/submitting/completed/partial/failed
+    through_date = Column(Date, nullable=True)  # only sessions scheduled on or before
+    payout_count = Column(Integer, default=0)
+    booking_count = Column(Integer, default=0)
+    total_amount = Column(Float, default=0.0)
+    created_by = Column(Integer, nullable=True)  # User ID
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class RevenueDaily(Base):
+    """Bookings summed per session day, teacher, subject, session type and status (revenue.py)."""
+
+    __tablename__ = "revenue_daily"
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)  # Booking.scheduled_date
+    week_start = Column(Date, nullable=False)  # Monday of the day's week
+    month_start = Column(Date, nullable=False)  # First of the day's month
+    teacher_id = Column(Integer, nullable=False)
+    subject = Column(String(100), nullable=False)
+    session_type = Column(String(20), nullable=False)
+    currency = Column(String(10), nullable=False)
+    status = Column(String(30), nullable=False)
+    payment_status = Column(String(20), nullable=False)
+
+    booking_count = Column(Integer, default=0)
+    hours = Column(Float, default=0.0)
+    gross_amount = Column(Float, default=0.0)  # sum of total_amount
+    commission_amount = Column(Float, default=0.0)
+    teacher_amount = Column(Float, default=0.0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            'teacher_id', 'day', 'subject', 'session_type', 'currency', 'status',
+            'payment_status', name='uq_revenue_daily_bucket',
+        ),
+        Index('idx_revenue_daily_day', 'day'),
+    )
+
+
+class Job(Base):
+    """Background job queued by an admin and executed by a worker process."""
+
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(100), nullable=False)
+    params = Column(JSON, nullable=True)
+    status = Column(String(20), default="queued")  # queued/running/succeeded/failed/cancelled
+    idempotency_key = Column(String(255), nullable=True, unique=True)
+    cancel_requested = Column(Boolean, default=False)
+
+    # Progress reported by the running job
+    progress = Column(Integer, default=0)  # 0-100
+    progress_message = Column(String(255), nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Execution bookkeeping
+    attempts = Column(Integer, default=0)
+    worker_id = Column(String(100), nullable=True)
+    created_by = Column(Integer, nullable=True)  # User ID
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('idx_job_status_id', 'status', 'id'),
+    )
+
+
+class PaymentEvent(Base):
+    """Stripe webhook event, recorded on receipt and applied by a worker."""
+
+    __tablename__ = "payment_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    stripe_event_id = Column(String(255), nullable=False, unique=True)
+    event_type = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    booking_id = Column(Integer, nullable=True, index=True)  # from the object's metadata
+    stripe_created = Column(Integer, nullable=False)  # Unix time the event was created at Stripe
+    status = Column(String(20), default="pending")  # pending/processing/processed/ignored/failed
+
+    # Processing bookkeeping
+    attempts = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('idx_payment_event_status_created', 'status', 'stripe_created', 'id'),
+    )
@@ -0,0 +1,118 @@
+"""
+In-process cache of rendered public pages: published posts, the sitemap
+and the blog feed.
+
+Entries are the encoded response bodies, so a hit costs a dict lookup and
+no database or serialization work. crud.py invalidates them when posts or
+schools change:
+
+    invalidate_post(slug)                     # that post's page, the sitemap and the feed
+    invalidate_schools()                      # the sitemap
+    invalidate_school_reviews(school_ids)     # first review pages of those schools
+
+Invalidation only reaches the worker that made the change; entries also
+expire after PAGE_CACHE_TTL seconds (default 300), which bounds how stale
+another worker's copy can get. PAGE_CACHE_TTL=0 disables the cache.
+Lookups are counted in cache_requests_total{cache="page"}.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
+
+import metrics
+
+SITEMAP = "sitemap"
+FEED = "feed"
+
+
+def _post_key(slug: str) -> str:
+    return f"post:{slug}"
+
+
+def _school_reviews_prefix(school_id: int) -> str:
+    return f"school_reviews:{school_id}:"
+
+
+class PageCache:
+    """A dict of rendered bodies with a TTL and a size bound, safe across threads."""
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 2000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, bytes]] = {}
+        self._generation = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        hit = entry is not None and entry[0] > time.monotonic()
+        metrics.record_cache("page", hit)
+        return entry[1] if hit else None
+
+    def get_or_render(self, key: str, render: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """
+        Return the cached body for `key`, rendering and storing it on a miss.
+
+        A body rendered while an invalidation ran is returned but not stored,
+        so it can't outlive the change that invalidated it. `render` may
+        return None (nothing to cache, e.g. not found).
+        """
+        body = self.get(key)
+        if body is not None:
+            return body
+        generation = self._generation
+        body = render()
+        if body is not None and self.ttl > 0:
+            with self._lock:
+                if generation == self._generation:
+                    if len(self._entries) >= self.max_entries:
+                        self._entries.clear()
+                    self._entries[key] = (time.monotonic() + self.ttl, body)
+        return body
+
+    def invalidate(self, *keys: str, prefix: Union[str, Tuple[str, ...], None] = None) -> None:
+        """Drop `keys` and every key starting with `prefix` (or any of several prefixes)."""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+            if prefix is not None:
+                for key in [k for k in self._entries if k.startswith(prefix)]:
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        self.invalidate(prefix="")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+CACHE = PageCache(ttl=float(os.getenv("PAGE_CACHE_TTL", "300")))
+
+
+def get_post(slug: str, render: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+    return CACHE.get_or_render(_post_key(slug), render)
+
+
+def invalidate_post(slug: Optional[str]) -> None:
+    keys = (SITEMAP, FEED) + ((_post_key(slug),) if slug else ())
+    CACHE.invalidate(*keys)
+
+
+def invalidate_schools() -> None:
+    CACHE.invalidate(SITEMAP)
+
+
+def get_school_reviews(
+    school_id: int, variant: str, render: Callable[[], Optional[bytes]]
+) -> Optional[bytes]:
+    """Cached first page of a school's reviews; `variant` names the query options."""
+    return CACHE.get_or_render(f"{_school_reviews_prefix(school_id)}{variant}", render)
+
+
+def invalidate_school_reviews(school_ids: Iterable[int]) -> None:
+    prefixes = tuple(_school_reviews_prefix(school_id) for school_id in set(school_ids))
+    if prefixes:
+        CACHE.invalidate(prefix=prefixes)
@@ -0,0 +1,261 @@
+"""
+Ledger of Stripe webhook events and the worker that applies them.
+
+The webhook only records each event in `payment_events` (keyed by the
+Stripe event id) and returns; applying it to bookings happens afterwards,
+in a background task of the same request or in a worker process
+(`python -m scripts.process_payment_events`). Stripe delivers at least
+once, so a retried delivery finds its row already there and is dropped.
+
+Pending events are applied oldest first (by Stripe's `created` time), and
+each handler is a conditional UPDATE that only moves a booking forward:
+a late `payment_failed` never undoes a payment that already succeeded, and
+applying the same event twice changes nothing the second time.
+"""
+
+import hashlib
+import json
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import models
+import revenue
+from db import SessionLocal
+
+
+EVENT_LEASE = timedelta(minutes=5)  # processing events older than this are presumed lost
+MAX_ATTEMPTS = 5  # failed applications before an event is left as 'failed'
+BATCH_SIZE = 100  # events applied per process_pending() call
+
+EVENT_HANDLERS: Dict[str, Callable] = {}
+
+# Payment states a booking never leaves because of a payment_intent event
+SETTLED = ("paid", "refunded")
+
+
+def register_event(event_type: str):
+    """Register a handler for Stripe events of `event_type`.
+
+    Handlers are called as handler(db, event) and return True if the event
+    applied to a booking, False if there was nothing to do.
+    """
+
+    def decorator(fn):
+        EVENT_HANDLERS[event_type] = fn
+        return fn
+
+    return decorator
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def event_id(event: dict) -> str:
+    """Stripe's event id, or a digest of the payload for events sent without one."""
+    if event.get("id"):
+        return str(event["id"])
+    digest = hashlib.sha256(json.dumps(event, sort_keys=True).encode()).hexdigest()
+    return f"evt_local_{digest[:32]}"
+
+
+def _booking_id(event: dict) -> Optional[int]:
+    obj = (event.get("data") or {}).get("object") or {}
+    value = (obj.get("metadata") or {}).get("booking_id")
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def record_event(db: Session, event: dict) -> Tuple[models.PaymentEvent, bool]:
+    """
+    Store a webhook event in the ledger unless it is already there.
+
+    Returns:
+        (ledger row, created) - created is False for a repeated delivery
+    """
+    stripe_event_id = event_id(event)
+    row = models.PaymentEvent(
+        stripe_event_id=stripe_event_id,
+        event_type=str(event.get("type") or ""),
+        payload=event,
+        booking_id=_booking_id(event),
+        stripe_created=int(event.get("created") or time.time()),
+        status="pending",
+        attempts=0,
+    )
+    db.add(row)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Unique stripe_event_id: another delivery of this event got here first
+        db.rollback()
+        existing = (
+            db.query(models.PaymentEvent)
+            .filter(models.PaymentEvent.stripe_event_id == stripe_event_id)
+            .one()
+        )
+        return existing, False
+    return row, True
+
+
+# ==================== PROCESSING ====================
+
+
+def _recover_lost_events(db: Session) -> None:
+    """Put back events whose processor died between claiming and finishing them."""
+    lost = db.query(models.PaymentEvent).filter(
+        models.PaymentEvent.status == "processing",
+        models.PaymentEvent.claimed_at < _now() - EVENT_LEASE,
+    )
+    lost.filter(models.PaymentEvent.attempts >= MAX_ATTEMPTS).update(
+        {"status": "failed", "error": "Processor lost too many times"},
+        synchronize_session=False,
+    )
+    lost.filter(models.PaymentEvent.attempts < MAX_ATTEMPTS).update(
+        {"status": "pending"}, synchronize_session=False
+    )
+    db.commit()
+
+
+def _claim_next(db: Session, skip: set) -> Optional[models.PaymentEvent]:
+    """
+    Atomically claim the oldest pending event not in `skip`.
+
+    The claim is a conditional UPDATE on status='pending', so concurrent
+    processors never apply the same event at the same time.
+    """
+    for _ in range(5):
+        query = db.query(models.PaymentEvent.id).filter(models.PaymentEvent.status == "pending")
+        if skip:
+            query = query.filter(models.PaymentEvent.id.notin_(skip))
+        next_id = (
+            query.order_by(models.PaymentEvent.stripe_created, models.PaymentEvent.id)
+            .limit(1)
+            .scalar()
+        )
+        if next_id is None:
+            return None
+        claimed = (
+            db.query(models.PaymentEvent)
+            .filter(models.PaymentEvent.id == next_id, models.PaymentEvent.status == "pending")
+            .update(
+                {
+                    "status": "processing",
+                    "claimed_at": _now(),
+                    "attempts": models.PaymentEvent.attempts + 1,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed:
+            return db.get(models.PaymentEvent, next_id)
+    return None
+
+
+def _finish(db: Session, event_pk: int, status: str, **values) -> None:
+    values.update(status=status, processed_at=_now())
+    db.query(models.PaymentEvent).filter(models.PaymentEvent.id == event_pk).update(
+        values, synchronize_session=False
+    )
+    db.commit()
+
+
+def apply_event(db: Session, row: models.PaymentEvent) -> str:
+    """
+    Apply a claimed event to its booking and record the outcome.
+
+    The booking change and the ledger status commit together, so an event
+    is never marked processed without its effect (or vice versa).
+
+    Returns:
+        Final event status: processed, ignored, pending (will retry) or failed
+    """
+    event_pk, attempts = row.id, row.attempts
+    handler = EVENT_HANDLERS.get(row.event_type)
+    if handler is None:
+        _finish(db, event_pk, "ignored")
+        return "ignored"
+    try:
+        applied = handler(db, row.payload)
+        status = "processed" if applied else "ignored"
+        _finish(db, event_pk, status, error=None)
+        return status
+    except Exception:
+        db.rollback()
+        status = "failed" if attempts >= MAX_ATTEMPTS else "pending"
+        db.query(models.PaymentEvent).filter(models.PaymentEvent.id == event_pk).update(
+            {"status": status, "error": traceback.format_exc()[-4000:]},
+            synchronize_session=False,
+        )
+        db.commit()
+        return status
+
+
+def process_pending(session_factory=SessionLocal, limit: int = BATCH_SIZE) -> Dict[str, int]:
+    """
+    Apply up to `limit` pending events, oldest first.
+
+    An event that fails goes back to pending for a later run (and to
+    'failed' after MAX_ATTEMPTS); it is not retried within the same run.
+
+    Returns:
+        Count of events per final status
+    """
+    counts: Dict[str, int] = {}
+    tried: set = set()
+    db = session_factory()
+    try:
+        _recover_lost_events(db)
+        while len(tried) < limit:
+            row = _claim_next(db, tried)
+            if row is None:
+                break
+            tried.add(row.id)
+            status = apply_event(db, row)
+            counts[status] = counts.get(status, 0) + 1
+    finally:
+        db.close()
+    return counts
+
+
+# ==================== EVENT HANDLERS ====================
+
+
+def _update_booking(db: Session, event: dict, values: dict) -> bool:
+    """Apply `values` to the event's booking unless its payment is already settled."""
+    booking_id = _booking_id(event)
+    if booking_id is None:
+        return False
+    updated = (
+        db.query(models.Booking)
+        .filter(
+            models.Booking.id == booking_id,
+            models.Booking.payment_status.notin_(SETTLED),
+        )
+        .update(values, synchronize_session=False)
+    )
+    if updated:
+        revenue.refresh_bookings(db, [booking_id])
+    return bool(updated)
+
+
+@register_event("payment_intent.succeeded")
+def payment_succeeded(db: Session, event: dict) -> bool:
+    return _update_booking(
+        db,
+        event,
+        {"payment_status": "paid", "status": "confirmed", "confirmed_at": _now()},
+    )
+
+
+@register_event("payment_intent.payment_failed")
+def payment_failed(db: Session, event: dict) -> bool:
+    return _update_booking(db, event, {"payment_status": "failed"})
@@ -0,0 +1,471 @@
+"""
+Payment provider calls behind a small gateway interface.
+
+Request handlers call get_gateway() instead of the Stripe SDK directly.
+StripeGateway reuses one pooled HTTP session, bounds every call with a
+connect and read timeout, and sends an idempotency key so a retried
+request can't create a second PaymentIntent. Both gateways go through a
+CircuitBreaker: after repeated timeouts or Stripe outages calls fail fast
+with GatewayUnavailable (served as 503) instead of each holding a worker
+thread for the full timeout.
+
+FakeGateway keeps intents in memory and answers like Stripe does, so the
+payment flow can be developed and load-tested offline. Configuration:
+
+    PAYMENT_GATEWAY           stripe (default) or fake
+    STRIPE_TIMEOUT            read timeout in seconds (default 10)
+    STRIPE_CONNECT_TIMEOUT    connect timeout in seconds (default 3)
+    STRIPE_MAX_RETRIES        network retries by the SDK (default 2)
+    STRIPE_POOL_SIZE          pooled connections to Stripe (default 20)
+    PAYMENT_BREAKER_FAILURES  consecutive failures that open the circuit (default 5)
+    PAYMENT_BREAKER_RESET     seconds before a trial call is let through (default 30)
+    FAKE_GATEWAY_LATENCY_MS   simulated Stripe latency of the fake (default 0)
+"""
+
+import abc
+import logging
+import os
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger("doha_backend.payments")
+
+
+class GatewayError(Exception):
+    """The provider rejected the request (invalid parameters, declined card, ...)."""
+
+
+class GatewayUnavailable(GatewayError):
+    """The provider timed out, failed or is shed by the open circuit; retry later."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class GatewayNotConfigured(GatewayError):
+    """The gateway can't be used on this server (e.g. the Stripe SDK is missing)."""
+
+
+@dataclass
+class Intent:
+    """The parts of a PaymentIntent the API uses."""
+
+    id: str
+    status: str
+    client_secret: Optional[str]
+    amount: int  # smallest currency unit
+    currency: str
+    metadata: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Transfer:
+    """A transfer to a teacher's connected account."""
+
+    id: str
+    amount: int  # smallest currency unit
+    currency: str
+    destination: str
+
+
+def booking_intent_key(booking_id: int, amount: int, currency: str) -> str:
+    """
+    Idempotency key for a booking's PaymentIntent.
+
+    Retries and double submits reuse the intent Stripe already created;
+    a changed amount or currency gets a new key, as Stripe rejects a key
+    reused with different parameters.
+    """
+    return f"booking-{booking_id}-intent-{amount}-{currency.lower()}"
+
+
+# ==================== CIRCUIT BREAKER ====================
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while the provider looks down.
+
+    Closed: calls go through and consecutive failures are counted. After
+    `failure_threshold` of them the circuit opens and calls are refused for
+    `reset_timeout` seconds. Then it is half open: one trial call goes
+    through, closing the circuit on success or reopening it on failure.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def before_call(self) -> None:
+        """Raise GatewayUnavailable unless a call may go through now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.reset_timeout - (self._clock() - self._opened_at)
+            if remaining > 0 or self._trial:
+                raise GatewayUnavailable(
+                    "Payment provider unavailable", retry_after=max(remaining, 1.0)
+                )
+            self._trial = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial:
+                    logger.warning(
+                        "Payment circuit opened after %d failures", self._failures
+                    )
+                self._opened_at = self._clock()
+            self._trial = False
+
+
+# ==================== GATEWAYS ====================
+
+
+class PaymentGateway(abc.ABC):
+    """Base class: subclasses implement _create_intent, _retrieve_intent and _create_transfer."""
+
+    name = "base"
+
+    def __init__(self, breaker: Optional[CircuitBreaker] = None):
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=int(os.getenv("PAYMENT_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("PAYMENT_BREAKER_RESET", "30")),
+        )
+
+    def create_intent(
+        self,
+        amount: int,
+        currency: str,
+        metadata: Dict[str, str],
+        description: str,
+        idempotency_key: str,
+    ) -> Intent:
+        """Create a PaymentIntent for `amount` in the smallest currency unit."""
+        return self._call(
+            self._create_intent, amount, currency, metadata, description, idempotency_key
+        )
+
+    def retrieve_intent(self, intent_id: str) -> Intent:
+        return self._call(self._retrieve_intent, intent_id)
+
+    def create_transfer(
+        self,
+        amount: int,
+        currency: str,
+        destination: str,
+        metadata: Dict[str, str],
+        idempotency_key: str,
+    ) -> Transfer:
+        """Transfer `amount` (smallest currency unit) to connected account `destination`."""
+        return self._call(
+            self._create_transfer, amount, currency, destination, metadata, idempotency_key
+        )
+
+    def _call(self, fn, *args):
+        self.breaker.before_call()
+        try:
+            result = fn(*args)
+        except GatewayUnavailable:
+            self.breaker.record_failure()
+            raise
+        except GatewayError:
+            # The provider answered, so it is up
+            self.breaker.record_success()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    @abc.abstractmethod
+    def _create_intent(self, amount, currency, metadata, description, idempotency_key):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _retrieve_intent(self, intent_id):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _create_transfer(self, amount, currency, destination, metadata, idempotency_key):
+        raise NotImplementedError
+
+
+class StripeGateway(PaymentGateway):
+    """Stripe through the SDK, with one pooled, timeout-bounded HTTP session."""
+
+    name = "stripe"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        pool_size: Optional[int] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        super().__init__(breaker)
+        self.api_key = api_key or os.getenv("STRIPE_SECRET_KEY", "sk_test_...")
+        self.timeout = timeout or float(os.getenv("STRIPE_TIMEOUT", "10"))
+        self.connect_timeout = connect_timeout or float(os.getenv("STRIPE_CONNECT_TIMEOUT", "3"))
+        self.max_retries = (
+            max_retries if max_retries is not None else int(os.getenv("STRIPE_MAX_RETRIES", "2"))
+        )
+        self.pool_size = pool_size or int(os.getenv("STRIPE_POOL_SIZE", "20"))
+        self._client = None
+        self._sdk = None
+        self._lock = threading.Lock()
+
+    def _stripe_client(self):
+        """Build the SDK client on first use (the SDK is slow to import)."""
+        with self._lock:
+            if self._client is None:
+                try:
+                    import requests
+                    import stripe
+                except ImportError:
+                    raise GatewayNotConfigured("Stripe library not configured on server")
+
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.pool_size
+                )
+                session.mount("https://", adapter)
+                http_client = stripe.RequestsClient(
+                    timeout=(self.connect_timeout, self.timeout), session=session
+                )
+                self._client = stripe.StripeClient(
+                    self.api_key, http_client=http_client, max_network_retries=self.max_retries
+                )
+                self._sdk = stripe
+            return self._client
+
+    def _request(self, fn):
+        client = self._stripe_client()
+        stripe = self._sdk
+        try:
+            return fn(getattr(client, "v1", client))
+        except (stripe.APIConnectionError, stripe.RateLimitError, stripe.APIError) as e:
+            raise GatewayUnavailable(str(e)) from e
+        except stripe.StripeError as e:
+            raise GatewayError(e.user_message or str(e)) from e
+
+    @staticmethod
+    def _intent(pi) -> Intent:
+        return Intent(
+            id=pi.id,
+            status=pi.status,
+            client_secret=pi.client_secret,
+            amount=pi.amount,
+            currency=pi.currency,
+            metadata=dict(pi.metadata or {}),
+        )
+
+    def _create_intent(self, amount, currency, metadata, description, idempotency_key):
+        params = {
+            "amount": amount,
+            "currency": currency,
+            "metadata": metadata,
+            "description": description,
+            "automatic_payment_methods": {"enabled": True},
+        }
+        pi = self._request(
+            lambda api: api.payment_intents.create(
+                params=params, options={"idempotency_key": idempotency_key}
+            )
+        )
+        return self._intent(pi)
+
+    def _retrieve_intent(self, intent_id):
+        return self._intent(self._request(lambda api: api.payment_intents.retrieve(intent_id)))
+
+    def _create_transfer(self, amount, currency, destination, metadata, idempotency_key):
+        params = {
+            "amount": amount,
+            "currency": currency,
+            "destination": destination,
+            "metadata": metadata,
+        }
+        tr = self._request(
+            lambda api: api.transfers.create(
+                params=params, options={"idempotency_key": idempotency_key}
+            )
+        )
+        return Transfer(id=tr.id, amount=tr.amount, currency=tr.currency, destination=destination)
+
+
+class FakeGateway(PaymentGateway):
+    """
+    In-memory stand-in for Stripe.
+
+    Intents start as requires_payment_method (or succeeded with
+    auto_confirm). Requests honour idempotency keys like Stripe: the same
+    key returns the same object, and reusing it with other parameters is
+    an error. Transfers to `declined_accounts` are rejected. `latency`
+    seconds are slept per call to mimic the network.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        auto_confirm: bool = False,
+        declined_accounts=(),
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        super().__init__(breaker)
+        self.latency = latency
+        self.auto_confirm = auto_confirm
+        self.declined_accounts = set(declined_accounts)
+        self.intents: Dict[str, Intent] = {}
+        self.transfers: Dict[str, Transfer] = {}
+        self._keys: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _replay(self, idempotency_key, params, objects):
+        """The object an earlier request with this key created, or None."""
+        if idempotency_key not in self._keys:
+            return None
+        object_id, used_params = self._keys[idempotency_key]
+        if used_params != params:
+            raise GatewayError(
+                "Keys for idempotent requests can only be used with the same parameters"
+            )
+        return objects[object_id]
+
+    def _create_intent(self, amount, currency, metadata, description, idempotency_key):
+        if self.latency:
+            time.sleep(self.latency)
+        params = (amount, currency, tuple(sorted(metadata.items())), description)
+        with self._lock:
+            existing = self._replay(idempotency_key, params, self.intents)
+            if existing is not None:
+                return existing
+            intent_id = f"pi_fake_{len(self.intents) + 1}"
+            intent = Intent(
+                id=intent_id,
+                status="succeeded" if self.auto_confirm else "requires_payment_method",
+                client_secret=f"{intent_id}_secret_{secrets.token_hex(8)}",
+                amount=amount,
+                currency=currency,
+                metadata={k: str(v) for k, v in metadata.items()},
+            )
+            self.intents[intent_id] = intent
+            self._keys[idempotency_key] = (intent_id, params)
+            return intent
+
+    def _retrieve_intent(self, intent_id):
+        if self.latency:
+            time.sleep(self.latency)
+        intent = self.intents.get(intent_id)
+        if intent is None:
+            raise GatewayError(f"No such payment_intent: '{intent_id}'")
+        return intent
+
+    def _create_transfer(self, amount, currency, destination, metadata, idempotency_key):
+        if self.latency:
+            time.sleep(self.latency)
+        if destination in self.declined_accounts:
+            raise GatewayError(f"Cannot transfer to account {destination}")
+        params = (amount, currency, destination, tuple(sorted(metadata.items())))
+        with self._lock:
+            existing = self._replay(idempotency_key, params, self.transfers)
+            if existing is not None:
+                return existing
+            transfer = Transfer(
+                id=f"tr_fake_{len(self.transfers) + 1}",
+                amount=amount,
+                currency=currency,
+                destination=destination,
+            )
+            self.transfers[transfer.id] = transfer
+            self._keys[idempotency_key] = (transfer.id, params)
+            return transfer
+
+    def complete(self, intent_id: str, succeeded: bool = True) -> dict:
+        """
+        Settle an intent as the customer's payment would, returning the
+        webhook event Stripe would send for it.
+        """
+        intent = self.intents[intent_id]
+        intent.status = "succeeded" if succeeded else "requires_payment_method"
+        event_type = "payment_intent.succeeded" if succeeded else "payment_intent.payment_failed"
+        return {
+            "id": f"evt_fake_{secrets.token_hex(12)}",
+            "object": "event",
+            "type": event_type,
+            "created": int(time.time()),
+            "data": {
+                "object": {
+                    "id": intent.id,
+                    "object": "payment_intent",
+                    "amount": intent.amount,
+                    "currency": intent.currency,
+                    "metadata": dict(intent.metadata),
+                    "status": intent.status,
+                }
+            },
+        }
+
+
+GATEWAYS = {"stripe": StripeGateway, "fake": FakeGateway}
+
+_gateway: Optional[PaymentGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> PaymentGateway:
+    """The process-wide gateway, built from PAYMENT_GATEWAY on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                name = os.getenv("PAYMENT_GATEWAY", "stripe")
+                if name == "fake":
+                    latency = float(os.getenv("FAKE_GATEWAY_LATENCY_MS", "0")) / 1000
+                    _gateway = FakeGateway(latency=latency)
+                elif name in GATEWAYS:
+                    _gateway = GATEWAYS[name]()
+                else:
+                    raise GatewayNotConfigured(f"Unknown PAYMENT_GATEWAY: {name}")
+    return _gateway
+
+
+def set_gateway(gateway: Optional[PaymentGateway]) -> Optional[PaymentGateway]:
+    """Replace the process-wide gateway (tests, benchmarks); returns the previous one."""
+    global _gateway
+    with _gateway_lock:
+        previous, _gateway = _gateway, gateway
+    return previous
@@ -0,0 +1,268 @@
+"""
+Payout runs: pay teachers their share of completed, paid bookings in bulk.
+
+create_run() claims every eligible booking (completed, paid and not yet
+paid out) and writes one TeacherPayout per teacher and currency, summing
+teacher_amount in the database; each booking records the payout that
+covers it. submit_run() then sends the transfers through the payment
+gateway from a bounded pool of threads. Each transfer carries its
+payout's idempotency key, so submitting a run again after a crash or a
+provider outage never pays a teacher twice.
+
+A weekly payout is one `payout_run` job (see jobs.py), queued from
+POST /api/admin/payouts/runs.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import String, bindparam, cast, exists, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+import models
+import payment_gateway
+
+TRANSFER_CONCURRENCY = 8  # transfers in flight at once
+WRITE_BATCH = 100  # transfer outcomes written per UPDATE
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _eligible(through_date: Optional[date] = None) -> list:
+    """Filters for bookings that are due a payout."""
+    B = models.Booking
+    criteria = [B.status == "completed", B.payment_status == "paid", B.payout_id.is_(None)]
+    if through_date is not None:
+        criteria.append(B.scheduled_date <= through_date)
+    return criteria
+
+
+def _currency():
+    return func.coalesce(models.Booking.currency, "QAR")
+
+
+def eligible_totals(db: Session, through_date: Optional[date] = None) -> List[dict]:
+    """
+    What a run would pay now, per teacher and currency, in one grouped query.
+
+    Teachers without a connected Stripe account are listed with
+    has_account False; a run leaves their bookings for a later one.
+    """
+    B, T = models.Booking, models.Teacher
+    rows = (
+        db.query(
+            B.teacher_id,
+            T.full_name,
+            T.stripe_account_id.isnot(None),
+            _currency(),
+            func.count(B.id),
+            func.sum(B.teacher_amount),
+        )
+        .outerjoin(T, T.id == B.teacher_id)
+        .filter(*_eligible(through_date))
+        .group_by(B.teacher_id, T.full_name, T.stripe_account_id, _currency())
+        .order_by(B.teacher_id)
+    )
+    return [
+        {
+            "teacher_id": teacher_id,
+            "teacher_name": name,
+            "has_account": bool(has_account),
+            "currency": currency,
+            "booking_count": count,
+            "amount": round(amount or 0.0, 2),
+        }
+        for teacher_id, name, has_account, currency, count, amount in rows
+    ]
+
+
+def create_run(
+    db: Session,
+    through_date: Optional[date] = None,
+    teacher_ids: Optional[Sequence[int]] = None,
+    booking_ids: Optional[Sequence[int]] = None,
+    created_by: Optional[int] = None,
+) -> models.PayoutRun:
+    """
+    Create a payout run covering all eligible bookings.
+
+    Statement count is constant in the number of bookings: one grouped
+    INSERT ... SELECT writes the payouts, one UPDATE links the bookings to
+    them, and one UPDATE recomputes the amounts from the linked bookings
+    (a concurrent run may have claimed some in between).
+
+    Args:
+        through_date: Only bookings scheduled on or before this date
+        teacher_ids: Only bookings of these teachers
+        booking_ids: Only these bookings
+    """
+    B, T, P = models.Booking, models.Teacher, models.TeacherPayout
+    run = models.PayoutRun(status="pending", through_date=through_date, created_by=created_by)
+    db.add(run)
+    db.flush()
+
+    criteria = _eligible(through_date)
+    if teacher_ids is not None:
+        criteria.append(B.teacher_id.in_(teacher_ids))
+    if booking_ids is not None:
+        criteria.append(B.id.in_(booking_ids))
+    # Bookings of teachers without a connected account wait for a later run
+    has_account = exists().where(T.id == B.teacher_id, T.stripe_account_id.isnot(None))
+
+    key = literal(f"payout-run-{run.id}-") + cast(B.teacher_id, String) + "-" + _currency()
+    groups = (
+        select(
+            B.teacher_id,
+            _currency(),
+            func.sum(B.teacher_amount),
+            func.count(B.id),
+            literal(run.id),
+            literal("pending"),
+            key,
+        )
+        .where(*criteria, has_account)
+        .group_by(B.teacher_id, _currency())
+    )
+    db.execute(
+        insert(P).from_select(
+            ["teacher_id", "currency", "amount", "booking_count", "run_id", "status",
+             "idempotency_key"],
+            groups,
+        )
+    )
+
+    payout_for_booking = (
+        select(P.id)
+        .where(P.run_id == run.id, P.teacher_id == B.teacher_id, P.currency == _currency())
+        .scalar_subquery()
+    )
+    db.query(B).filter(
+        *criteria, B.teacher_id.in_(select(P.teacher_id).where(P.run_id == run.id))
+    ).update({B.payout_id: payout_for_booking}, synchronize_session=False)
+
+    linked_count = select(func.count(B.id)).where(B.payout_id == P.id).scalar_subquery()
+    linked_amount = select(func.sum(B.teacher_amount)).where(B.payout_id == P.id).scalar_subquery()
+    db.query(P).filter(P.run_id == run.id).update(
+        {P.booking_count: linked_count, P.amount: func.coalesce(linked_amount, 0.0)},
+        synchronize_session=False,
+    )
+    db.query(P).filter(P.run_id == run.id, P.booking_count == 0).delete(
+        synchronize_session=False
+    )
+
+    payout_count, booking_count, total = (
+        db.query(func.count(P.id), func.sum(P.booking_count), func.sum(P.amount))
+        .filter(P.run_id == run.id)
+        .one()
+    )
+    run.payout_count = payout_count
+    run.booking_count = booking_count or 0
+    run.total_amount = round(total or 0.0, 2)
+    if not payout_count:
+        run.status, run.finished_at = "completed", _now()
+    db.commit()
+    db.refresh(run)
+    return run
+
+
+def _write_outcomes(db: Session, outcomes: List[dict]) -> None:
+    table = models.TeacherPayout.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("payout_id"))
+        .values(
+            status=bindparam("new_status"),
+            stripe_transfer_id=bindparam("transfer_id"),
+            error=bindparam("failure"),
+            processed_at=bindparam("finished"),
+        ),
+        outcomes,
+    )
+    db.commit()
+
+
+def submit_run(
+    db: Session,
+    run_id: int,
+    gateway: Optional[payment_gateway.PaymentGateway] = None,
+    concurrency: int = TRANSFER_CONCURRENCY,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, int]:
+    """
+    Send the transfers of a run's unpaid payouts and record the outcomes.
+
+    At most `concurrency` transfers are in flight; outcomes are written in
+    batches of WRITE_BATCH. Declined transfers are marked failed; those
+    that hit a provider outage stay pending. Both are sent again (with the
+    same idempotency key) when the run is submitted again.
+
+    Returns:
+        Count of the run's payouts per status
+    """
+    P, T = models.TeacherPayout, models.Teacher
+    gateway = gateway or payment_gateway.get_gateway()
+    db.query(models.PayoutRun).filter(models.PayoutRun.id == run_id).update(
+        {"status": "submitting"}, synchronize_session=False
+    )
+    due = P.run_id == run_id, P.status.in_(("pending", "processing", "failed"))
+    rows = (
+        db.query(P.id, P.amount, P.currency, P.idempotency_key, T.stripe_account_id)
+        .join(T, T.id == P.teacher_id)
+        .filter(*due)
+        .order_by(P.id)
+        .all()
+    )
+    db.query(P).filter(*due).update({"status": "processing"}, synchronize_session=False)
+    db.commit()
+
+    def transfer(row) -> dict:
+        payout_id, amount, currency, key, account = row
+        outcome = {"payout_id": payout_id, "transfer_id": None, "failure": None}
+        try:
+            result = gateway.create_transfer(
+                int(round(amount * 100)),
+                (currency or "QAR").lower(),
+                account,
+                {"payout_id": str(payout_id), "run_id": str(run_id)},
+                idempotency_key=key,
+            )
+            outcome.update(new_status="paid", transfer_id=result.id)
+        except payment_gateway.GatewayUnavailable as e:
+            outcome.update(new_status="pending", failure=str(e)[:1000])
+        except payment_gateway.GatewayError as e:
+            outcome.update(new_status="failed", failure=str(e)[:1000])
+        outcome["finished"] = _now()
+        return outcome
+
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    batch, done = [], 0
+    try:
+        for outcome in pool.map(transfer, rows):
+            batch.append(outcome)
+            if len(batch) >= WRITE_BATCH:
+                _write_outcomes(db, batch)
+                done += len(batch)
+                batch = []
+                if progress:
+                    progress(done, len(rows))
+        if batch:
+            _write_outcomes(db, batch)
+            done += len(batch)
+            if progress:
+                progress(done, len(rows))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    counts = dict(
+        db.query(P.status, func.count(P.id)).filter(P.run_id == run_id).group_by(P.status).all()
+    )
+    paid, payouts = counts.get("paid", 0), sum(counts.values())
+    status = "completed" if paid == payouts else ("partial" if paid else "failed")
+    db.query(models.PayoutRun).filter(models.PayoutRun.id == run_id).update(
+        {"status": status, "finished_at": _now()}, synchronize_session=False
+    )
+    db.commit()
+    return counts
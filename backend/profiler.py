@@ -0,0 +1,236 @@
+"""
+Statistical stack sampler for live uvicorn workers.
+
+A background thread snapshots every thread's Python stack with
+sys._current_frames() at a fixed interval and counts identical stacks. The
+result is written in the "collapsed stack" format understood by
+flamegraph.pl, speedscope and inferno:
+
+    MainThread;run (asyncio/runners.py:86);list_schools (api/schools.py:20) 42
+
+Nothing is traced between samples, so overhead is a few microseconds per
+thread per interval and the worker keeps serving traffic while profiled.
+
+Two entry points:
+- profile_for(seconds): sample the whole worker (GET /api/admin/profile)
+- RequestSamplerMiddleware: profile 1-in-N requests under a path prefix and
+  keep the slowest ones (GET /api/admin/profile/requests)
+"""
+
+import heapq
+import itertools
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+DEFAULT_INTERVAL = 0.005  # seconds between samples
+MAX_SECONDS = 60
+
+_PATH_PREFIXES = sorted(
+    {
+        p
+        for p in (
+            sysconfig.get_paths().get("purelib"),
+            sysconfig.get_paths().get("stdlib"),
+            os.path.dirname(os.path.abspath(__file__)),
+        )
+        if p
+    },
+    key=len,
+    reverse=True,
+)
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a whole-worker profile is already running."""
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):].lstrip(os.sep)
+    return filename
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples the stacks of all threads except its own until stopped."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[object, str] = {}
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "StackSampler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        labels = self._labels
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code)
+                    stack.append(label)
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                stack.reverse()
+                self.counts[";".join(stack)] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Render counted stacks as collapsed-stack lines, hottest first."""
+        return "".join(f"{stack} {n}\n" for stack, n in self.counts.most_common())
+
+
+_profile_lock = threading.Lock()
+
+
+def profile_for(seconds: float, interval: float = DEFAULT_INTERVAL) -> StackSampler:
+    """
+    Sample the whole worker for `seconds` (blocking the caller).
+
+    Raises:
+        ProfilerBusy: Another profile is already running in this worker
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running in this worker")
+    try:
+        sampler = StackSampler(interval).start()
+        time.sleep(min(seconds, MAX_SECONDS))
+        return sampler.stop()
+    finally:
+        _profile_lock.release()
+
+
+# ==================== PER-REQUEST SAMPLING ====================
+
+
+class SamplingConfig:
+    """Which requests RequestSamplerMiddleware profiles (mutable at runtime)."""
+
+    def __init__(self):
+        self.path_prefix: Optional[str] = os.getenv("PROFILE_SAMPLE_PATH") or None
+        self.every = int(os.getenv("PROFILE_SAMPLE_EVERY", "100"))
+        self.keep = int(os.getenv("PROFILE_SAMPLE_KEEP", "10"))
+        self.interval = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.002"))
+
+    def as_dict(self) -> dict:
+        return {
+            "path_prefix": self.path_prefix,
+            "every": self.every,
+            "keep": self.keep,
+            "interval": self.interval,
+        }
+
+
+SAMPLING = SamplingConfig()
+
+_worst_lock = threading.Lock()
+_worst: List[tuple] = []  # min-heap of (duration_ms, seq, record)
+_seq = itertools.count()
+
+
+def record_request_profile(record: dict, keep: int) -> None:
+    """Keep `record` if it is among the `keep` slowest profiled requests."""
+    item = (record["duration_ms"], next(_seq), record)
+    with _worst_lock:
+        if len(_worst) < keep:
+            heapq.heappush(_worst, item)
+        elif _worst and item > _worst[0]:
+            heapq.heapreplace(_worst, item)
+        while len(_worst) > keep:
+            heapq.heappop(_worst)
+
+
+def worst_requests() -> List[dict]:
+    """Stored request profiles, slowest first."""
+    with _worst_lock:
+        return [r for _, _, r in sorted(_worst, reverse=True)]
+
+
+def clear_request_profiles() -> None:
+    with _worst_lock:
+        _worst.clear()
+
+
+class RequestSamplerMiddleware:
+    """
+    Pure ASGI middleware profiling 1-in-N requests under SAMPLING.path_prefix.
+
+    While a chosen request runs, a StackSampler covers the whole process, so
+    stacks from concurrent requests can appear too; the request's own frames
+    dominate for the slow requests this is meant to catch. Disabled (one
+    attribute check per request) while no path prefix is configured.
+    """
+
+    def __init__(self, app, config: SamplingConfig = SAMPLING):
+        self.app = app
+        self.config = config
+        self._counter = itertools.count()
+
+    async def __call__(self, scope, receive, send):
+        config = self.config
+        if (
+            scope["type"] != "http"
+            or not config.path_prefix
+            or not scope["path"].startswith(config.path_prefix)
+            or next(self._counter) % max(config.every, 1)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        sampler = StackSampler(config.interval).start()
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            sampler.stop()
+            record_request_profile(
+                {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(scope.get("route"), "path", None),
+                    "status": status[0],
+                    "duration_ms": round(duration_ms, 2),
+                    "started_at": started_at.isoformat(),
+                    "samples": sampler.samples,
+                    "stacks": sampler.collapsed(),
+                },
+                config.keep,
+            )
@@ -0,0 +1,236 @@
+"""
+Revenue reporting from a summary of bookings kept up to date as they change.
+
+revenue_daily holds one row per session day, teacher, subject, session
+type, currency, status and payment status, with the booking count, hours
+and the gross, commission and teacher amounts. Every write that creates a
+booking or changes its status calls refresh() for the (teacher, day)
+buckets it touched, before committing, so the summary changes in the same
+transaction as the bookings. Reports group summary rows, never bookings,
+and cost the same whatever the number of bookings behind them.
+
+rebuild() recomputes the whole table: the backfill, and the repair after
+bulk writes that bypass refresh() (benchmarks.datagen, manual SQL).
+"""
+
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+import models
+
+PERIODS = ("day", "week", "month")
+DIMENSIONS = ("teacher", "subject", "session_type")
+REVENUE_PAYMENT_STATUS = "paid"  # bookings counted as revenue by default
+WRITE_BATCH = 5000  # summary rows per INSERT
+
+
+def period_starts(day: date) -> Tuple[date, date]:
+    """The Monday of `day`'s week and the first of its month."""
+    return day - timedelta(days=day.weekday()), day.replace(day=1)
+
+
+def _write_groups(db: Session, *criteria) -> int:
+    """Sum the bookings matching `criteria` into revenue_daily rows."""
+    B = models.Booking
+    currency = func.coalesce(B.currency, "QAR")
+    status = func.coalesce(B.status, "pending")
+    payment_status = func.coalesce(B.payment_status, "pending")
+    groups = (
+        select(
+            B.scheduled_date,
+            B.teacher_id,
+            B.subject,
+            B.session_type,
+            currency,
+            status,
+            payment_status,
+            func.count(B.id),
+            func.coalesce(func.sum(B.duration_hours), 0.0),
+            func.sum(B.total_amount),
+            func.sum(B.commission_amount),
+            func.sum(B.teacher_amount),
+        )
+        .where(*criteria)
+        .group_by(
+            B.scheduled_date, B.teacher_id, B.subject, B.session_type, currency, status,
+            payment_status,
+        )
+    )
+    rows = []
+    for (day, teacher_id, subject, session_type, cur, booking_status, paid, count, hours,
+         gross, commission, teacher_amount) in db.execute(groups):
+        week_start, month_start = period_starts(day)
+        rows.append({
+            "day": day,
+            "week_start": week_start,
+            "month_start": month_start,
+            "teacher_id": teacher_id,
+            "subject": subject,
+            "session_type": session_type,
+            "currency": cur,
+            "status": booking_status,
+            "payment_status": paid,
+            "booking_count": count,
+            "hours": hours,
+            "gross_amount": gross or 0.0,
+            "commission_amount": commission or 0.0,
+            "teacher_amount": teacher_amount or 0.0,
+        })
+    for start in range(0, len(rows), WRITE_BATCH):
+        db.execute(insert(models.RevenueDaily), rows[start:start + WRITE_BATCH])
+    return len(rows)
+
+
+def _lock_teachers(db: Session, teacher_ids: Optional[Sequence[int]] = None) -> None:
+    """
+    Lock teacher rows (all of them by default) until the transaction ends.
+
+    Writers recomputing buckets of the same teacher take turns: under READ
+    COMMITTED the one that waited regroups after the other has committed,
+    so it sees that transaction's bookings and summary rows. Rows are
+    locked in id order so writers touching several teachers cannot
+    deadlock. SQLite has no row locks but already serializes writers.
+    """
+    T = models.Teacher
+    query = select(T.id).order_by(T.id).with_for_update()
+    if teacher_ids is not None:
+        query = query.where(T.id.in_(teacher_ids))
+    db.execute(query).all()
+
+
+def refresh(db: Session, buckets: Iterable[Tuple[int, date]]) -> None:
+    """
+    Recompute the summary rows of the given (teacher_id, scheduled_date) buckets.
+
+    Flushes pending booking changes first and does not commit: call it
+    right before the commit that changes the bookings. Costs four
+    statements however many buckets are given.
+    """
+    buckets = list({(t, d) for t, d in buckets if t is not None and d is not None})
+    if not buckets:
+        return
+    db.flush()
+    _lock_teachers(db, sorted({t for t, _ in buckets}))
+    R, B = models.RevenueDaily, models.Booking
+    db.execute(delete(R).where(tuple_(R.teacher_id, R.day).in_(buckets)))
+    _write_groups(db, tuple_(B.teacher_id, B.scheduled_date).in_(buckets))
+
+
+def refresh_bookings(db: Session, booking_ids: Iterable[int]) -> None:
+    """refresh() the buckets of bookings changed with bulk UPDATEs, by ID."""
+    booking_ids = list(booking_ids)
+    if not booking_ids:
+        return
+    B = models.Booking
+    buckets = db.execute(
+        select(B.teacher_id, B.scheduled_date).where(B.id.in_(booking_ids)).distinct()
+    ).all()
+    refresh(db, buckets)
+
+
+def rebuild(db: Session) -> int:
+    """
+    Recompute revenue_daily from every booking and commit.
+
+    Returns:
+        Number of summary rows written
+    """
+    _lock_teachers(db)
+    db.execute(delete(models.RevenueDaily))
+    written = _write_groups(db)
+    db.commit()
+    return written
+
+
+def report(
+    db: Session,
+    period: str = "month",
+    group_by: Sequence[str] = (),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    teacher_id: Optional[int] = None,
+    statuses: Optional[Sequence[str]] = None,
+    payment_status: Optional[str] = REVENUE_PAYMENT_STATUS,
+) -> List[dict]:
+    """
+    Booking totals per period (and per `group_by` dimension), from the summary.
+
+    Args:
+        period: day, week (starting Monday) or month
+        group_by: Any of teacher, subject and session_type
+        date_from: First session day included
+        date_to: Last session day included
+        teacher_id: Only this teacher's bookings
+        statuses: Only bookings in these statuses
+        payment_status: Only bookings with this payment status (None for all)
+
+    Returns:
+        One dict per period, group and currency, oldest period first
+    """
+    R, T = models.RevenueDaily, models.Teacher
+    period_start = {"day": R.day, "week": R.week_start, "month": R.month_start}[period]
+    dimensions = {
+        "teacher": [R.teacher_id, T.full_name],
+        "subject": [R.subject],
+        "session_type": [R.session_type],
+    }
+    keys = [period_start] + [c for name in group_by for c in dimensions[name]] + [R.currency]
+
+    query = db.query(
+        *keys,
+        func.sum(R.booking_count),
+        func.sum(R.hours),
+        func.sum(R.gross_amount),
+        func.sum(R.commission_amount),
+        func.sum(R.teacher_amount),
+    )
+    if "teacher" in group_by:
+        query = query.outerjoin(T, T.id == R.teacher_id)
+    if date_from is not None:
+        query = query.filter(R.day >= date_from)
+    if date_to is not None:
+        query = query.filter(R.day <= date_to)
+    if teacher_id is not None:
+        query = query.filter(R.teacher_id == teacher_id)
+    if statuses:
+        query = query.filter(R.status.in_(statuses))
+    if payment_status is not None:
+        query = query.filter(R.payment_status == payment_status)
+    query = query.group_by(*keys).order_by(*keys)
+
+    names = ["period"]
+    for name in group_by:
+        names += ["teacher_id", "teacher_name"] if name == "teacher" else [name]
+    names += ["currency", "booking_count", "hours", "gross_amount", "commission_amount",
+              "teacher_amount"]
+    results = []
+    for row in query:
+        result = dict(zip(names, row))
+        for amount in ("hours", "gross_amount", "commission_amount", "teacher_amount"):
+            result[amount] = round(result[amount] or 0.0, 2)
+        results.append(result)
+    return results
+
+
+def totals(rows: List[dict]) -> List[dict]:
+    """Sum report() rows per currency."""
+    by_currency = {}
+    for row in rows:
+        total = by_currency.setdefault(row["currency"], {
+            "currency": row["currency"],
+            "booking_count": 0,
+            "hours": 0.0,
+            "gross_amount": 0.0,
+            "commission_amount": 0.0,
+            "teacher_amount": 0.0,
+        })
+        for key in ("booking_count", "hours", "gross_amount", "commission_amount",
+                    "teacher_amount"):
+            total[key] += row[key]
+    for total in by_currency.values():
+        for key in ("hours", "gross_amount", "commission_amount", "teacher_amount"):
+            total[key] = round(total[key], 2)
+    return sorted(by_currency.values(), key=lambda t: t["currency"])
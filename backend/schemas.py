@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, EmailStr, validator
 from typing import Optional, List, Any
-from datetime import datetime
+from datetime import date, datetime
 
 
 class SchoolBase(BaseModel):
@@ -52,11 +52,31 @@ class SchoolOut(SchoolBase):
     model_config = {"from_attributes": True}
 
 
+class SchoolListItem(SchoolOut):
+    is_favorited: Optional[bool] = Field(
+        None, description="Whether the signed-in user saved this school (only when signed in)"
+    )
+
+
 class SchoolListResponse(BaseModel):
     total: int
     page: int
     page_size: int
-    results: List[SchoolOut]
+    results: List[SchoolListItem]
+
+
+class SchoolSummary(BaseModel):
+    """The school fields shown on cards, e.g. in a user's saved schools."""
+
+    id: int
+    name: str
+    type: Optional[str]
+    curriculum: Optional[str]
+    address: Optional[str]
+    photos: Optional[List[str]]
+    average_rating: Optional[float]
+    total_reviews: Optional[int]
+    model_config = {"from_attributes": True}
 
 
 class StagingOut(SchoolOut):
@@ -65,6 +85,27 @@ class StagingOut(SchoolOut):
     pass
 
 
+class StagingAcceptBatch(BaseModel):
+    """Selects staging rows to promote; all given criteria must match."""
+
+    ids: Optional[List[int]] = Field(
+        None, max_length=50000, description="Staging school IDs to accept"
+    )
+    min_score: Optional[int] = Field(
+        None, ge=0, le=100, description="Minimum completeness score"
+    )
+    status: Optional[str] = Field(
+        None, description="Staging status to match (e.g., staging)"
+    )
+
+
+class StagingAcceptBatchResult(BaseModel):
+    requested: Optional[int]
+    matched: int
+    accepted: int
+    removed: int
+
+
 class UserCreate(BaseModel):
     email: str
     password: str
@@ -127,6 +168,46 @@ class ReviewWithUser(ReviewOut):
     user_name: Optional[str]
 
 
+class ReviewPage(BaseModel):
+    total: int
+    results: List[ReviewOut]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` to get the next page; null on the last page"
+    )
+
+
+class ReviewSummary(BaseModel):
+    count: int = Field(..., description="Approved reviews")
+    average_rating: float
+    histogram: List[int] = Field(..., description="Approved reviews per rating, 1 to 5 stars")
+
+
+class SchoolReviewPage(BaseModel):
+    results: List[ReviewOut]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` to get the next page; null on the last page"
+    )
+    summary: Optional[ReviewSummary] = None
+
+
+class ReviewStatusBatch(BaseModel):
+    """Moves matching reviews to a new status; all given criteria must match."""
+
+    status: str = Field(..., pattern="^(pending|approved|rejected)$", description="New status")
+    ids: Optional[List[int]] = Field(None, max_length=10000, description="Review IDs to update")
+    school_id: Optional[int] = Field(None, description="Only reviews of this school")
+    user_id: Optional[int] = Field(None, description="Only reviews by this user")
+    current_status: Optional[str] = Field(
+        None, description="Only reviews currently in this status (e.g., pending)"
+    )
+
+
+class ReviewStatusBatchResult(BaseModel):
+    requested: Optional[int]
+    updated: int
+    schools: int = Field(..., description="Schools whose rating stats were refreshed")
+
+
 # Favorite Schemas
 class FavoriteCreate(BaseModel):
     school_id: int
@@ -140,6 +221,18 @@ class FavoriteOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class FavoriteWithSchool(FavoriteOut):
+    school: Optional[SchoolSummary] = Field(None, description="Null if the school was removed")
+
+
+class FavoriteCheck(BaseModel):
+    school_ids: List[int] = Field(..., max_length=200, description="School IDs to look up")
+
+
+class FavoriteCheckResult(BaseModel):
+    favorited: List[int] = Field(..., description="The given school IDs the user has saved")
+
+
 # Post Schemas
 class PostCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
@@ -184,3 +277,121 @@ class PostListResponse(BaseModel):
     page: int
     page_size: int
     results: List[PostListItem]
+
+
+# Job Schemas
+class JobCreate(BaseModel):
+    job_type: str = Field(..., description="Registered job type")
+    params: dict = Field(default_factory=dict, description="Handler keyword arguments")
+    idempotency_key: Optional[str] = Field(
+        None, max_length=255, description="Repeat requests with the same key return the same job"
+    )
+
+
+class JobOut(BaseModel):
+    id: int
+    job_type: str
+    params: Optional[dict]
+    status: str
+    idempotency_key: Optional[str]
+    cancel_requested: Optional[bool]
+    progress: Optional[int]
+    progress_message: Optional[str]
+    result: Optional[Any]
+    error: Optional[str]
+    attempts: Optional[int]
+    worker_id: Optional[str]
+    created_by: Optional[int]
+    created_at: Optional[datetime]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    model_config = {"from_attributes": True}
+
+
+# Payout Schemas
+class TeacherPayoutOut(BaseModel):
+    id: int
+    teacher_id: int
+    amount: float
+    currency: Optional[str]
+    status: Optional[str]
+    stripe_transfer_id: Optional[str]
+    run_id: Optional[int]
+    booking_count: Optional[int]
+    error: Optional[str]
+    created_at: Optional[datetime]
+    processed_at: Optional[datetime]
+    model_config = {"from_attributes": True}
+
+
+class PayoutRunCreate(BaseModel):
+    through_date: Optional[date] = Field(
+        None, description="Only pay for sessions scheduled on or before this date"
+    )
+    concurrency: int = Field(8, ge=1, le=32, description="Transfers in flight at once")
+    idempotency_key: Optional[str] = Field(
+        None, max_length=255, description="Repeat requests with the same key return the same job"
+    )
+
+
+class PayoutRunOut(BaseModel):
+    id: int
+    status: str
+    through_date: Optional[date]
+    payout_count: Optional[int]
+    booking_count: Optional[int]
+    total_amount: Optional[float]
+    created_by: Optional[int]
+    created_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    model_config = {"from_attributes": True}
+
+
+class PayoutRunDetail(PayoutRunOut):
+    payouts: List[TeacherPayoutOut]
+
+
+class EligiblePayout(BaseModel):
+    teacher_id: int
+    teacher_name: Optional[str]
+    has_account: bool
+    currency: str
+    booking_count: int
+    amount: float
+
+
+# Revenue Report Schemas
+class RevenueTotals(BaseModel):
+    currency: str
+    booking_count: int
+    hours: float
+    gross_amount: float
+    commission_amount: float
+    teacher_amount: float
+
+
+class RevenueRow(RevenueTotals):
+    period: date = Field(..., description="First day of the day, week (Monday) or month")
+    teacher_id: Optional[int] = None
+    teacher_name: Optional[str] = None
+    subject: Optional[str] = None
+    session_type: Optional[str] = None
+
+
+class RevenueReport(BaseModel):
+    period: str
+    group_by: List[str]
+    date_from: Optional[date]
+    date_to: Optional[date]
+    rows: List[RevenueRow]
+    totals: List[RevenueTotals] = Field(..., description="All rows summed per currency")
+
+
+# Profiling Schemas
+class ProfileSampling(BaseModel):
+    path_prefix: Optional[str] = Field(
+        None, description="Profile requests whose path starts with this (None disables)"
+    )
+    every: int = Field(100, ge=1, description="Profile 1 in `every` matching requests")
+    keep: int = Field(10, ge=1, le=100, description="Slowest request profiles kept")
+    interval: float = Field(0.002, ge=0.001, le=0.1, description="Seconds between samples")
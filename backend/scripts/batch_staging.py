@@ -20,6 +20,9 @@ def batch_accept_staging(db: Session, min_score: int = 70):
     """
     Accept all staging schools with completeness score >= min_score.
 
+    Uses crud.accept_staging_batch, so all candidates are promoted in a
+    single transaction rather than one commit per school.
+
     Args:
         db: Database session
         min_score: Minimum completeness score required (default 70)
@@ -27,40 +30,22 @@ def batch_accept_staging(db: Session, min_score: int = 70):
     Returns:
         dict with statistics about the operation
     """
-    staging_schools = (
-        db.query(models.StagingSchool)
-        .filter(
-            models.StagingSchool.completeness_score >= min_score,
-            models.StagingSchool.status == "staging",
-        )
-        .all()
-    )
-
     stats = {
-        "total_candidates": len(staging_schools),
+        "total_candidates": 0,
         "accepted": 0,
         "failed": 0,
         "errors": [],
     }
 
-    for staging in staging_schools:
-        try:
-            # Use the existing accept_staging function from crud
-            accepted_school = crud.accept_staging(db, staging.id)
-            if accepted_school:
-                stats["accepted"] += 1
-            else:
-                stats["failed"] += 1
-                stats["errors"].append(
-                    f"Failed to accept staging ID {staging.id}: Not found"
-                )
-        except Exception as e:
-            stats["failed"] += 1
-            stats["errors"].append(
-                f"Failed to accept staging ID {staging.id}: {str(e)}"
-            )
-            db.rollback()  # Rollback this transaction but continue
+    try:
+        result = crud.accept_staging_batch(db, min_score=min_score, status="staging")
+    except Exception as e:
+        stats["errors"].append(f"Batch accept failed: {str(e)}")
+        return stats
 
+    stats["total_candidates"] = result["matched"]
+    stats["accepted"] = result["accepted"]
+    stats["failed"] = result["matched"] - result["accepted"]
     return stats
 
 
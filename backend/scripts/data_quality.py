@@ -11,11 +11,54 @@ import os
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import Float, String, case, cast, func
 from sqlalchemy.orm import Session
 import models
 from db import SessionLocal
 
 
+# Shared scoring rules: (field, weight, kind). Both the Python reference
+# implementation and the SQL expression are built from this table.
+#
+# kind controls what counts as "present":
+# - "value": any truthy value (non-empty string, non-zero number)
+# - "json": any truthy JSON document (not null, {}, [] or "")
+# - "collection": a non-empty JSON list or object
+COMPLETENESS_RULES = (
+    # Critical fields - 15 points each (60 points total)
+    ("name", 15, "value"),
+    ("address", 15, "value"),
+    ("latitude", 15, "value"),
+    ("longitude", 15, "value"),
+    # Important fields - 10 points each (40 points total)
+    ("contact", 10, "value"),
+    ("website", 10, "value"),
+    ("curriculum", 10, "value"),
+    ("type", 10, "value"),
+    # Optional fields - 5 points each (10 points total - could expand)
+    ("fee_structure", 5, "json"),
+    ("facilities", 5, "collection"),
+)
+
+MAX_SCORE = 100
+
+SCORE_BUCKETS = (
+    ("0-20", 20),
+    ("21-40", 40),
+    ("41-60", 60),
+    ("61-80", 80),
+    ("81-100", MAX_SCORE),
+)
+
+_EMPTY_JSON = ("null", "{}", "[]", '""')
+
+
+def _is_present(value, kind: str) -> bool:
+    if kind == "collection":
+        return isinstance(value, (list, dict)) and len(value) > 0
+    return bool(value)
+
+
 def calculate_completeness_score(school) -> int:
     """
     Calculate data completeness score for a school (0-100).
@@ -25,55 +68,64 @@ def calculate_completeness_score(school) -> int:
     - Important fields (10 points each): contact, website, curriculum, type
     - Optional fields (5 points each): fee_structure, facilities
 
-    Total possible: 100 points
+    This is the reference implementation of COMPLETENESS_RULES;
+    completeness_score_expression() must agree with it row for row.
     """
     score = 0
+    for field, weight, kind in COMPLETENESS_RULES:
+        if _is_present(getattr(school, field, None), kind):
+            score += weight
 
-    # Critical fields - 15 points each (60 points total)
-    critical_fields = {
-        "name": 15,
-        "address": 15,
-        "latitude": 15,
-        "longitude": 15,
-    }
+    return min(score, MAX_SCORE)  # Cap at 100
 
-    for field, weight in critical_fields.items():
-        value = getattr(school, field, None)
-        if value:
-            score += weight
 
-    # Important fields - 10 points each (40 points total)
-    important_fields = {
-        "contact": 10,
-        "website": 10,
-        "curriculum": 10,
-        "type": 10,
-    }
+def _present_clause(column, kind: str):
+    """SQL equivalent of _is_present for a column."""
+    if kind in ("json", "collection"):
+        text = cast(column, String)
+        clause = column.isnot(None) & text.notin_(_EMPTY_JSON)
+        if kind == "collection":
+            clause = clause & (text.like("[%") | text.like("{%"))
+        return clause
+    if isinstance(column.type, Float):
+        return column.isnot(None) & (column != 0)
+    return column.isnot(None) & (column != "")
 
-    for field, weight in important_fields.items():
-        value = getattr(school, field, None)
-        if value:
-            score += weight
 
-    # Optional fields - 5 points each (10 points total - could expand)
-    # Fee structure
-    if school.fee_structure:
-        score += 5
+def completeness_score_expression(model):
+    """Build the SQL CASE expression computing the score for `model` rows."""
+    total = sum(
+        case((_present_clause(getattr(model, field), kind), weight), else_=0)
+        for field, weight, kind in COMPLETENESS_RULES
+    )
+    return case((total > MAX_SCORE, MAX_SCORE), else_=total)
 
-    # Facilities (if it's a non-empty list or dict)
-    if school.facilities:
-        if isinstance(school.facilities, list) and len(school.facilities) > 0:
-            score += 5
-        elif isinstance(school.facilities, dict) and len(school.facilities) > 0:
-            score += 5
 
-    return min(score, 100)  # Cap at 100
+def _score_bucket_expression(score):
+    return case(
+        *((score <= upper, label) for label, upper in SCORE_BUCKETS[:-1]),
+        else_=SCORE_BUCKETS[-1][0],
+    )
+
+
+def _resolve_model(table: str):
+    if table == "schools":
+        return models.School
+    if table == "staging_schools":
+        return models.StagingSchool
+    raise ValueError(
+        f"Invalid table: {table}. Must be 'schools' or 'staging_schools'"
+    )
 
 
 def update_all_scores(db: Session, table="schools"):
     """
     Update completeness scores for all schools in the specified table.
 
+    Scores are recomputed in the database with a single UPDATE and the
+    distribution is read back with a single GROUP BY, so no rows are loaded
+    into Python.
+
     Args:
         db: Database session
         table: 'schools' or 'staging_schools'
@@ -81,63 +133,50 @@ def update_all_scores(db: Session, table="schools"):
     Returns:
         dict with statistics about the update
     """
-    if table == "schools":
-        model = models.School
-    elif table == "staging_schools":
-        model = models.StagingSchool
-    else:
-        raise ValueError(
-            f"Invalid table: {table}. Must be 'schools' or 'staging_schools'"
-        )
+    model = _resolve_model(table)
+    new_score = completeness_score_expression(model)
+    current_score = func.coalesce(model.completeness_score, 0)
+
+    updated = (
+        db.query(model)
+        .filter(current_score != new_score)
+        .update({model.completeness_score: new_score}, synchronize_session=False)
+    )
+    db.commit()
 
-    schools = db.query(model).all()
+    bucket = _score_bucket_expression(current_score)
+    rows = (
+        db.query(
+            bucket,
+            func.count(model.id),
+            func.sum(current_score),
+            func.min(current_score),
+            func.max(current_score),
+        )
+        .group_by(bucket)
+        .all()
+    )
 
     stats = {
-        "total": len(schools),
-        "updated": 0,
+        "total": 0,
+        "updated": updated,
         "average_score": 0,
-        "min_score": 100,
+        "min_score": MAX_SCORE,
         "max_score": 0,
-        "distribution": {
-            "0-20": 0,
-            "21-40": 0,
-            "41-60": 0,
-            "61-80": 0,
-            "81-100": 0,
-        },
+        "distribution": {label: 0 for label, _ in SCORE_BUCKETS},
     }
 
     total_score = 0
-
-    for school in schools:
-        old_score = school.completeness_score or 0
-        new_score = calculate_completeness_score(school)
-
-        if old_score != new_score:
-            school.completeness_score = new_score
-            stats["updated"] += 1
-
-        total_score += new_score
-        stats["min_score"] = min(stats["min_score"], new_score)
-        stats["max_score"] = max(stats["max_score"], new_score)
-
-        # Update distribution
-        if new_score <= 20:
-            stats["distribution"]["0-20"] += 1
-        elif new_score <= 40:
-            stats["distribution"]["21-40"] += 1
-        elif new_score <= 60:
-            stats["distribution"]["41-60"] += 1
-        elif new_score <= 80:
-            stats["distribution"]["61-80"] += 1
-        else:
-            stats["distribution"]["81-100"] += 1
+    for label, count, score_sum, low, high in rows:
+        stats["distribution"][label] = count
+        stats["total"] += count
+        total_score += score_sum or 0
+        stats["min_score"] = min(stats["min_score"], low)
+        stats["max_score"] = max(stats["max_score"], high)
 
     if stats["total"] > 0:
         stats["average_score"] = total_score / stats["total"]
 
-    db.commit()
-
     return stats
 
 
@@ -169,32 +208,25 @@ def get_missing_fields_report(db: Session):
     Returns:
         dict with field names and count of schools missing each field
     """
-    schools = db.query(models.School).all()
+    columns = [
+        func.count(models.School.id),
+        *(
+            func.sum(
+                case((_present_clause(getattr(models.School, field), kind), 0), else_=1)
+            )
+            for field, _, kind in COMPLETENESS_RULES
+        ),
+    ]
+    total, *missing = db.query(*columns).one()
 
-    report = {
-        "total_schools": len(schools),
+    return {
+        "total_schools": total,
         "missing_fields": {
-            "name": 0,
-            "address": 0,
-            "latitude": 0,
-            "longitude": 0,
-            "contact": 0,
-            "website": 0,
-            "curriculum": 0,
-            "type": 0,
-            "fee_structure": 0,
-            "facilities": 0,
+            field: count or 0
+            for (field, _, _), count in zip(COMPLETENESS_RULES, missing)
         },
     }
 
-    for school in schools:
-        for field in report["missing_fields"].keys():
-            value = getattr(school, field, None)
-            if not value:
-                report["missing_fields"][field] += 1
-
-    return report
-
 
 def main():
     """Main execution function."""
@@ -1,44 +1,49 @@
+"""
+Export schools to CSV, JSON Lines or Parquet.
+
+Rows are streamed from the database in batches (see export.py), so large
+tables are written with constant memory.
+
+Run from the `backend` directory as:
+    python -m scripts.export_schools --format jsonl --status published
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import export
 from db import SessionLocal
-from crud import list_schools
-import csv, os
-
-s = SessionLocal()
-rows = list_schools(s, skip=0, limit=100000)
-os.makedirs("exports", exist_ok=True)
-path = os.path.join("exports", "schools_export.csv")
-with open(path, "w", newline="", encoding="utf-8") as f:
-    writer = csv.writer(f)
-    writer.writerow(
-        [
-            "id",
-            "name",
-            "type",
-            "curriculum",
-            "address",
-            "latitude",
-            "longitude",
-            "contact",
-            "website",
-            "status",
-        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export schools")
+    parser.add_argument(
+        "--format", "-f", default="csv", choices=sorted(export.MEDIA_TYPES)
+    )
+    parser.add_argument(
+        "--table", default="schools", choices=sorted(export.EXPORT_TABLES)
     )
-    for r in rows:
-        writer.writerow(
-            [
-                r.id,
-                r.name,
-                r.type,
-                r.curriculum,
-                r.address,
-                r.latitude,
-                r.longitude,
-                r.contact,
-                r.website,
-                r.status,
-            ]
+    parser.add_argument("--status", default=None, help="Only export this status")
+    parser.add_argument("--output", "-o", default=None, help="Output file path")
+    args = parser.parse_args()
+
+    path = args.output or os.path.join("exports", f"{args.table}_export.{args.format}")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    s = SessionLocal()
+    try:
+        written = export.write_export(
+            s, path, args.format, table=args.table, status=args.status
         )
+    finally:
+        s.close()
+
+    print("exported=", path)
+    print("bytes=", written)
+
 
-print("exported=", path)
-print("sample_count=", min(10, len(rows)))
-for r in rows[:10]:
-    print(r.id, "|", r.name, "|", r.website)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Background job worker - claims queued jobs from the `jobs` table and runs them.
+
+Start as many worker processes as needed; each claims one job at a time.
+
+Run from the `backend` directory as:
+    python -m scripts.job_worker [--once] [--poll-interval 2]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background jobs")
+    parser.add_argument(
+        "--once", action="store_true", help="Run at most one job, then exit"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=2.0,
+        help="Seconds to wait when the queue is empty",
+    )
+    args = parser.parse_args()
+
+    worker_id = jobs.default_worker_id()
+    print(f"Job worker {worker_id} started (types: {', '.join(sorted(jobs.JOB_TYPES))})")
+
+    try:
+        while True:
+            job_id = jobs.run_next_job(worker_id)
+            if job_id is not None:
+                print(f"Finished job {job_id}")
+            if args.once:
+                break
+            if job_id is None:
+                time.sleep(args.poll_interval)
+    except KeyboardInterrupt:
+        print("\nStopping worker...")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,16 @@
 from db import SessionLocal
-from crud import list_staging, accept_staging, list_schools
+from crud import accept_staging_batch, list_schools
+import models
 
 
 def main():
     s = SessionLocal()
-    rows = list_staging(s)
-    print("staging_before=", len(rows))
-    ids = [r.id for r in rows]
-    merged = 0
-    for i in ids:
-        created = accept_staging(s, i)
-        if created:
-            merged += 1
-    print("merged=", merged)
-    rows_after = list_staging(s)
-    print("staging_after=", len(rows_after))
-    print("schools_total=", len(list_schools(s, skip=0, limit=100000)))
+    print("staging_before=", s.query(models.StagingSchool).count())
+    stats = accept_staging_batch(s)
+    print("merged=", stats["accepted"])
+    print("staging_after=", s.query(models.StagingSchool).count())
+    total, _ = list_schools(s, skip=0, limit=0)
+    print("schools_total=", total)
 
 
 if __name__ == "__main__":
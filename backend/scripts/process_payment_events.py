@@ -0,0 +1,53 @@
+"""
+Payment event worker - applies Stripe webhook events recorded in the
+`payment_events` ledger.
+
+The webhook applies new events itself once it has responded; this worker
+picks up whatever that missed (a restart mid-burst, an event that failed
+and is due a retry).
+
+Run from the `backend` directory as:
+    python -m scripts.process_payment_events [--once] [--poll-interval 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import payment_events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending Stripe webhook events")
+    parser.add_argument(
+        "--once", action="store_true", help="Apply one batch of events, then exit"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5.0,
+        help="Seconds to wait when no events are pending",
+    )
+    args = parser.parse_args()
+
+    types = ", ".join(sorted(payment_events.EVENT_HANDLERS))
+    print(f"Payment event worker started (types: {types})")
+
+    try:
+        while True:
+            counts = payment_events.process_pending()
+            if counts:
+                print("Applied events: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+            if args.once:
+                break
+            if not counts:
+                time.sleep(args.poll_interval)
+    except KeyboardInterrupt:
+        print("\nStopping worker...")
+
+
+if __name__ == "__main__":
+    main()
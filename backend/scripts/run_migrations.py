@@ -1,29 +1,27 @@
-"""Run Alembic migrations programmatically.
+"""Bootstrap or migrate the database (run once per deploy, before the web workers).
 
 Usage:
     python backend/scripts/run_migrations.py
 
-This will apply migrations to the database configured in `backend/alembic.ini`.
+Applies pending Alembic migrations to DATABASE_URL (default: backend/dev.db).
+An empty database is created from the models and stamped at head; a database
+created by the old create_all-on-startup is stamped at that schema's revision
+and upgraded.
+See migrations.bootstrap.
 """
-from alembic.config import Config
-from alembic import command
-from pathlib import Path
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import engine  # noqa: E402
+from migrations import bootstrap  # noqa: E402
 
 
 def run():
-    base = Path(__file__).resolve().parent.parent
-    ini_path = base / "alembic.ini"
-    if not ini_path.exists():
-        raise FileNotFoundError(f"alembic.ini not found at {ini_path}")
-
-    cfg = Config(str(ini_path))
-
-    # Ensure working directory is project root so relative paths resolve
-    os.chdir(str(base))
-    print("Running alembic upgrade head...")
-    command.upgrade(cfg, "head")
-    print("Migrations applied.")
+    print(f"Bootstrapping {engine.url.render_as_string(hide_password=True)}...")
+    action = bootstrap(engine, log=print)
+    print(f"Done ({action}).")
 
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-# Run Alembic migrations (assumes virtualenv and env vars configured)
-echo "Running Alembic migrations..."
-alembic upgrade head
+# Bootstrap/migrate the database (assumes virtualenv and env vars configured)
+echo "Running migrations..."
+python "$(dirname "$0")/run_migrations.py"
 echo "Migrations complete."
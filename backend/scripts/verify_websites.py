@@ -2,27 +2,38 @@
 Verify and tidy website URLs for schools in the DB.
 
 Behavior:
-- For each School, attempt an HTTP HEAD (then GET) to determine whether the existing `website` is reachable.
-- If the site is reachable (2xx/3xx), leave it alone (or normalize scheme).
-- If unreachable or missing, try adding `http://` (if missing) and test again.
-- If still unreachable, set a fallback Google Search URL for the school's name and city.
-- Commit updates and write an updated CSV export at `exports/schools_export_verified.csv`.
+- Only schools whose last check is older than `--stale-days` (or that were
+  never checked, or whose website changed since) are re-checked. Results
+  (time, status code, final URL, ETag) are kept in `website_checks`.
+- Requests run on a bounded pool of workers sharing one pooled,
+  DNS-caching HTTP session, with at most PER_HOST_LIMIT concurrent requests
+  per host and exponential backoff on 429/5xx/connection errors.
+- A stored ETag is sent as `If-None-Match`; a 304 counts as reachable.
+- HEAD is tried first, falling back to GET when the server rejects HEAD.
+- If unreachable, try adding `http://` (if missing) and test again.
+- If still unreachable, set a fallback Google Search URL for the school's name.
+- Results are written back in batches while the run is in progress, then an
+  updated CSV export is written to `exports/schools_export_verified.csv`.
 
 Run from the `backend` directory as:
-    python -m scripts.verify_websites
+    python -m scripts.verify_websites [--stale-days 7] [--all]
 
 Requires `aiohttp` in the environment.
 """
 
 from __future__ import annotations
-import csv
+import argparse
 import asyncio
+import contextlib
 import urllib.parse
 import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from pathlib import Path
 
 import aiohttp
+from sqlalchemy import or_, update
 
 # Ensure the `backend` package path is available whether the script is run
 # from the workspace root or from inside the `backend` directory.
@@ -32,47 +43,134 @@ if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
 from db import SessionLocal
+import export
 import models
 
 EXPORT_PATH = BACKEND_DIR / "exports" / "schools_export_verified.csv"
+EXPORT_COLUMNS = (
+    "id",
+    "name",
+    "address",
+    "latitude",
+    "longitude",
+    "contact",
+    "website",
+    "status",
+    "completeness_score",
+)
 REQUEST_TIMEOUT = 6
-CONCURRENT_REQUESTS = 10  # Number of concurrent requests
-
+CONCURRENT_REQUESTS = 10  # Number of worker tasks (and pooled connections)
+PER_HOST_LIMIT = 2  # Concurrent requests allowed against a single host
+STALE_AFTER = timedelta(days=7)  # Re-check websites older than this
+PAGE_SIZE = 500  # Schools read from the DB per query
+COMMIT_BATCH_SIZE = 100  # Results written back per commit
+MAX_RETRIES = 2  # Retries per request after a retryable failure
+BACKOFF_BASE = 1.0  # Seconds; doubled on every retry
+BACKOFF_MAX = 30.0
+RETRY_STATUSES = {429, 502, 503, 504}
+DNS_CACHE_TTL = 300
+
+PLACEHOLDER_PATTERNS = [
+    "google.com/search",
+    "bing.com/search",
+    "park",
+    "parking",
+    "domainparking",
+]
+
+
+class HostLimiter:
+    """Per-host concurrency cap plus a shared "not before" time for backoff.
+
+    When one request to a host is told to back off, every other request to
+    that host waits too, so a struggling server is not hit by the rest of
+    the pool while it recovers.
+    """
 
-async def is_reachable(url: str, session: aiohttp.ClientSession) -> bool:
-    """Check if a URL is reachable using async requests."""
-    if not url:
-        return False
+    def __init__(self, per_host: int = PER_HOST_LIMIT):
+        self._semaphores = defaultdict(lambda: asyncio.Semaphore(per_host))
+        self._not_before: dict[str, float] = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, host: str):
+        async with self._semaphores[host]:
+            loop = asyncio.get_running_loop()
+            wait = self._not_before.get(host, 0.0) - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield
+
+    def back_off(self, host: str, delay: float) -> None:
+        until = asyncio.get_running_loop().time() + delay
+        self._not_before[host] = max(self._not_before.get(host, 0.0), until)
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str]) -> float:
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), BACKOFF_MAX)
+    return min(BACKOFF_BASE * (2**attempt), BACKOFF_MAX)
+
+
+async def _request(
+    method: str, url: str, session: aiohttp.ClientSession, headers: dict
+) -> dict:
+    async with session.request(
+        method,
+        url,
+        headers=headers,
+        allow_redirects=True,
+        timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+    ) as r:
+        return {
+            "status_code": r.status,
+            "final_url": str(r.url),
+            "etag": r.headers.get("ETag"),
+            "retry_after": r.headers.get("Retry-After"),
+        }
+
+
+async def check_url(
+    url: str,
+    session: aiohttp.ClientSession,
+    limiter: HostLimiter,
+    etag: Optional[str] = None,
+) -> dict:
+    """
+    Check a URL politely and report what the server answered.
 
-    try:
-        # Try HEAD request first
-        async with session.head(
-            url,
-            allow_redirects=True,
-            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
-        ) as r:
-            if 200 <= r.status < 400:
-                return True
-            # Some servers reject HEAD; try GET for those
-            if r.status in (403, 405) or r.status >= 400:
-                async with session.get(
-                    url,
-                    allow_redirects=True,
-                    timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
-                ) as r2:
-                    return 200 <= r2.status < 400
-            return False
-    except Exception:
-        # try a GET as last resort
-        try:
-            async with session.get(
-                url,
-                allow_redirects=True,
-                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
-            ) as r:
-                return 200 <= r.status < 400
-        except Exception:
-            return False
+    Returns:
+        dict with status_code, final_url, etag, reachable and error
+    """
+    host = urllib.parse.urlsplit(url).hostname or ""
+    headers = {"If-None-Match": etag} if etag else {}
+    outcome = {"status_code": None, "final_url": None, "etag": None, "error": None}
+
+    for attempt in range(MAX_RETRIES + 1):
+        retry_after = None
+        async with limiter.slot(host):
+            try:
+                response = await _request("HEAD", url, session, headers)
+                # Some servers reject HEAD; try GET for those
+                status = response["status_code"]
+                if status >= 400 and status not in RETRY_STATUSES:
+                    response = await _request("GET", url, session, headers)
+                outcome.update(response, error=None)
+                retry_after = outcome.pop("retry_after")
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                outcome.update(status_code=None, error=type(e).__name__)
+
+        status = outcome["status_code"]
+        if status is not None and status not in RETRY_STATUSES:
+            break
+        if outcome["error"] == "InvalidURL" or attempt == MAX_RETRIES:
+            break
+        limiter.back_off(host, _retry_delay(attempt, retry_after))
+
+    status = outcome["status_code"]
+    outcome["reachable"] = status is not None and (200 <= status < 400)
+    if status == 304:
+        outcome["etag"] = outcome["etag"] or etag
+    return outcome
 
 
 def make_search_fallback(name: str, city: Optional[str]) -> str:
@@ -91,146 +189,234 @@ def normalize_scheme(url: str) -> str:
 
 
 async def verify_school_website(
-    school: models.School, session: aiohttp.ClientSession
-) -> tuple[bool, Optional[str]]:
+    school: dict, session: aiohttp.ClientSession, limiter: HostLimiter
+) -> dict:
     """
     Verify and fix a school's website URL.
 
+    Args:
+        school: dict with id, name, website and the previously stored etag
+
     Returns:
-        (changed, new_website_url)
+        Check result for `website_checks`; `new_website` is set when the
+        school's website should change
     """
-    orig = school.website or ""
+    orig = school["website"] or ""
     candidate = orig.strip()
+    result = {
+        "school_id": school["id"],
+        "url": orig,
+        "status_code": None,
+        "final_url": None,
+        "etag": None,
+        "reachable": False,
+        "error": None,
+        "new_website": None,
+    }
 
     # If no website or a search/placeholder pattern, we'll attempt to resolve
-    is_placeholder = any(
-        p in candidate.lower()
-        for p in [
-            "google.com/search",
-            "bing.com/search",
-            "park",
-            "parking",
-            "domainparking",
-        ]
-    )
+    is_placeholder = any(p in candidate.lower() for p in PLACEHOLDER_PATTERNS)
 
     if candidate and not is_placeholder:
-        # Try raw URL
-        if await is_reachable(candidate, session):
-            return False, None  # No change needed
-
-        # Try normalizing scheme (add http://)
-        normalized = normalize_scheme(candidate)
-        if normalized != candidate and await is_reachable(normalized, session):
-            return True, normalized
+        # Try raw URL (the stored ETag only applies to the URL it came from)
+        outcome = await check_url(
+            normalize_scheme(candidate), session, limiter, school.get("etag")
+        )
+        result.update(outcome)
+        if outcome["reachable"]:
+            if normalize_scheme(candidate) != orig:
+                result["new_website"] = normalize_scheme(candidate)
+            result["url"] = result["new_website"] or orig
+            return result
 
     # fallback to search
-    fallback = make_search_fallback(school.name or "", None)
-    if fallback != (school.website or ""):
-        return True, fallback
+    fallback = make_search_fallback(school["name"] or "", None)
+    if fallback != orig:
+        result["new_website"] = fallback
+        result["url"] = fallback
+    return result
 
-    return False, None
 
+def iter_stale_schools(db, stale_after: Optional[timedelta], page_size: int = PAGE_SIZE):
+    """
+    Yield pages of schools whose website check is missing or out of date.
 
-async def process_schools_batch(
-    schools: list[models.School], db_session
-) -> tuple[int, int, int]:
+    Pages are read by id (keyset pagination) and only the needed columns are
+    selected, so results committed mid-run never shift later pages.
+    """
+    check = models.WebsiteCheck
+    school = models.School
+    query = db.query(school.id, school.name, school.website, check.etag).outerjoin(
+        check, check.school_id == school.id
+    )
+    if stale_after is not None:
+        cutoff = datetime.now(timezone.utc) - stale_after
+        query = query.filter(
+            or_(
+                check.id.is_(None),
+                check.checked_at < cutoff,
+                # website edited or cleared since it was last checked
+                check.url.is_distinct_from(school.website),
+            )
+        )
+
+    last_id = 0
+    while True:
+        rows = (
+            query.filter(school.id > last_id).order_by(school.id).limit(page_size).all()
+        )
+        if not rows:
+            return
+        yield [row._asdict() for row in rows]
+        last_id = rows[-1].id
+
+
+def save_results(db, results: list[dict]) -> None:
+    """Upsert check rows and apply website fixes for a batch, in one commit."""
+    if not results:
+        return
+    now = datetime.now(timezone.utc)
+    ids = [r["school_id"] for r in results]
+    existing = {
+        c.school_id: c
+        for c in db.query(models.WebsiteCheck).filter(
+            models.WebsiteCheck.school_id.in_(ids)
+        )
+    }
+    for r in results:
+        check = existing.get(r["school_id"])
+        if check is None:
+            check = models.WebsiteCheck(school_id=r["school_id"])
+            db.add(check)
+        check.url = r["url"]
+        check.checked_at = now
+        check.status_code = r["status_code"]
+        check.final_url = r["final_url"]
+        check.etag = r["etag"]
+        check.is_reachable = r["reachable"]
+        check.error = r["error"]
+
+    fixes = [
+        {"id": r["school_id"], "website": r["new_website"]}
+        for r in results
+        if r["new_website"]
+    ]
+    if fixes:
+        db.execute(update(models.School), fixes)
+    db.commit()
+
+
+async def verify_stale_websites(
+    db,
+    stale_after: Optional[timedelta] = STALE_AFTER,
+    workers: int = CONCURRENT_REQUESTS,
+    per_host: int = PER_HOST_LIMIT,
+    batch_size: int = COMMIT_BATCH_SIZE,
+    progress=None,
+) -> dict:
     """
-    Process a batch of schools concurrently.
+    Re-check stale school websites with a bounded worker pool.
+
+    Args:
+        db: Database session (used only from the event loop thread)
+        stale_after: Age after which a check is redone; None re-checks all
+        workers: Number of concurrent worker tasks
+        per_host: Concurrent requests allowed per host
+        batch_size: Results written back per commit
+        progress: Optional callable receiving the running stats dict
 
     Returns:
-        (valid, fixed, unchanged)
+        dict with checked, valid, fixed and errors counts
     """
-    valid = 0
-    fixed = 0
-    unchanged = 0
-
-    # Create async HTTP session
-    connector = aiohttp.TCPConnector(limit=CONCURRENT_REQUESTS)
+    stats = {"checked": 0, "valid": 0, "fixed": 0, "errors": 0}
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    pending: list[dict] = []
+    limiter = HostLimiter(per_host)
+
+    def flush(report: bool = True):
+        save_results(db, pending)
+        pending.clear()
+        if progress and report:
+            progress(dict(stats))
+
+    async def produce():
+        for page in iter_stale_schools(db, stale_after):
+            for school in page:
+                await queue.put(school)
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def worker(session):
+        while True:
+            school = await queue.get()
+            try:
+                if school is None:
+                    return
+                try:
+                    result = await verify_school_website(school, session, limiter)
+                except Exception as e:
+                    print(f"Error processing {school['name']}: {e}")
+                    stats["errors"] += 1
+                    continue
+                stats["checked"] += 1
+                if result["new_website"]:
+                    stats["fixed"] += 1
+                elif result["reachable"]:
+                    stats["valid"] += 1
+                pending.append(result)
+                if len(pending) >= batch_size:
+                    flush()
+            finally:
+                queue.task_done()
+
+    connector = aiohttp.TCPConnector(
+        limit=workers,
+        limit_per_host=per_host,
+        ttl_dns_cache=DNS_CACHE_TTL,
+    )
     timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
 
     async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-        # Create tasks for all schools
-        tasks = [verify_school_website(school, session) for school in schools]
-
-        # Process concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Update schools based on results
-        for school, result in zip(schools, results):
-            if isinstance(result, Exception):
-                print(f"Error processing {school.name}: {result}")
-                unchanged += 1
-                continue
-
-            changed, new_website = result
-
-            if changed and new_website:
-                school.website = new_website
-                fixed += 1
-            elif not changed:
-                unchanged += 1
-                valid += 1
+        # If any task fails (including a progress callback aborting the run)
+        # the rest are cancelled and finished results are still saved.
+        tasks = [asyncio.create_task(worker(session)) for _ in range(workers)]
+        tasks.append(asyncio.create_task(produce()))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            flush(report=False)
 
-    return valid, fixed, unchanged
+    return stats
 
 
-async def async_main() -> None:
+async def async_main(
+    stale_after: Optional[timedelta] = STALE_AFTER, progress=None
+) -> dict:
     """Async main function."""
     db_session = SessionLocal()
 
     try:
-        schools = db_session.query(models.School).order_by(models.School.id).all()
-        total = len(schools)
-
-        print(f"Processing {total} schools with async requests...")
-        print(f"Concurrent requests: {CONCURRENT_REQUESTS}")
+        print("Verifying stale school websites with async requests...")
+        print(f"Workers: {CONCURRENT_REQUESTS} (max {PER_HOST_LIMIT} per host)")
         print("=" * 60)
 
-        # Process all schools
-        valid, fixed, unchanged = await process_schools_batch(schools, db_session)
-
-        # Commit changes to database
-        db_session.commit()
+        stats = await verify_stale_websites(
+            db_session, stale_after, progress=progress
+        )
 
-        # ensure export directory exists and write export CSV
+        # ensure export directory exists and stream the export CSV
         EXPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with open(EXPORT_PATH, "w", newline="", encoding="utf-8") as fh:
-            writer = csv.writer(fh)
-            writer.writerow(
-                [
-                    "id",
-                    "name",
-                    "address",
-                    "latitude",
-                    "longitude",
-                    "contact",
-                    "website",
-                    "status",
-                    "completeness_score",
-                ]
-            )
-            for s in db_session.query(models.School).order_by(models.School.id):
-                writer.writerow(
-                    [
-                        s.id,
-                        s.name,
-                        s.address or "",
-                        s.latitude or "",
-                        s.longitude or "",
-                        s.contact or "",
-                        s.website or "",
-                        s.status or "",
-                        s.completeness_score or 0,
-                    ]
-                )
+        export.write_export(db_session, EXPORT_PATH, "csv", columns=EXPORT_COLUMNS)
 
         print("=" * 60)
-        print(f"Processed {total} schools.")
-        print(f"  Valid (unchanged): {valid}")
-        print(f"  Fixed/Updated: {fixed}")
-        print(f"  Errors: {unchanged - valid}")
+        print(f"Checked {stats['checked']} schools.")
+        print(f"  Valid (unchanged): {stats['valid']}")
+        print(f"  Fixed/Updated: {stats['fixed']}")
+        print(f"  Errors: {stats['errors']}")
         print(f"\nExport written to: {EXPORT_PATH}")
+        return stats
 
     finally:
         db_session.close()
@@ -238,7 +424,19 @@ async def async_main() -> None:
 
 def main() -> None:
     """Main entry point."""
-    asyncio.run(async_main())
+    parser = argparse.ArgumentParser(description="Verify school websites")
+    parser.add_argument(
+        "--stale-days",
+        type=float,
+        default=STALE_AFTER.days,
+        help="Re-check websites last checked more than this many days ago",
+    )
+    parser.add_argument(
+        "--all", action="store_true", help="Re-check every school regardless of age"
+    )
+    args = parser.parse_args()
+    stale_after = None if args.all else timedelta(days=args.stale_days)
+    asyncio.run(async_main(stale_after))
 
 
 if __name__ == "__main__":
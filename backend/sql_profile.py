@@ -0,0 +1,238 @@
+"""
+SQL statement profiling: fingerprints, slow-query log and per-request breakdown.
+
+Statements are timed once, by the engine events in metrics.py, which hand
+each one to this module to aggregate under a fingerprint (the SQL with
+literals and IN-lists collapsed), so "SELECT ... WHERE id = 1" and
+"... id = 2" count as one query shape.
+Statements slower than SLOW_QUERY_MS are logged on "doha_backend.sql"
+together with the route that issued them.
+
+Admins can send `X-Debug-Profile: 1` on any request to get a breakdown of
+SQL time vs Python time in the response headers:
+
+    Server-Timing: sql;dur=4.1;desc="3 queries", app;dur=7.9, total;dur=12.0
+    X-Debug-Profile: {"total_ms": 12.0, "sql_ms": 4.1, "python_ms": 7.9, ...}
+
+Timings are taken when the response starts, so for streaming responses
+they cover the work done before the first byte.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import List
+
+import anyio
+
+import metrics
+
+logger = logging.getLogger("doha_backend.sql")
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+MAX_FINGERPRINTS = 1000  # distinct query shapes tracked before new ones are dropped
+PROFILE_HEADER = b"x-debug-profile"
+PROFILE_TOP = 5  # statements listed in the X-Debug-Profile header
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(
+    r"\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)", re.I
+)
+_SPACE = re.compile(r"\s+")
+_SELECT_LIST = re.compile(r"^SELECT .+? FROM ", re.I)
+
+
+def fingerprint(statement: str) -> str:
+    """Normalise a statement so queries differing only in literals match."""
+    fp = _STRING.sub("?", statement)
+    fp = _NUMBER.sub("?", fp)
+    fp = _IN_LIST.sub("IN (...)", fp)
+    return _SPACE.sub(" ", fp).strip()
+
+
+class QueryStats:
+    __slots__ = ("count", "total_ms", "max_ms", "rows")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+        }
+
+
+_stats_lock = threading.Lock()
+_query_stats: dict = {}
+
+
+def top_queries(limit: int = 20, order_by: str = "total_ms") -> List[dict]:
+    """Aggregated statement stats, most expensive first."""
+    with _stats_lock:
+        rows = [{"fingerprint": fp, **s.as_dict()} for fp, s in _query_stats.items()]
+    rows.sort(key=lambda r: r[order_by], reverse=True)
+    return rows[:limit]
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _query_stats.clear()
+
+
+def _record_statement(statement, elapsed, cursor, stats) -> None:
+    """metrics statement hook: aggregate, collect and log one statement."""
+    elapsed_ms = elapsed * 1000
+    # rowcount is the affected-row count for DML; drivers report -1 for SELECT
+    rows = max(cursor.rowcount, 0) if cursor.rowcount is not None else 0
+    fp = fingerprint(statement)
+
+    with _stats_lock:
+        query_stats = _query_stats.get(fp)
+        if query_stats is None and len(_query_stats) < MAX_FINGERPRINTS:
+            query_stats = _query_stats[fp] = QueryStats()
+        if query_stats is not None:
+            query_stats.count += 1
+            query_stats.total_ms += elapsed_ms
+            query_stats.max_ms = max(query_stats.max_ms, elapsed_ms)
+            query_stats.rows += rows
+
+    if stats is not None and stats.queries is not None:
+        entry = stats.queries.setdefault(fp, [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+
+    if elapsed_ms >= SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1f ms, %d rows) route=%s: %s",
+            elapsed_ms,
+            rows,
+            stats.route if stats else None,
+            fp[:1000],
+        )
+
+
+def instrument_engine(engine) -> None:
+    """Attach statement profiling to a SQLAlchemy engine, through metrics' engine events."""
+    metrics.instrument_engine(engine)
+    metrics.add_statement_hook(_record_statement)
+
+
+def _is_admin_token(scope, authorization: str) -> bool:
+    """Resolve a bearer token to an active admin using the app's get_db."""
+    import auth
+    from db import get_db
+    from models import User
+
+    if not authorization.lower().startswith("bearer "):
+        return False
+    try:
+        payload = auth.decode_token(authorization[7:])
+    except Exception:
+        return False
+    if payload.get("type") != "access" or not payload.get("sub"):
+        return False
+
+    # Honour dependency overrides so tests and alternate databases work
+    app = scope.get("app")
+    get_session = getattr(app, "dependency_overrides", {}).get(get_db, get_db)
+    sessions = get_session()
+    db = next(sessions)
+    try:
+        user = db.query(User).filter(User.email == payload["sub"]).first()
+        return bool(user and user.is_active and user.is_admin)
+    finally:
+        sessions.close()
+
+
+class SQLProfileMiddleware:
+    """
+    Pure ASGI middleware adding the X-Debug-Profile breakdown for admins.
+
+    It reads the request's metrics.RequestStats, which also give the
+    slow-query log its route, so it must be added inside (before)
+    MetricsMiddleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        wants_profile = False
+        authorization = ""
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                wants_profile = value not in (b"", b"0")
+            elif name == b"authorization":
+                authorization = value.decode("latin-1")
+        if wants_profile:
+            wants_profile = await anyio.to_thread.run_sync(
+                _is_admin_token, scope, authorization
+            )
+
+        stats = metrics.current_request_stats()
+        if not wants_profile or stats is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Leave out the statements of the admin check above
+        statements, db_seconds = stats.statements, stats.db_seconds
+        stats.queries = {}
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - start) * 1000
+                headers = list(message.get("headers", ()))
+                headers.extend(_profile_headers(
+                    stats.queries,
+                    stats.statements - statements,
+                    (stats.db_seconds - db_seconds) * 1000,
+                    total_ms,
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _profile_headers(queries: dict, statements: int, sql_ms: float, total_ms: float):
+    python_ms = max(total_ms - sql_ms, 0.0)
+    top = sorted(queries.items(), key=lambda kv: kv[1][1], reverse=True)
+    summary = {
+        "total_ms": round(total_ms, 2),
+        "sql_ms": round(sql_ms, 2),
+        "python_ms": round(python_ms, 2),
+        "statements": statements,
+        "top": [
+            # Column lists are dropped so the FROM/WHERE part fits in a header
+            {
+                "sql": _SELECT_LIST.sub("SELECT ... FROM ", fp)[:200],
+                "count": count,
+                "ms": round(seconds * 1000, 2),
+            }
+            for fp, (count, seconds) in top[:PROFILE_TOP]
+        ],
+    }
+    timing = (
+        f'sql;dur={sql_ms:.2f};desc="{statements} queries", '
+        f"app;dur={python_ms:.2f}, total;dur={total_ms:.2f}"
+    )
+    return [
+        (b"server-timing", timing.encode("latin-1")),
+        (PROFILE_HEADER, json.dumps(summary).encode("latin-1")),
+    ]
@@ -0,0 +1,103 @@
+"""
+Startup-time report for a worker: import, app construction, startup hooks
+and the first request.
+
+main.py records each phase as it boots; FirstRequestMiddleware times the
+first request the worker serves (cold caches, first pool connection, lazy
+imports) and then logs the whole report once on "doha_backend.startup":
+
+    Startup: import 812.4 ms, app 35.1 ms, startup 6.2 ms, first request 48.9 ms (GET /)
+
+The same numbers are served at GET /api/admin/startup and exported as the
+app_startup_seconds gauge, so slow cold starts show up per deploy.
+"""
+
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from metrics import REGISTRY, Gauge
+
+_module_start = time.perf_counter()  # main.py imports this module first
+
+logger = logging.getLogger("doha_backend.startup")
+if not logger.handlers:
+    # One line per worker boot; uvicorn does not configure app loggers
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(levelname)s:     %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+STARTUP_SECONDS = REGISTRY.register(
+    Gauge("app_startup_seconds", "Worker startup time by phase", ["phase"])
+)
+
+PHASES = ("import", "app", "startup", "first_request")
+
+
+class StartupReport:
+    def __init__(self, created_at: float = None):
+        self.created_at = created_at if created_at is not None else time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.first_request: Optional[str] = None
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = seconds
+        STARTUP_SECONDS.set(seconds, phase=phase)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def as_dict(self) -> dict:
+        return {
+            "phases_ms": {
+                name: round(self.phases[name] * 1000, 2) for name in PHASES if name in self.phases
+            },
+            "first_request": self.first_request,
+        }
+
+    def summary(self) -> str:
+        parts = [
+            f"{name.replace('_', ' ')} {self.phases[name] * 1000:.1f} ms"
+            for name in PHASES
+            if name in self.phases
+        ]
+        suffix = f" ({self.first_request})" if self.first_request else ""
+        return "Startup: " + ", ".join(parts) + suffix
+
+
+REPORT = StartupReport(created_at=_module_start)
+
+
+class FirstRequestMiddleware:
+    """
+    Pure ASGI middleware timing the first HTTP request of the worker.
+
+    After that request it is a single attribute check per request.
+    """
+
+    def __init__(self, app, report: StartupReport = REPORT):
+        self.app = app
+        self.report = report
+        self._pending = True
+
+    async def __call__(self, scope, receive, send):
+        if not self._pending or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self._pending = False
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.report.first_request = f"{scope['method']} {scope['path']}"
+            self.report.record("first_request", time.perf_counter() - start)
+            logger.info(self.report.summary())
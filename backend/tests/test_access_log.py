@@ -0,0 +1,66 @@
+"""
+Tests for the structured access-log middleware.
+"""
+
+import io
+import json
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+import access_log
+from access_log import AccessLogMiddleware, redact_query
+
+
+def make_app(**options):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/broken")
+    def broken():
+        raise HTTPException(status_code=503, detail="down")
+
+    app.add_middleware(AccessLogMiddleware, **options)
+    return app
+
+
+def capture(app, *paths):
+    stream = io.StringIO()
+    access_log.configure_access_log(fmt="json", stream=stream)
+    try:
+        client = TestClient(app)
+        for path in paths:
+            client.get(path, headers={"Origin": "http://localhost:3000"})
+    finally:
+        access_log.stop_access_log()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_route_latency_and_redacts_query():
+    records = capture(make_app(), "/items/7?token=abc&page=2")
+
+    assert len(records) == 1
+    record = records[0]
+    assert record["route"] == "/items/{item_id}"
+    assert record["path"] == "/items/7"
+    assert record["status"] == 200
+    assert record["duration_ms"] >= 0
+    assert record["bytes"] == len(b'{"id":7}')
+    assert record["origin"] == "http://localhost:3000"
+    assert record["query"] == "token=[REDACTED]&page=2"
+
+
+def test_sampling_still_logs_errors_and_slow_requests():
+    records = capture(make_app(sample_rate=0), "/items/1", "/items/2", "/broken")
+    assert [(r["path"], r["level"]) for r in records] == [("/broken", "ERROR")]
+
+    slow = capture(make_app(sample_rate=0, slow_ms=0), "/items/1")
+    assert len(slow) == 1
+
+
+def test_redact_query_is_case_insensitive():
+    assert redact_query("Password=x&q=schools") == "Password=[REDACTED]&q=schools"
+    assert redact_query("") == ""
@@ -0,0 +1,70 @@
+"""
+Smoke test keeping the load-test suite runnable on a tiny dataset.
+"""
+
+from sqlalchemy import create_engine, update
+
+import models
+from benchmarks import datagen, importtime, load
+
+
+def test_load_suite_runs_on_tiny_dataset(tmp_path):
+    url = f"sqlite:///{tmp_path}/bench.db"
+    engine = create_engine(url)
+    size = datagen.DatasetSize(schools=30, teachers=5, parents=10, bookings=200)
+    datagen.generate(engine, size, log=lambda *a: None)
+    engine.dispose()
+
+    doc = load.run(url, scale=0.01, log=lambda *a: None)
+
+    assert doc["dataset"] == {"schools": 30, "teachers": 5, "users": 15, "bookings": 200}
+    assert set(doc["scenarios"]) == set(load.SCENARIOS)
+    for name, result in doc["scenarios"].items():
+        assert result["errors"] == 0, name
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+    assert doc["scenarios"]["login_storm"]["statuses"] == {"200": 1}
+
+
+def test_scenario_without_rows_to_draw_from_is_skipped(tmp_path):
+    url = f"sqlite:///{tmp_path}/bench.db"
+    engine = create_engine(url)
+    size = datagen.DatasetSize(schools=1, teachers=2, parents=2, bookings=20)
+    datagen.generate(engine, size, log=lambda *a: None)
+    with engine.begin() as conn:
+        conn.execute(update(models.Booking).values(payment_status="paid"))
+    engine.dispose()
+
+    doc = load.run(url, scenarios=["payment_checkout"], scale=0.01, log=lambda *a: None)
+    assert doc["scenarios"] == {}
+    assert doc["skipped"] == {"payment_checkout": "no unpaid bookings in the dataset"}
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert load.percentile(values, 50) == 50
+    assert load.percentile(values, 99) == 99
+    assert load.percentile([], 95) == 0.0
+
+
+def test_importtime_parse_and_lazy_optional_imports():
+    sample = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     json.decoder\n"
+        "import time:       300 |        420 |   json\n"
+    )
+    assert importtime.parse(sample) == {
+        "json.decoder": {"self_us": 120, "cumulative_us": 120, "depth": 2},
+        "json": {"self_us": 300, "cumulative_us": 420, "depth": 1},
+    }
+
+    # Optional SDKs and the test helpers are not imported on worker boot
+    result = importtime.measure("main", runs=1, env={"ENABLE_TEST_ENDPOINTS": "0"})
+    assert result["total_ms"] > 0
+    assert "api.payments" in result["modules"]
+    for module in ("stripe", "pyarrow", "api.test_helpers"):
+        assert module not in result["modules"], module
+
+    # ...and the marketplace routers only when enabled
+    result = importtime.measure("main", runs=1, env={"ENABLE_MARKETPLACE": "0"})
+    for module in ("api.teachers", "api.bookings", "api.payments", "api.reports"):
+        assert module not in result["modules"], module
@@ -0,0 +1,206 @@
+"""
+Micro-benchmarks for crud.py hot paths with SQL statement and latency budgets.
+
+Each case runs a crud function against a fixed synthetic dataset (seeded by
+benchmarks.datagen) and asserts:
+- the maximum number of SQL statements one call may issue, which catches
+  N+1 patterns and per-row queries regardless of machine speed;
+- a latency budget (best of several rounds), set roughly 10x above a
+  typical run, which catches algorithmic blowups without being flaky.
+"""
+
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import models
+import schemas
+from api.teachers import TeacherSearchFilters
+from benchmarks import datagen
+
+SIZE = datagen.DatasetSize(schools=2000, teachers=200, parents=500, bookings=20000)
+REVIEWS_PER_TEACHER = 50
+ROUNDS = 5
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    path = tmp_path_factory.mktemp("budgets") / "budgets.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    datagen.generate(engine, SIZE, log=lambda *a: None)
+    with engine.begin() as conn:
+        conn.execute(
+            models.TeacherReview.__table__.insert(),
+            [
+                {"teacher_id": t, "parent_id": p + 1, "rating": 1 + (t + p) % 5}
+                for t in range(1, 11)
+                for p in range(REVIEWS_PER_TEACHER)
+            ],
+        )
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.rollback()
+    session.close()
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def check_budget(engine, fn, max_statements, max_ms, rounds=ROUNDS):
+    """Run `fn` several times and assert its statement and latency budgets."""
+    best = float("inf")
+    result = None
+    for _ in range(rounds):
+        with count_statements(engine) as statements:
+            start = time.perf_counter()
+            result = fn()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        best = min(best, elapsed_ms)
+        assert len(statements) <= max_statements, (
+            f"{len(statements)} statements (budget {max_statements}):\n"
+            + "\n".join(statements)
+        )
+    assert best <= max_ms, f"best of {rounds} runs took {best:.1f} ms (budget {max_ms} ms)"
+    return result
+
+
+# ==================== SCHOOLS ====================
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"curriculum": "British"},
+        {"school_type": "Primary"},
+        {"search": "IB"},
+        {"location": "Lusail"},
+        {"status": "pending"},
+        {"curriculum": "American", "school_type": "Secondary", "location": "Al Sadd"},
+    ],
+    ids=lambda f: "-".join(f) or "none",
+)
+def test_list_schools_budget(engine, db, filters):
+    total, results = check_budget(
+        engine,
+        lambda: crud.list_schools(db, skip=100, limit=20, **filters),
+        max_statements=2,  # count + page
+        max_ms=50,
+    )
+    assert len(results) <= 20 and total >= len(results)
+
+
+# ==================== TEACHERS ====================
+
+
+@pytest.mark.parametrize(
+    "filters, sort_by",
+    [
+        ({}, "average_rating"),
+        ({"city": "Doha"}, "hourly_rate_qatari"),
+        ({"language": "Arabic", "teaches_online": True}, "total_reviews"),
+        ({"min_rating": 4.0, "max_hourly_rate": 250}, "average_rating"),
+        (
+            {"subject": "Mathematics", "grade_level": "Primary", "is_verified": True},
+            "average_rating",
+        ),
+    ],
+    ids=["none", "city", "language-online", "rating-rate", "subject-grade-verified"],
+)
+def test_search_teachers_budget(engine, db, filters, sort_by):
+    results = check_budget(
+        engine,
+        lambda: crud.search_teachers(db, TeacherSearchFilters(**filters), sort_by),
+        max_statements=1,
+        max_ms=25,
+    )
+    assert len(results) <= 20
+
+
+def test_update_teacher_rating_stats_budget(engine, db):
+    check_budget(
+        engine,
+        lambda: crud.update_teacher_rating_stats(db, 1),
+        max_statements=3,  # load reviews + load teacher + update
+        max_ms=30,
+    )
+    teacher = db.get(models.Teacher, 1)
+    assert teacher.total_reviews == REVIEWS_PER_TEACHER
+
+
+# ==================== BOOKINGS ====================
+
+
+def test_is_slot_available_budget(engine, db):
+    day = datagen.BOOKING_START + timedelta(days=10)
+    check_budget(
+        engine,
+        lambda: crud.is_slot_available(db, 5, day, "10:00", 1.0),
+        max_statements=2,  # availability + overlapping bookings
+        max_ms=20,
+    )
+    # Outside the seeded 08:00-20:00 availability
+    assert not crud.is_slot_available(db, 5, day, "21:00", 1.0)
+
+
+def test_get_user_bookings_budget(engine, db):
+    parent_id = 7
+    results = check_budget(
+        engine,
+        lambda: crud.get_user_bookings(db, parent_id, page=2, page_size=10),
+        max_statements=1,
+        max_ms=100,
+    )
+    assert all(b.parent_id == parent_id for b in results)
+
+
+# ==================== POSTS ====================
+
+
+def test_create_post_slug_budget(engine, db):
+    db.add_all(
+        models.Post(
+            author_id=1,
+            title="School Fees Guide",
+            slug="school-fees-guide" + (f"-{i}" if i else ""),
+            content="...",
+        )
+        for i in range(100)
+    )
+    db.commit()
+    try:
+        post = check_budget(
+            engine,
+            lambda: crud.create_post(
+                db, schemas.PostCreate(title="School Fees Guide", content="..."), 1
+            ),
+            max_statements=3,  # slug lookup + insert + refresh
+            max_ms=50,
+            rounds=1,
+        )
+        assert post.slug == "school-fees-guide-100"
+    finally:
+        db.query(models.Post).delete()
+        db.commit()
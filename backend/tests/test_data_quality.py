@@ -0,0 +1,123 @@
+"""
+Tests for SQL-side completeness scoring in scripts/data_quality.py.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db import Base
+from models import School, StagingSchool
+from scripts.data_quality import (
+    calculate_completeness_score,
+    completeness_score_expression,
+    get_missing_fields_report,
+    update_all_scores,
+)
+
+
+SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///:memory:"
+engine = create_engine(
+    SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session(test_db):
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = TestingSessionLocal(bind=connection)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+def school_variants():
+    """Rows covering every presence edge case the rules distinguish."""
+    return [
+        dict(name="Empty Fields"),
+        dict(name="Blank Strings", address="", contact="", website=""),
+        dict(name="Zero Coordinates", latitude=0.0, longitude=0.0),
+        dict(
+            name="Complete",
+            type="Primary",
+            curriculum="British",
+            address="West Bay, Doha",
+            latitude=25.3,
+            longitude=51.5,
+            contact="+974 4444 0000",
+            website="https://example.com",
+            fee_structure={"KG": 30000},
+            facilities=["Pool", "Library"],
+        ),
+        dict(name="Empty JSON", fee_structure={}, facilities=[]),
+        dict(name="Explicit None JSON", fee_structure=None, facilities=None),
+        dict(name="Dict Facilities", facilities={"pool": True}),
+        dict(name="String Facilities", facilities="Pool"),
+        dict(name="Partial", address="Al Rayyan", latitude=25.2, curriculum="IB"),
+    ]
+
+
+def test_sql_expression_matches_reference(db_session):
+    """The SQL CASE expression must agree with calculate_completeness_score."""
+    schools = [School(**data) for data in school_variants()]
+    db_session.add_all(schools)
+    db_session.commit()
+
+    sql_scores = dict(
+        db_session.query(School.id, completeness_score_expression(School)).all()
+    )
+    for school in schools:
+        assert sql_scores[school.id] == calculate_completeness_score(school), school.name
+
+
+def test_update_all_scores_in_sql(db_session):
+    """Scores are written back and the distribution is aggregated in SQL."""
+    schools = [StagingSchool(**data) for data in school_variants()]
+    db_session.add_all(schools)
+    db_session.commit()
+
+    stats = update_all_scores(db_session, "staging_schools")
+
+    expected = [calculate_completeness_score(s) for s in schools]
+    assert stats["total"] == len(schools)
+    assert stats["updated"] == sum(1 for score in expected if score != 0)
+    assert stats["min_score"] == min(expected)
+    assert stats["max_score"] == max(expected) == 100
+    assert stats["average_score"] == pytest.approx(sum(expected) / len(expected))
+    assert sum(stats["distribution"].values()) == len(schools)
+
+    db_session.expire_all()
+    stored = [
+        s.completeness_score
+        for s in db_session.query(StagingSchool).order_by(StagingSchool.id)
+    ]
+    assert stored == expected
+
+    # A second run has nothing left to change
+    assert update_all_scores(db_session, "staging_schools")["updated"] == 0
+
+
+def test_update_all_scores_rejects_unknown_table(db_session):
+    with pytest.raises(ValueError):
+        update_all_scores(db_session, "users")
+
+
+def test_missing_fields_report(db_session):
+    db_session.add_all([School(**data) for data in school_variants()])
+    db_session.commit()
+
+    report = get_missing_fields_report(db_session)
+
+    assert report["total_schools"] == len(school_variants())
+    assert report["missing_fields"]["name"] == 0
+    assert report["missing_fields"]["website"] == len(school_variants()) - 1
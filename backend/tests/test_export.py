@@ -0,0 +1,162 @@
+"""
+Tests for the streaming school export (export.py and GET /api/schools/export).
+"""
+
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import export
+from main import app
+from db import Base, get_db
+from models import User, School, StagingSchool
+from auth import hash_password
+
+
+SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test_export.db"
+engine = create_engine(
+    SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session(test_db):
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = TestingSessionLocal(bind=connection)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="function")
+def client(db_session):
+    def override_get_db():
+        try:
+            yield db_session
+        finally:
+            pass
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def admin_headers(client, db_session):
+    user = User(
+        email="admin@test.com",
+        hashed_password=hash_password("admin123"),
+        full_name="Admin User",
+        is_active=True,
+        is_admin=True,
+    )
+    db_session.add(user)
+    db_session.commit()
+    response = client.post(
+        "/api/auth/login", json={"email": "admin@test.com", "password": "admin123"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def many_schools(db_session):
+    statuses = ["published", "pending"]
+    schools = [
+        School(
+            name=f"School {i:03d}",
+            curriculum="British",
+            latitude=25.0 + i / 1000,
+            status=statuses[i % 2],
+        )
+        for i in range(25)
+    ]
+    db_session.add_all(schools)
+    db_session.add(StagingSchool(name="Staged Only", completeness_score=40))
+    db_session.commit()
+    return schools
+
+
+def test_stream_export_batches_rows(db_session, many_schools):
+    """Every batch becomes its own chunk and all statuses are included."""
+    chunks = list(export.stream_export(db_session, "csv", batch_size=10))
+    assert len(chunks) == 3
+
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert len(rows) == 25
+    assert rows[0]["name"] == "School 000"
+    assert {r["status"] for r in rows} == {"published", "pending"}
+
+
+def test_stream_export_rejects_unknown_arguments(db_session):
+    with pytest.raises(export.ExportError):
+        export.stream_export(db_session, "xml")
+    with pytest.raises(export.ExportError):
+        export.stream_export(db_session, "csv", table="users")
+    with pytest.raises(export.ExportError):
+        export.stream_export(db_session, "csv", columns=("id", "hashed_password"))
+
+
+def test_export_endpoint_jsonl_with_status(client, admin_headers, many_schools):
+    response = client.get(
+        "/api/schools/export",
+        params={"format": "jsonl", "status": "published"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "schools_export.jsonl" in response.headers["content-disposition"]
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == 13
+    assert all(r["status"] == "published" for r in records)
+
+
+def test_export_endpoint_staging_table(client, admin_headers, many_schools):
+    response = client.get(
+        "/api/schools/export",
+        params={"table": "staging_schools"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [r["name"] for r in rows] == ["Staged Only"]
+
+
+def test_export_endpoint_parquet(client, admin_headers, many_schools):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    response = client.get(
+        "/api/schools/export", params={"format": "parquet"}, headers=admin_headers
+    )
+    assert response.status_code == 200
+
+    table = parquet.read_table(io.BytesIO(response.content))
+    assert table.num_rows == 25
+    assert table.column("name")[0].as_py() == "School 000"
+
+
+def test_export_endpoint_bad_format(client, admin_headers):
+    response = client.get(
+        "/api/schools/export", params={"format": "xml"}, headers=admin_headers
+    )
+    assert response.status_code == 400
+
+
+def test_export_endpoint_requires_admin(client):
+    response = client.get("/api/schools/export")
+    assert response.status_code == 401
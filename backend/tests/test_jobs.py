@@ -0,0 +1,216 @@
+"""
+Tests for the background job queue (jobs.py and /api/admin/jobs).
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import jobs
+from main import app
+from db import Base, get_db
+from models import User, Job, StagingSchool, School
+from auth import hash_password
+
+
+SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test_jobs.db"
+engine = create_engine(
+    SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def client(test_db):
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+def _login(client, email, is_admin):
+    db = TestingSessionLocal()
+    db.add(
+        User(
+            email=email,
+            hashed_password=hash_password("secret123"),
+            full_name="Test User",
+            is_active=True,
+            is_admin=is_admin,
+        )
+    )
+    db.commit()
+    db.close()
+    response = client.post(
+        "/api/auth/login", json={"email": email, "password": "secret123"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def admin_headers(client):
+    return _login(client, "admin@test.com", True)
+
+
+@pytest.fixture
+def user_headers(client):
+    return _login(client, "user@test.com", False)
+
+
+@pytest.fixture
+def test_job_types(monkeypatch):
+    """Register throwaway job types for the duration of a test."""
+    monkeypatch.setattr(jobs, "JOB_TYPES", dict(jobs.JOB_TYPES))
+    monkeypatch.setattr(jobs, "PROGRESS_INTERVAL", 0)
+    calls = []
+
+    @jobs.register_job("count")
+    def count_job(ctx, upto: int = 3):
+        for i in range(upto):
+            ctx.report(i * 100 // upto, f"step {i}")
+            calls.append(i)
+        return {"counted": upto}
+
+    @jobs.register_job("explode")
+    def explode_job(ctx):
+        raise RuntimeError("boom")
+
+    @jobs.register_job("cancel_self")
+    def cancel_self_job(ctx):
+        s = TestingSessionLocal()
+        s.query(Job).filter(Job.id == ctx.job_id).update({"cancel_requested": True})
+        s.commit()
+        s.close()
+        ctx.check_cancelled()
+        calls.append("not reached")
+
+    return calls
+
+
+def _get(job_id):
+    db = TestingSessionLocal()
+    try:
+        return db.get(Job, job_id)
+    finally:
+        db.close()
+
+
+def test_enqueue_and_idempotency(client, admin_headers):
+    payload = {
+        "job_type": "accept_staging",
+        "params": {"min_score": 80},
+        "idempotency_key": "nightly-accept",
+    }
+    first = client.post("/api/admin/jobs/", json=payload, headers=admin_headers)
+    assert first.status_code == 202
+    assert first.json()["status"] == "queued"
+
+    again = client.post("/api/admin/jobs/", json=payload, headers=admin_headers)
+    assert again.status_code == 200
+    assert again.json()["id"] == first.json()["id"]
+
+    listed = client.get("/api/admin/jobs/", params={"status": "queued"}, headers=admin_headers)
+    assert [j["id"] for j in listed.json()] == [first.json()["id"]]
+
+
+def test_enqueue_rejects_bad_jobs(client, admin_headers):
+    unknown = client.post(
+        "/api/admin/jobs/", json={"job_type": "nope"}, headers=admin_headers
+    )
+    assert unknown.status_code == 400
+
+    bad_params = client.post(
+        "/api/admin/jobs/",
+        json={"job_type": "accept_staging", "params": {"threshold": 5}},
+        headers=admin_headers,
+    )
+    assert bad_params.status_code == 400
+
+
+def test_jobs_require_admin(client, user_headers):
+    assert client.get("/api/admin/jobs/", headers=user_headers).status_code == 403
+    assert client.get("/api/admin/jobs/").status_code == 401
+
+
+def test_worker_runs_jobs_in_order(client, admin_headers, test_job_types):
+    ok = client.post(
+        "/api/admin/jobs/", json={"job_type": "count", "params": {"upto": 4}},
+        headers=admin_headers,
+    ).json()
+    bad = client.post(
+        "/api/admin/jobs/", json={"job_type": "explode"}, headers=admin_headers
+    ).json()
+
+    assert jobs.run_next_job("w1", TestingSessionLocal) == ok["id"]
+    assert jobs.run_next_job("w1", TestingSessionLocal) == bad["id"]
+    assert jobs.run_next_job("w1", TestingSessionLocal) is None
+
+    done = client.get(f"/api/admin/jobs/{ok['id']}", headers=admin_headers).json()
+    assert done["status"] == "succeeded"
+    assert done["result"] == {"counted": 4}
+    assert done["progress"] == 100
+    assert done["attempts"] == 1
+    assert done["worker_id"] == "w1"
+    assert test_job_types == [0, 1, 2, 3]
+
+    failed = _get(bad["id"])
+    assert failed.status == "failed"
+    assert "RuntimeError: boom" in failed.error
+
+
+def test_builtin_accept_staging_job(client, admin_headers):
+    db = TestingSessionLocal()
+    db.add_all(
+        [
+            StagingSchool(name="Good", completeness_score=90),
+            StagingSchool(name="Weak", completeness_score=20),
+        ]
+    )
+    db.commit()
+    db.close()
+
+    job = client.post(
+        "/api/admin/jobs/",
+        json={"job_type": "accept_staging", "params": {"min_score": 70}},
+        headers=admin_headers,
+    ).json()
+    jobs.run_next_job("w1", TestingSessionLocal)
+
+    assert _get(job["id"]).status == "succeeded"
+    db = TestingSessionLocal()
+    assert [s.name for s in db.query(School)] == ["Good"]
+    db.close()
+
+
+def test_cancel_queued_and_running_jobs(client, admin_headers, test_job_types):
+    queued = client.post(
+        "/api/admin/jobs/", json={"job_type": "count"}, headers=admin_headers
+    ).json()
+    response = client.post(f"/api/admin/jobs/{queued['id']}/cancel", headers=admin_headers)
+    assert response.json()["status"] == "cancelled"
+    assert jobs.run_next_job("w1", TestingSessionLocal) is None
+
+    running = client.post(
+        "/api/admin/jobs/", json={"job_type": "cancel_self"}, headers=admin_headers
+    ).json()
+    jobs.run_next_job("w1", TestingSessionLocal)
+    assert _get(running["id"]).status == "cancelled"
+    assert "not reached" not in test_job_types
+
+    missing = client.post("/api/admin/jobs/9999/cancel", headers=admin_headers)
+    assert missing.status_code == 404
@@ -0,0 +1,92 @@
+"""
+Tests for the Prometheus metrics registry, middleware and /metrics endpoint.
+"""
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+import metrics
+from main import app as main_app
+
+
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+metrics.instrument_engine(engine)
+TestingSessionLocal = sessionmaker(bind=engine)
+
+
+def get_session():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    for metric in metrics.REGISTRY._metrics:
+        metric.clear()
+    yield
+
+
+def make_app():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int, db: Session = Depends(get_session)):
+        db.execute(text("SELECT 1")).scalar()
+        db.execute(text("SELECT 2")).scalar()
+        return {"id": item_id}
+
+    app.add_middleware(metrics.MetricsMiddleware)
+    return app
+
+
+def test_requests_recorded_by_route_template_with_sql_counts():
+    client = TestClient(make_app())
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+    assert metrics.HTTP_REQUESTS.value(**labels) == 2
+    assert metrics.HTTP_LATENCY.count(**labels) == 2
+    assert metrics.HTTP_REQUESTS.value(method="GET", route="<unmatched>", status="404") == 1
+    assert metrics.HTTP_IN_FLIGHT.value() == 0
+
+    # Two statements per request, counted from the threadpool worker
+    assert metrics.REQUEST_DB_STATEMENTS.sum(route="/items/{item_id}") == 4
+    assert metrics.DB_STATEMENTS.value(operation="SELECT") == 4
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = metrics.Histogram("demo_seconds", "Demo", ("route",), buckets=(0.1, 1.0))
+    hist.observe(0.05, route="/a")
+    hist.observe(0.5, route="/a")
+    hist.observe(5, route="/a")
+
+    lines = list(hist.render())
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{route="/a"} 3' in lines
+
+
+def test_metrics_endpoint(monkeypatch):
+    client = TestClient(main_app)
+    client.get("/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/",status="200"} 1' in body
+    assert "db_pool_checked_out" in body
+    assert "# TYPE http_request_duration_seconds histogram" in body
+
+    monkeypatch.setenv("METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics").status_code == 401
+    ok = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert ok.status_code == 200
@@ -0,0 +1,69 @@
+"""
+Tests for the raw ASGI middleware in middleware.py and its wiring in main.
+"""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from main import app as main_app
+from middleware import CORSFallbackMiddleware
+
+
+def make_app():
+    app = FastAPI()
+
+    @app.get("/plain")
+    def plain():
+        return {"ok": True}
+
+    @app.get("/allowed")
+    def allowed():
+        return JSONResponse({"ok": True}, headers={"Access-Control-Allow-Origin": "*"})
+
+    app.add_middleware(CORSFallbackMiddleware)
+    return app
+
+
+def test_fallback_adds_origin_when_missing():
+    client = TestClient(make_app())
+    response = client.get("/plain", headers={"Origin": "https://example.com"})
+    assert response.headers["access-control-allow-origin"] == "https://example.com"
+    assert response.headers["access-control-allow-credentials"] == "true"
+
+
+def test_fallback_leaves_existing_header_and_same_origin_requests():
+    client = TestClient(make_app())
+    response = client.get("/allowed", headers={"Origin": "https://example.com"})
+    assert response.headers.get_list("access-control-allow-origin") == ["*"]
+
+    assert "access-control-allow-origin" not in client.get("/plain").headers
+
+
+def test_fallback_does_not_buffer_streaming_responses():
+    """Each body message is forwarded as soon as the app sends it."""
+    sent = []
+
+    async def streaming_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        for chunk in (b"one,", b"two,"):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            assert sent[-1]["body"] == chunk
+        await send({"type": "http.response.body", "body": b"three"})
+
+    async def record(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": "/stream", "headers": [(b"origin", b"https://example.com")]}
+    asyncio.run(CORSFallbackMiddleware(streaming_app)(scope, None, record))
+
+    assert (b"access-control-allow-origin", b"https://example.com") in sent[0]["headers"]
+    assert [m["body"] for m in sent[1:]] == [b"one,", b"two,", b"three"]
+
+
+def test_main_app_uses_no_base_http_middleware():
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    assert not any(m.cls is BaseHTTPMiddleware for m in main_app.user_middleware)
@@ -0,0 +1,212 @@
+"""
+Tests for the Stripe webhook event ledger: deduplicated receipt, ordered
+and idempotent application, retries, and the simulate-payment helper.
+"""
+
+import hashlib
+import hmac
+import json
+import time
+from datetime import date, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import payment_events
+from api import payments, test_helpers
+from db import Base, get_db
+from models import Booking, PaymentEvent
+
+SECRET = "whsec_local"
+
+
+class LocalStripe:
+    """Stands in for Stripe: builds payment_intent events and signs them like Stripe does."""
+
+    def __init__(self, client):
+        self.client = client
+        self.count = 0
+        self.created = int(time.time()) - 60
+
+    def event(self, event_type, booking_id, created=None):
+        self.count += 1
+        return {
+            "id": f"evt_{self.count}",
+            "object": "event",
+            "type": event_type,
+            "created": created or self.created + self.count,
+            "data": {"object": {"id": "pi_1", "metadata": {"booking_id": str(booking_id)}}},
+        }
+
+    def deliver(self, event, secret=SECRET):
+        body = json.dumps(event)
+        timestamp = int(time.time())
+        signature = hmac.new(
+            secret.encode(), f"{timestamp}.{body}".encode(), hashlib.sha256
+        ).hexdigest()
+        return self.client.post(
+            "/api/payments/webhook",
+            content=body,
+            headers={
+                "Content-Type": "application/json",
+                "Stripe-Signature": f"t={timestamp},v1={signature}",
+            },
+        )
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'payment_events.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    monkeypatch.setenv("STRIPE_WEBHOOK_SECRET", SECRET)
+    monkeypatch.setenv("ENABLE_TEST_ENDPOINTS", "1")
+    app = FastAPI()
+    app.include_router(payments.router, prefix="/api/payments")
+    app.include_router(test_helpers.router)
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+@pytest.fixture
+def stripe(client):
+    return LocalStripe(client)
+
+
+def add_booking(session_factory):
+    with session_factory() as db:
+        booking = Booking(
+            teacher_id=1,
+            parent_id=2,
+            subject="Math",
+            session_type="online",
+            duration_hours=1,
+            scheduled_date=date(2026, 11, 2),
+            start_time="09:00",
+            end_time="10:00",
+            hourly_rate=100.0,
+            total_amount=100.0,
+            commission_amount=15.0,
+            teacher_amount=85.0,
+        )
+        db.add(booking)
+        db.commit()
+        return booking.id
+
+
+def booking_state(session_factory, booking_id):
+    with session_factory() as db:
+        booking = db.get(Booking, booking_id)
+        return booking.status, booking.payment_status
+
+
+def ledger(session_factory):
+    with session_factory() as db:
+        rows = db.query(PaymentEvent).order_by(PaymentEvent.id)
+        return [(e.stripe_event_id, e.status, e.attempts) for e in rows]
+
+
+def test_redelivered_event_is_recorded_and_applied_once(session_factory, stripe):
+    booking_id = add_booking(session_factory)
+    event = stripe.event("payment_intent.succeeded", booking_id)
+
+    first = stripe.deliver(event)
+    assert first.status_code == 200
+    assert first.json() == {"status": "received", "event_id": "evt_1", "duplicate": False}
+    assert booking_state(session_factory, booking_id) == ("confirmed", "paid")
+
+    with session_factory() as db:
+        db.query(Booking).update({"status": "completed"})  # the session happens meanwhile
+        db.commit()
+    retry = stripe.deliver(event)
+    assert retry.json()["duplicate"] is True
+    assert booking_state(session_factory, booking_id) == ("completed", "paid")
+    assert ledger(session_factory) == [("evt_1", "processed", 1)]
+
+    forged = stripe.deliver(stripe.event("payment_intent.succeeded", booking_id), "whsec_other")
+    assert forged.status_code == 400
+    assert len(ledger(session_factory)) == 1
+
+
+def test_events_apply_in_stripe_order_and_never_undo_a_payment(session_factory, stripe):
+    paid_id, retried_id = add_booking(session_factory), add_booking(session_factory)
+    with session_factory() as db:
+        # Recorded out of order, e.g. while no processor was running
+        payment_events.record_event(db, stripe.event("payment_intent.succeeded", retried_id))
+        payment_events.record_event(
+            db, stripe.event("payment_intent.payment_failed", retried_id, created=1)
+        )
+        payment_events.record_event(db, stripe.event("charge.updated", retried_id))
+
+    assert payment_events.process_pending(session_factory) == {"processed": 2, "ignored": 1}
+    assert booking_state(session_factory, retried_id) == ("confirmed", "paid")
+
+    # A failure that arrives after the payment succeeded changes nothing
+    stripe.deliver(stripe.event("payment_intent.succeeded", paid_id))
+    stripe.deliver(stripe.event("payment_intent.payment_failed", paid_id))
+    assert booking_state(session_factory, paid_id) == ("confirmed", "paid")
+    assert [status for _, status, _ in ledger(session_factory)][-2:] == ["processed", "ignored"]
+
+
+def test_failing_events_are_retried_then_failed(session_factory, stripe, monkeypatch):
+    booking_id = add_booking(session_factory)
+
+    def broken(db, event):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setitem(payment_events.EVENT_HANDLERS, "payment_intent.succeeded", broken)
+    stripe.deliver(stripe.event("payment_intent.succeeded", booking_id))
+    assert ledger(session_factory) == [("evt_1", "pending", 1)]
+    for _ in range(payment_events.MAX_ATTEMPTS - 1):
+        payment_events.process_pending(session_factory)
+    with session_factory() as db:
+        failed = db.query(PaymentEvent).one()
+        assert (failed.status, failed.attempts) == ("failed", payment_events.MAX_ATTEMPTS)
+        assert "database unavailable" in failed.error
+
+    # An event whose processor died mid-way is picked up again after the lease
+    monkeypatch.undo()
+    with session_factory() as db:
+        payment_events.record_event(db, stripe.event("payment_intent.succeeded", booking_id))
+        db.query(PaymentEvent).filter(PaymentEvent.stripe_event_id == "evt_2").update(
+            {
+                "status": "processing",
+                "attempts": 1,
+                "claimed_at": payment_events._now() - payment_events.EVENT_LEASE - timedelta(1),
+            }
+        )
+        db.commit()
+    assert payment_events.process_pending(session_factory) == {"processed": 1}
+    assert booking_state(session_factory, booking_id) == ("confirmed", "paid")
+
+
+def test_simulated_events_go_through_the_ledger(session_factory, client):
+    booking_id = add_booking(session_factory)
+    payload = {"booking_id": booking_id, "event_type": "payment_intent.payment_failed"}
+    failed = client.post("/api/test/simulate-payment-event", json=payload).json()
+    assert (failed["status"], failed["payment_status"]) == ("pending", "failed")
+
+    payload.update(event_type="payment_intent.succeeded", event_id="evt_replay")
+    paid = client.post("/api/test/simulate-payment-event", json=payload).json()
+    replay = client.post("/api/test/simulate-payment-event", json=payload).json()
+    assert (paid["status"], paid["payment_status"]) == ("confirmed", "paid")
+    assert paid["duplicate"] is False
+    assert replay["duplicate"] is True
+    assert [status for _, status, _ in ledger(session_factory)] == ["processed", "processed"]
+
+    payload.update(event_type="charge.refunded")
+    assert client.post("/api/test/simulate-payment-event", json=payload).status_code == 400
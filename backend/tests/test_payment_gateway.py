@@ -0,0 +1,191 @@
+"""
+Tests for the payment gateway: the circuit breaker, the offline fake and
+the payment endpoints running against it.
+"""
+
+import json
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import payment_gateway
+from api import payments
+from auth import get_current_user
+from db import Base, get_db
+from models import Booking, Teacher
+from payment_gateway import CircuitBreaker, FakeGateway, GatewayError, GatewayUnavailable
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyGateway(FakeGateway):
+    """The fake, timing out while `down` is set."""
+
+    down = False
+
+    def _retrieve_intent(self, intent_id):
+        if self.down:
+            raise GatewayUnavailable("Request to Stripe timed out")
+        return super()._retrieve_intent(intent_id)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'gateway.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def gateway():
+    gateway = FlakyGateway(breaker=CircuitBreaker(failure_threshold=2, reset_timeout=30))
+    previous = payment_gateway.set_gateway(gateway)
+    yield gateway
+    payment_gateway.set_gateway(previous)
+
+
+@pytest.fixture
+def client(session_factory, gateway):
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(payments.router, prefix="/api/payments")
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=2, is_admin=False)
+    return TestClient(app)
+
+
+def add_booking(session_factory, total=120.5):
+    with session_factory() as db:
+        db.add(Teacher(id=1, user_id=9, full_name="Ms Noor"))
+        booking = Booking(
+            teacher_id=1,
+            parent_id=2,
+            subject="Physics",
+            session_type="online",
+            duration_hours=1,
+            scheduled_date=date(2026, 11, 3),
+            start_time="15:00",
+            end_time="16:00",
+            hourly_rate=total,
+            total_amount=total,
+            commission_amount=total * 0.15,
+            teacher_amount=total * 0.85,
+        )
+        db.add(booking)
+        db.commit()
+        return booking.id
+
+
+def test_circuit_opens_fails_fast_and_recovers():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()  # a success resets the count
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(GatewayUnavailable) as refused:
+        breaker.before_call()
+    assert refused.value.retry_after == 10
+
+    clock.now = 10
+    assert breaker.state == "half_open"
+    breaker.before_call()  # the single trial call
+    with pytest.raises(GatewayUnavailable):
+        breaker.before_call()
+    breaker.record_failure()  # trial failed: open again
+    clock.now = 15
+    with pytest.raises(GatewayUnavailable):
+        breaker.before_call()
+
+    clock.now = 20
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_fake_gateway_honours_idempotency_keys():
+    gateway = FakeGateway()
+    first = gateway.create_intent(1000, "qar", {"booking_id": 1}, "Math", "key-1")
+    again = gateway.create_intent(1000, "qar", {"booking_id": 1}, "Math", "key-1")
+    other = gateway.create_intent(1000, "qar", {"booking_id": 1}, "Math", "key-2")
+    assert again.id == first.id and other.id != first.id
+    with pytest.raises(GatewayError, match="same parameters"):
+        gateway.create_intent(2000, "qar", {"booking_id": 1}, "Math", "key-1")
+    # A rejected request means the provider is up: the breaker stays closed
+    assert gateway.breaker.state == "closed"
+
+    # Gateways must implement every provider call
+    with pytest.raises(TypeError, match="_create_transfer"):
+        type("Partial", (payment_gateway.PaymentGateway,), {
+            "_create_intent": FakeGateway._create_intent,
+            "_retrieve_intent": FakeGateway._retrieve_intent,
+        })()
+
+
+def test_payment_flow_against_the_fake(session_factory, client, gateway):
+    booking_id = add_booking(session_factory)
+    created = client.post("/api/payments/create-payment-intent", params={"booking_id": booking_id})
+    assert created.status_code == 200
+    body = created.json()
+    assert body["amount"] == 120.5 and body["currency"] == "QAR"
+
+    # A double submit gets the same intent back
+    retry = client.post("/api/payments/create-payment-intent", params={"booking_id": booking_id})
+    assert retry.json()["paymentIntentId"] == body["paymentIntentId"]
+    intent = gateway.intents[body["paymentIntentId"]]
+    assert (intent.amount, intent.currency) == (12050, "qar")
+    assert intent.metadata["booking_id"] == str(booking_id)
+
+    event = gateway.complete(intent.id)
+    delivered = client.post("/api/payments/webhook", content=json.dumps(event))
+    assert delivered.status_code == 200
+    confirmed = client.post(f"/api/payments/confirm-payment/{intent.id}")
+    assert confirmed.json() == {
+        "status": "succeeded",
+        "booking_status": "confirmed",
+        "payment_status": "paid",
+    }
+
+    unknown = client.post("/api/payments/confirm-payment/pi_missing")
+    assert unknown.status_code == 400
+
+
+def test_provider_outage_is_served_as_503(session_factory, client, gateway):
+    booking_id = add_booking(session_factory)
+    intent_id = client.post(
+        "/api/payments/create-payment-intent", params={"booking_id": booking_id}
+    ).json()["paymentIntentId"]
+
+    gateway.down = True
+    for _ in range(2):
+        response = client.post(f"/api/payments/confirm-payment/{intent_id}")
+        assert response.status_code == 503
+    assert gateway.breaker.state == "open"
+
+    # While open the provider is not called at all, even once it is back
+    gateway.down = False
+    refused = client.post(f"/api/payments/confirm-payment/{intent_id}")
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == "30"
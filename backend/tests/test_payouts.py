@@ -0,0 +1,265 @@
+"""
+Tests for batched teacher payout runs (payouts.py, the payout_run job and
+/api/admin/payouts) and the per-booking payout endpoint built on them.
+"""
+
+import threading
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+import jobs
+import payment_gateway
+import payouts
+from api import payments
+from api import payouts as payouts_api
+from auth import get_current_admin_user, get_current_user
+from db import Base, get_db
+from models import Booking, PayoutRun, Teacher, TeacherPayout
+
+START = date(2026, 9, 1)
+
+
+class CountingGateway(payment_gateway.FakeGateway):
+    """The fake, recording how many transfers were in flight at once."""
+
+    def __init__(self, **kwargs):
+        super().__init__(latency=0.002, **kwargs)
+        self.in_flight = self.peak = 0
+        self.counter_lock = threading.Lock()
+
+    def _create_transfer(self, *args):
+        with self.counter_lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            return super()._create_transfer(*args)
+        finally:
+            with self.counter_lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'payouts.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def gateway():
+    gateway = CountingGateway(declined_accounts={"acct_3"})
+    previous = payment_gateway.set_gateway(gateway)
+    yield gateway
+    payment_gateway.set_gateway(previous)
+
+
+@pytest.fixture
+def client(session_factory, gateway):
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    admin = SimpleNamespace(id=1, is_admin=True, is_active=True)
+    app = FastAPI()
+    app.include_router(payouts_api.router, prefix="/api/admin/payouts")
+    app.include_router(payments.router, prefix="/api/payments")
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_admin_user] = lambda: admin
+    app.dependency_overrides[get_current_user] = lambda: admin
+    return TestClient(app)
+
+
+def seed(session_factory, teachers=30, per_teacher=100):
+    """
+    Every teacher has a connected account except the last (no account);
+    bookings cycle through completed+paid, completed+unpaid and confirmed.
+    """
+    with session_factory() as db:
+        db.execute(
+            insert(Teacher),
+            [
+                {
+                    "id": t,
+                    "user_id": 100 + t,
+                    "full_name": f"Teacher {t}",
+                    "stripe_account_id": f"acct_{t}" if t < teachers else None,
+                }
+                for t in range(1, teachers + 1)
+            ],
+        )
+        rows = []
+        for t in range(1, teachers + 1):
+            for n in range(per_teacher):
+                status, paid = [("completed", "paid"), ("completed", "pending"),
+                                ("confirmed", "paid")][n % 3]
+                rows.append({
+                    "teacher_id": t,
+                    "parent_id": 1,
+                    "subject": "Math",
+                    "session_type": "online",
+                    "duration_hours": 1,
+                    "scheduled_date": START + timedelta(days=n % 30),
+                    "start_time": "09:00",
+                    "end_time": "10:00",
+                    "hourly_rate": 100.0,
+                    "total_amount": 100.0,
+                    "commission_amount": 15.0,
+                    "teacher_amount": 85.0 + t,
+                    "currency": "QAR",
+                    "status": status,
+                    "payment_status": paid,
+                })
+        db.execute(insert(Booking), rows)
+        db.commit()
+
+
+def count_statements(session_factory, fn):
+    statements = []
+    engine = session_factory.kw["bind"]
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, statements
+
+
+def test_run_groups_bookings_per_teacher_in_constant_statements(session_factory):
+    seed(session_factory)
+    with session_factory() as db:
+        run, statements = count_statements(session_factory, lambda: payouts.create_run(db))
+        # 34 eligible bookings per teacher; the teacher without an account waits
+        assert (run.payout_count, run.booking_count) == (29, 29 * 34)
+        # run INSERT, INSERT ... SELECT, link, recompute, delete empties, totals,
+        # run UPDATE, refresh
+        assert len(statements) == 8
+
+        payout = db.query(TeacherPayout).filter(TeacherPayout.teacher_id == 2).one()
+        assert payout.amount == pytest.approx(34 * 87.0)
+        assert payout.idempotency_key == f"payout-run-{run.id}-2-QAR"
+        linked = db.query(Booking).filter(Booking.payout_id == payout.id).all()
+        assert len(linked) == 34
+        assert all(b.status == "completed" and b.payment_status == "paid" for b in linked)
+
+        # Nothing is due twice; the teacher without an account is still owed
+        again = payouts.create_run(db)
+        assert (again.payout_count, again.status) == (0, "completed")
+        [owed] = payouts.eligible_totals(db)
+        assert (owed["teacher_id"], owed["has_account"], owed["booking_count"]) == (30, False, 34)
+
+
+def test_through_date_limits_the_run(session_factory):
+    seed(session_factory, teachers=2, per_teacher=30)
+    with session_factory() as db:
+        run = payouts.create_run(db, through_date=START + timedelta(days=14))
+        assert run.booking_count == 5  # n = 0, 3, 6, 9, 12 of teacher 1
+
+
+def test_submit_is_bounded_batched_and_resumable(session_factory, gateway, monkeypatch):
+    seed(session_factory, teachers=30, per_teacher=3)
+    monkeypatch.setattr(payouts, "WRITE_BATCH", 10)
+    with session_factory() as db:
+        run = payouts.create_run(db)
+        reported = []
+        _, statements = count_statements(
+            session_factory,
+            lambda: payouts.submit_run(
+                db, run.id, concurrency=4, progress=lambda *p: reported.append(p)
+            ),
+        )
+        assert reported == [(10, 29), (20, 29), (29, 29)]  # the last partial batch too
+        assert gateway.peak <= 4
+        updates = [s for s in statements if s.startswith("UPDATE teacher_payouts SET status=?,")]
+        assert len(updates) == 3  # 29 outcomes in batches of 10
+
+        declined = db.query(TeacherPayout).filter(TeacherPayout.status == "failed").one()
+        assert declined.teacher_id == 3 and "acct_3" in declined.error
+        assert db.get(PayoutRun, run.id).status == "partial"
+        assert len(gateway.transfers) == 28
+
+        # Resubmitting sends only the failed payout, under its original key
+        gateway.declined_accounts.clear()
+        assert payouts.submit_run(db, run.id) == {"paid": 29}
+        assert len(gateway.transfers) == 29
+        assert db.get(PayoutRun, run.id).status == "completed"
+
+
+def test_provider_outage_leaves_payouts_pending(session_factory, gateway):
+    seed(session_factory, teachers=3, per_teacher=3)
+    gateway.breaker.failure_threshold = 1
+    gateway.breaker.record_failure()  # circuit open: every transfer is refused
+    with session_factory() as db:
+        run = payouts.create_run(db)
+        assert payouts.submit_run(db, run.id) == {"pending": 2}
+        assert db.get(PayoutRun, run.id).status == "failed"
+    assert gateway.transfers == {}
+
+
+def test_payout_run_job_and_admin_api(session_factory, client, gateway):
+    seed(session_factory, teachers=4, per_teacher=6)
+    eligible = client.get("/api/admin/payouts/eligible").json()
+    assert [(e["teacher_id"], e["booking_count"]) for e in eligible] == [
+        (1, 2), (2, 2), (3, 2), (4, 2)
+    ]
+
+    body = {"concurrency": 2, "idempotency_key": "week-40"}
+    queued = client.post("/api/admin/payouts/runs", json=body)
+    assert queued.status_code == 202 and queued.json()["job_type"] == "payout_run"
+    assert client.post("/api/admin/payouts/runs", json=body).status_code == 200
+
+    assert jobs.run_next_job("test", session_factory=session_factory) == queued.json()["id"]
+    with session_factory() as db:
+        result = db.get(jobs.models.Job, queued.json()["id"]).result
+    assert result["payouts"] == 3 and result["statuses"] == {"paid": 2, "failed": 1}
+
+    run = client.get(f"/api/admin/payouts/runs/{result['run_id']}").json()
+    assert run["status"] == "partial" and len(run["payouts"]) == 3
+    assert client.get("/api/admin/payouts/runs").json()[0]["id"] == result["run_id"]
+    assert client.get("/api/admin/payouts/runs/999").status_code == 404
+
+
+def test_single_booking_payout_is_linked_and_not_repeated(session_factory, client, gateway):
+    seed(session_factory, teachers=2, per_teacher=3)
+    with session_factory() as db:
+        booking_id = db.query(Booking.id).filter(Booking.teacher_id == 1).first()[0]
+
+    paid = client.post(f"/api/payments/payout/{booking_id}")
+    assert paid.status_code == 200 and paid.json()["amount"] == 86.0
+    assert client.post(f"/api/payments/payout/{booking_id}").status_code == 400
+    with session_factory() as db:
+        assert db.get(Booking, booking_id).payout_id == paid.json()["payout_id"]
+        # Teacher 1 had one eligible booking; teacher 2 has no connected account
+        assert payouts.create_run(db).booking_count == 0
+    assert len(gateway.transfers) == 1
+
+
+def test_single_booking_payout_lost_to_a_concurrent_run_leaves_no_run(
+    session_factory, client, gateway, monkeypatch
+):
+    seed(session_factory, teachers=2, per_teacher=3)
+    with session_factory() as db:
+        booking_id = db.query(Booking.id).filter(Booking.teacher_id == 1).first()[0]
+    create_run = payouts.create_run
+
+    def claimed_meanwhile(db, **kwargs):
+        with session_factory() as other:
+            create_run(other)  # a payout run claims the booking after the checks
+        return create_run(db, **kwargs)
+
+    monkeypatch.setattr(payouts, "create_run", claimed_meanwhile)
+    assert client.post(f"/api/payments/payout/{booking_id}").status_code == 409
+    with session_factory() as db:
+        assert db.query(PayoutRun).count() == 1  # only the competing run
@@ -0,0 +1,232 @@
+"""
+Tests for blog post slug allocation and list queries in crud.py, and the
+cached post, sitemap and feed pages.
+"""
+
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import page_cache
+import schemas
+from api import feeds, posts
+from db import Base, get_db
+from models import Post
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'posts.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def create(db, title, **fields):
+    return crud.create_post(db, schemas.PostCreate(title=title, content="...", **fields), 1)
+
+
+def test_slugs_fill_the_smallest_free_suffix(session_factory):
+    with session_factory() as db:
+        slugs = [create(db, "School Fees: A Guide!").slug for _ in range(3)]
+        assert slugs == ["school-fees-a-guide", "school-fees-a-guide-1", "school-fees-a-guide-2"]
+
+        # A different title that merely starts with the same words doesn't count
+        assert create(db, "School Fees a Guide 2024").slug == "school-fees-a-guide-2024"
+
+        crud.delete_post(db, db.query(Post).filter(Post.slug == "school-fees-a-guide-1").one().id)
+        assert create(db, "School fees a guide").slug == "school-fees-a-guide-1"
+        assert create(db, "School fees a guide").slug == "school-fees-a-guide-3"
+
+
+def test_update_keeps_own_slug_and_avoids_others(session_factory):
+    with session_factory() as db:
+        first = create(db, "Open Day")
+        second = create(db, "Admissions")
+
+        same = crud.update_post(db, first.id, schemas.PostUpdate(title="Open day"))
+        assert same.slug == "open-day"
+
+        renamed = crud.update_post(db, second.id, schemas.PostUpdate(title="Open Day"))
+        assert renamed.slug == "open-day-1"
+
+
+def test_concurrent_creators_retry_on_slug_conflict(session_factory, monkeypatch):
+    """Both writers pick the same free slug; the loser retries and takes the next one."""
+    workers = 2
+    barrier = threading.Barrier(workers, timeout=10)
+    lookups = []
+    original = crud.next_free_slug
+
+    def racing_next_free_slug(db, base_slug, exclude_post_id=None):
+        slug = original(db, base_slug, exclude_post_id)
+        lookups.append(slug)
+        if len(lookups) <= workers:
+            barrier.wait()  # first lookups: neither writer has committed yet
+        return slug
+
+    monkeypatch.setattr(crud, "next_free_slug", racing_next_free_slug)
+    results, errors = [], []
+
+    def writer():
+        try:
+            with session_factory() as db:
+                results.append(create(db, "Summer Camps", status="published").slug)
+        except Exception as e:  # pragma: no cover - reported by the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert lookups == ["summer-camps", "summer-camps", "summer-camps-1"]  # one retry
+    assert sorted(results) == ["summer-camps", "summer-camps-1"]
+    with session_factory() as db:
+        posts = db.query(Post).order_by(Post.slug).all()
+        assert [p.slug for p in posts] == ["summer-camps", "summer-camps-1"]
+        assert all(p.published_at is not None for p in posts)
+
+
+def test_list_posts_skips_content_and_uses_status_index(session_factory):
+    with session_factory() as db:
+        for i in range(3):
+            create(db, f"Post {i}", status="published", excerpt="Short")
+        create(db, "Draft")
+        db.expire_all()
+
+        statements = []
+        engine = db.get_bind()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            total, posts = crud.list_posts(db, 0, 10)
+            items = [schemas.PostListItem.model_validate(p) for p in posts]
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert total == 3 and [i.title for i in items] == ["Post 2", "Post 1", "Post 0"]
+        assert len(statements) == 2  # count + page, no per-post loads
+        assert all("posts.content" not in sql for sql, _ in statements)
+
+        sql, parameters = statements[-1]
+        plan = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parameters).all()
+        assert "idx_post_status_created" in " ".join(str(row) for row in plan)
+
+
+@pytest.fixture
+def client(session_factory):
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(posts.router, prefix="/api/posts")
+    app.include_router(feeds.router, prefix="/api")
+    app.dependency_overrides[get_db] = override_get_db
+    page_cache.CACHE.clear()
+    yield TestClient(app)
+    page_cache.CACHE.clear()
+
+
+@pytest.fixture
+def statements(session_factory):
+    """SQL statements executed while the test runs."""
+    executed = []
+    engine = session_factory.kw["bind"]
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_post_page_is_cached_until_the_post_changes(session_factory, client, statements):
+    with session_factory() as db:
+        post_id = create(db, "Open Day", status="published").id
+        create(db, "Secret", status="draft")
+
+    first = client.get("/api/posts/open-day")
+    assert first.status_code == 200
+    assert first.json()["title"] == "Open Day"
+    statements.clear()
+    assert client.get("/api/posts/open-day").content == first.content
+    assert statements == []  # served from the cache
+    assert client.get("/api/posts/secret").status_code == 404
+
+    with session_factory() as db:
+        crud.update_post(db, post_id, schemas.PostUpdate(title="Open Days", content="New"))
+    assert client.get("/api/posts/open-day").status_code == 404
+    assert client.get("/api/posts/open-days").json()["content"] == "New"
+
+    with session_factory() as db:
+        crud.delete_post(db, post_id)
+    assert client.get("/api/posts/open-days").status_code == 404
+
+
+def test_sitemap_and_feed_are_cached_and_invalidated(
+    session_factory, client, statements, monkeypatch
+):
+    with session_factory() as db:
+        create(db, "Fees & Scholarships", status="published", excerpt="<b>Costs</b>")
+        create(db, "Draft")
+        school = crud.create_school(db, schemas.SchoolCreate(name="Park House", status="published"))
+
+    # Sitemap locations must be absolute: no SITE_URL, no sitemap
+    monkeypatch.delenv("SITE_URL", raising=False)
+    assert client.get("/api/sitemap.xml").status_code == 404
+    monkeypatch.setenv("SITE_URL", "https://hub.example/")
+
+    sitemap = client.get("/api/sitemap.xml")
+    assert sitemap.headers["content-type"] == "application/xml"
+    assert "<loc>https://hub.example/blog/fees-scholarships</loc>" in sitemap.text
+    assert f"<loc>https://hub.example/schools/{school.id}</loc>" in sitemap.text
+    assert "/blog/draft" not in sitemap.text
+
+    feed = client.get("/api/feed.xml")
+    assert "<title>Fees &amp; Scholarships</title>" in feed.text
+    assert "&lt;b&gt;Costs&lt;/b&gt;" in feed.text
+
+    statements.clear()
+    assert client.get("/api/sitemap.xml").text == sitemap.text
+    assert client.get("/api/feed.xml").text == feed.text
+    assert statements == []
+
+    with session_factory() as db:
+        other = crud.create_school(
+            db, schemas.SchoolCreate(name="Doha College", status="published")
+        )
+    assert f"/schools/{other.id}</loc>" in client.get("/api/sitemap.xml").text
+    assert client.get("/api/feed.xml").text == feed.text  # school changes keep the feed
+
+    with session_factory() as db:
+        create(db, "Summer Camps", status="published")
+    assert "/blog/summer-camps" in client.get("/api/sitemap.xml").text
+    assert "<title>Summer Camps</title>" in client.get("/api/feed.xml").text
+
+
+def test_render_during_invalidation_is_not_stored():
+    cache = page_cache.PageCache(ttl=60)
+
+    def render():
+        cache.invalidate("key")  # a write commits while the page renders
+        return b"stale"
+
+    assert cache.get_or_render("key", render) == b"stale"
+    assert len(cache) == 0
+    assert cache.get_or_render("key", lambda: b"fresh") == b"fresh"
+    assert cache.get_or_render("key", lambda: b"unused") == b"fresh"
@@ -0,0 +1,139 @@
+"""
+Tests for the stack sampler and the admin profiling endpoints.
+"""
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import profiler
+from main import app
+from db import Base, get_db
+from models import User
+from auth import hash_password
+
+
+SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test_profiler.db"
+engine = create_engine(
+    SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def client():
+    Base.metadata.create_all(bind=engine)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def admin_headers(client):
+    db = TestingSessionLocal()
+    db.add(
+        User(
+            email="admin@test.com",
+            hashed_password=hash_password("admin123"),
+            full_name="Admin User",
+            is_active=True,
+            is_admin=True,
+        )
+    )
+    db.commit()
+    db.close()
+    response = client.post(
+        "/api/auth/login", json={"email": "admin@test.com", "password": "admin123"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def restore_sampling():
+    saved = profiler.SAMPLING.as_dict()
+    yield
+    for field, value in saved.items():
+        setattr(profiler.SAMPLING, field, value)
+    profiler.clear_request_profiles()
+
+
+def spin_until(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_collapses_stacks_of_busy_thread():
+    stop = threading.Event()
+    worker = threading.Thread(target=spin_until, args=(stop,), name="busy")
+    worker.start()
+    try:
+        sampler = profiler.StackSampler(interval=0.001).start()
+        time.sleep(0.1)
+        sampler.stop()
+    finally:
+        stop.set()
+        worker.join()
+
+    assert sampler.samples > 0
+    lines = sampler.collapsed().splitlines()
+    busy = [line for line in lines if line.startswith("busy;")]
+    assert busy
+    stack, count = busy[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert "spin_until (tests/test_profiler.py:" in stack
+    assert "stack-sampler" not in sampler.collapsed()
+
+
+def test_profile_endpoint_returns_collapsed_stacks(client, admin_headers):
+    response = client.get(
+        "/api/admin/profile", params={"seconds": 0.2, "interval": 0.001}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert int(response.headers["x-profile-samples"]) > 0
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in response.text.splitlines())
+
+
+def test_profile_endpoint_rejects_concurrent_profiles(client, admin_headers):
+    with profiler._profile_lock:
+        response = client.get(
+            "/api/admin/profile", params={"seconds": 0.1}, headers=admin_headers
+        )
+    assert response.status_code == 409
+
+
+def test_request_sampling_keeps_slowest(client, admin_headers, restore_sampling):
+    response = client.put(
+        "/api/admin/profile/sampling",
+        json={"path_prefix": "/api/schools", "every": 1, "keep": 2, "interval": 0.001},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+
+    for _ in range(3):
+        client.get("/api/schools/")
+    client.get("/")  # outside the prefix
+
+    profiles = client.get("/api/admin/profile/requests", headers=admin_headers).json()
+    assert len(profiles) == 2
+    assert all(p["path"] == "/api/schools/" for p in profiles)
+    assert profiles[0]["duration_ms"] >= profiles[1]["duration_ms"]
+    assert "stacks" in profiles[0]
+
+
+def test_profile_endpoints_require_admin(client):
+    assert client.get("/api/admin/profile").status_code == 401
+    assert client.get("/api/admin/profile/requests").status_code == 401
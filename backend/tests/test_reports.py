@@ -0,0 +1,235 @@
+"""
+Tests for the revenue_daily booking summary (revenue.py), its upkeep on
+booking writes, and /api/admin/reports/revenue.
+"""
+
+import threading
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import jobs
+import payment_events
+import revenue
+from api import reports
+from api.bookings import BookingUpdate
+from auth import get_current_admin_user
+from db import Base, get_db
+from models import Booking, RevenueDaily, Teacher
+
+MONDAY = date(2026, 9, 7)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'reports.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(session_factory):
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(reports.router, prefix="/api/admin/reports")
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_admin_user] = lambda: SimpleNamespace(
+        id=1, is_admin=True
+    )
+    return TestClient(app)
+
+
+def booking(teacher_id=1, day=MONDAY, subject="Math", session_type="online", amount=100.0,
+            status="completed", payment_status="paid"):
+    return {
+        "teacher_id": teacher_id,
+        "parent_id": 5,
+        "subject": subject,
+        "session_type": session_type,
+        "duration_hours": 1.5,
+        "scheduled_date": day,
+        "start_time": "09:00",
+        "end_time": "10:30",
+        "hourly_rate": amount / 1.5,
+        "total_amount": amount,
+        "commission_amount": amount * 0.15,
+        "teacher_amount": amount * 0.85,
+        "status": status,
+        "payment_status": payment_status,
+    }
+
+
+def summary(db):
+    rows = db.query(RevenueDaily).order_by(
+        RevenueDaily.teacher_id, RevenueDaily.day, RevenueDaily.subject, RevenueDaily.status,
+        RevenueDaily.payment_status,
+    )
+    return [
+        (r.teacher_id, r.day, r.subject, r.status, r.payment_status, r.booking_count,
+         r.gross_amount)
+        for r in rows
+    ]
+
+
+def test_booking_writes_keep_the_summary_in_step(session_factory):
+    with session_factory() as db:
+        unpaid = booking(status="pending", payment_status="pending")
+        first, second = (crud.create_booking(db, unpaid).id for _ in range(2))
+        crud.create_booking(db, booking(teacher_id=2, subject="Physics", amount=200.0))
+        assert summary(db) == [
+            (1, MONDAY, "Math", "pending", "pending", 2, 200.0),
+            (2, MONDAY, "Physics", "completed", "paid", 1, 200.0),
+        ]
+
+        # Paid through a webhook event, then taught; the other one is cancelled
+        event = {
+            "id": "evt_1",
+            "type": "payment_intent.succeeded",
+            "created": 1,
+            "data": {"object": {"id": "pi_1", "metadata": {"booking_id": str(first)}}},
+        }
+        payment_events.record_event(db, event)
+    payment_events.process_pending(session_factory)
+    with session_factory() as db:
+        crud.update_booking(db, first, BookingUpdate(status="completed"))
+        crud.cancel_booking(db, second)
+        incremental = summary(db)
+        assert incremental == [
+            (1, MONDAY, "Math", "cancelled", "pending", 1, 100.0),
+            (1, MONDAY, "Math", "completed", "paid", 1, 100.0),
+            (2, MONDAY, "Physics", "completed", "paid", 1, 200.0),
+        ]
+        assert revenue.rebuild(db) == 3
+        assert summary(db) == incremental
+
+
+def test_refresh_costs_the_same_for_any_number_of_buckets(session_factory):
+    with session_factory() as db:
+        db.execute(insert(Booking), [
+            booking(teacher_id=t, day=MONDAY + timedelta(days=d))
+            for t in range(1, 21) for d in range(10)
+        ])
+        statements = []
+        engine = session_factory.kw["bind"]
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            revenue.refresh(
+                db, [(t, MONDAY + timedelta(days=d)) for t in range(1, 21) for d in range(10)]
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        # Lock the teachers, DELETE the buckets, SELECT their groups, INSERT the new rows
+        assert len(statements) == 4
+        assert statements[0].startswith("SELECT teachers.id")
+        assert db.query(RevenueDaily).count() == 200
+
+    # The lock is a row lock where the database has them
+    lock = select(Teacher.id).with_for_update()
+    assert "FOR UPDATE" in str(lock.compile(dialect=postgresql.dialect()))
+
+
+def test_concurrent_writers_of_one_bucket_all_count(session_factory):
+    """Writers of the same (teacher, day) bucket take turns; none fails or is lost."""
+    workers = 4
+    with session_factory() as db:
+        db.add(Teacher(id=1, user_id=11, full_name="Ms Noor"))
+        db.commit()
+    barrier = threading.Barrier(workers, timeout=10)
+    errors = []
+
+    def writer(n):
+        try:
+            with session_factory() as db:
+                barrier.wait()  # all create at once
+                crud.create_booking(db, booking(amount=100.0 + n))
+        except Exception as e:  # pragma: no cover - reported by the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    with session_factory() as db:
+        assert summary(db) == [(1, MONDAY, "Math", "completed", "paid", 4, 406.0)]
+
+
+def test_revenue_report_rollups(session_factory, client):
+    with session_factory() as db:
+        db.add_all([Teacher(id=1, user_id=11, full_name="Ms Noor"),
+                    Teacher(id=2, user_id=12, full_name="Mr Adel")])
+        db.execute(insert(Booking), [
+            booking(),
+            booking(day=MONDAY + timedelta(days=6), session_type="in_person", amount=50.0),
+            booking(teacher_id=2, day=MONDAY + timedelta(days=7), subject="Physics"),
+            booking(teacher_id=2, day=date(2026, 10, 1), amount=300.0),
+            booking(teacher_id=2, day=date(2026, 10, 2), payment_status="refunded"),
+            booking(status="cancelled", payment_status="pending"),
+        ])
+        db.commit()
+        revenue.rebuild(db)
+
+    url = "/api/admin/reports/revenue"
+    monthly = client.get(url).json()
+    assert [(r["period"], r["booking_count"], r["gross_amount"]) for r in monthly["rows"]] == [
+        ("2026-09-01", 3, 250.0), ("2026-10-01", 1, 300.0)
+    ]
+    assert monthly["totals"] == [{
+        "currency": "QAR",
+        "booking_count": 4,
+        "hours": 6.0,
+        "gross_amount": 550.0,
+        "commission_amount": 82.5,
+        "teacher_amount": 467.5,
+    }]
+
+    weekly = client.get(url, params={"period": "week", "group_by": "teacher",
+                                     "date_to": "2026-09-30"}).json()
+    assert [(r["period"], r["teacher_name"], r["gross_amount"]) for r in weekly["rows"]] == [
+        ("2026-09-07", "Ms Noor", 150.0), ("2026-09-14", "Mr Adel", 100.0)
+    ]
+
+    daily = client.get(url, params={
+        "period": "day", "group_by": ["subject", "session_type"], "teacher_id": 1,
+    }).json()
+    assert [(r["period"], r["subject"], r["session_type"]) for r in daily["rows"]] == [
+        ("2026-09-07", "Math", "online"), ("2026-09-13", "Math", "in_person")
+    ]
+
+    cancelled = client.get(url, params={"status": "cancelled", "payment_status": "any"}).json()
+    assert cancelled["totals"][0]["booking_count"] == 1
+
+    assert client.get(url, params={"group_by": "parent"}).status_code == 400
+    assert client.get(url, params={"period": "year"}).status_code == 422
+    bad_range = client.get(url, params={"date_from": "2026-10-01", "date_to": "2026-09-01"})
+    assert bad_range.status_code == 400
+
+
+def test_rebuild_revenue_job(session_factory):
+    with session_factory() as db:
+        db.execute(insert(Booking), [booking(), booking(teacher_id=2)])
+        db.commit()
+        job, _ = crud.create_job(db, "rebuild_revenue")
+    jobs.run_next_job("test", session_factory=session_factory)
+    with session_factory() as db:
+        assert db.get(jobs.models.Job, job.id).result == {"rows": 2}
+        assert db.query(RevenueDaily).count() == 2
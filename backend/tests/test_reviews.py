@@ -0,0 +1,189 @@
+"""
+Tests for review moderation (the bulk status endpoint, the keyset
+moderation queue and the school rating stats they maintain) and the
+cached public review feed of a school.
+"""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import page_cache
+from api import reviews
+from auth import get_current_admin_user
+from db import Base, get_db
+from models import Review, School
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'reviews.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(session_factory):
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(reviews.router, prefix="/api/reviews")
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_admin_user] = lambda: SimpleNamespace(
+        id=1, is_admin=True, is_active=True
+    )
+    page_cache.CACHE.clear()
+    yield TestClient(app)
+    page_cache.CACHE.clear()
+
+
+def seed(session_factory, schools=10, per_school=200):
+    """Pending reviews rated 1-5 in turn; all share a few created_at seconds."""
+    with session_factory() as db:
+        db.execute(insert(School), [{"name": f"School {i}"} for i in range(schools)])
+        db.execute(
+            insert(Review),
+            [
+                {"school_id": s + 1, "user_id": n, "rating": n % 5 + 1, "status": "pending"}
+                for s in range(schools)
+                for n in range(per_school)
+            ],
+        )
+        db.commit()
+
+
+@contextmanager
+def recorded_statements(session_factory):
+    statements = []
+    engine = session_factory.kw["bind"]
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def school_stats(session_factory):
+    with session_factory() as db:
+        rows = db.query(School.id, School.total_reviews, School.average_rating).order_by(School.id)
+        return {school_id: (total, rating) for school_id, total, rating in rows}
+
+
+def test_bulk_status_is_set_based_and_idempotent(session_factory, client):
+    seed(session_factory)
+    with recorded_statements(session_factory) as statements:
+        response = client.patch(
+            "/api/reviews/status", json={"status": "approved", "current_status": "pending"}
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {"requested": None, "updated": 2000, "schools": 10}
+    # UPDATE reviews ... RETURNING, then for the schools: lock the rows (FOR UPDATE
+    # where supported), one grouped SELECT and one UPDATE
+    assert len(statements) == 4
+    assert statements[1].startswith("SELECT schools.id \nFROM schools")
+    assert school_stats(session_factory)[1] == (200, 3.0)
+
+    # Already approved: nothing changes on a retry
+    retry = client.patch("/api/reviews/status", json={"status": "approved", "ids": [1, 2]})
+    assert retry.json() == {"requested": 2, "updated": 0, "schools": 0}
+
+    rejected = client.patch(
+        "/api/reviews/status", json={"status": "rejected", "ids": [1, 2, 201]}
+    )
+    assert rejected.json() == {"requested": 3, "updated": 3, "schools": 2}
+    stats = school_stats(session_factory)
+    assert stats[1][0] == 198 and stats[2][0] == 199 and stats[3] == (200, 3.0)
+
+
+def test_bulk_status_requires_a_selection(client):
+    response = client.patch("/api/reviews/status", json={"status": "approved"})
+    assert response.status_code == 400
+    invalid = client.patch("/api/reviews/status", json={"status": "published", "ids": [1]})
+    assert invalid.status_code == 422
+
+
+def test_moderation_queue_keyset_pages(session_factory, client):
+    seed(session_factory, schools=3, per_school=40)
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 25, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/reviews/moderation", params=params).json()
+        pages += 1
+        if pages == 1:
+            # Approving the first page between requests doesn't shift later pages
+            ids = [r["id"] for r in page["results"]]
+            client.patch("/api/reviews/status", json={"status": "approved", "ids": ids})
+        else:
+            assert page["total"] == 95
+        seen += [r["id"] for r in page["results"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 5
+    assert seen == sorted(range(1, 121), reverse=True)  # same-second ties ordered by id
+
+    by_school = client.get("/api/reviews/moderation", params={"school_id": 1}).json()
+    assert by_school["total"] == 40
+    bad = client.get("/api/reviews/moderation", params={"cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+
+
+def test_single_review_changes_refresh_school_stats(session_factory):
+    seed(session_factory, schools=1, per_school=3)  # ratings 1, 2, 3
+    with session_factory() as db:
+        crud.update_review_status(db, 2, "approved")
+        crud.update_review_status(db, 3, "approved")
+        assert school_stats(session_factory)[1] == (2, 2.5)
+        crud.delete_review(db, 3)
+        assert school_stats(session_factory)[1] == (1, 2.0)
+        crud.update_review_status(db, 2, "rejected")
+        assert school_stats(session_factory)[1] == (0, 0.0)
+
+
+def test_school_review_feed_pages_summary_and_cache(session_factory, client):
+    seed(session_factory, schools=2, per_school=30)
+    approved = [i for i in range(1, 31) if i % 3]  # 20 reviews of school 1, ratings vary
+    client.patch("/api/reviews/status", json={"status": "approved", "ids": approved + [31]})
+
+    first = client.get("/api/reviews/school/1", params={"limit": 8, "summary": True})
+    page = first.json()
+    assert [r["id"] for r in page["results"]] == approved[::-1][:8]
+    assert page["summary"] == {"count": 20, "average_rating": 3.0, "histogram": [4, 4, 4, 4, 4]}
+
+    seen, cursor = [r["id"] for r in page["results"]], page["next_cursor"]
+    while cursor:
+        more = client.get("/api/reviews/school/1", params={"limit": 8, "cursor": cursor}).json()
+        assert more["summary"] is None
+        seen += [r["id"] for r in more["results"]]
+        cursor = more["next_cursor"]
+    assert seen == approved[::-1]
+
+    # The first page is cached until a moderation action touches the school
+    client.patch("/api/reviews/status", json={"status": "approved", "ids": [32]})  # school 2
+    with recorded_statements(session_factory) as statements:
+        cached = client.get("/api/reviews/school/1", params={"limit": 8, "summary": True})
+    assert cached.content == first.content and statements == []
+
+    client.patch("/api/reviews/status", json={"status": "rejected", "ids": [29]})
+    page = client.get("/api/reviews/school/1", params={"limit": 8, "summary": True}).json()
+    assert page["results"][0]["id"] == 28 and page["summary"]["count"] == 19
+
+    bad = client.get("/api/reviews/school/1", params={"cursor": "bad"})
+    assert bad.status_code == 400
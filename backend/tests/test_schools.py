@@ -2,14 +2,19 @@
 Integration tests for schools API endpoints.
 """
 
+import json
+from typing import List
+
 import pytest
 from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from main import app
 from db import Base, get_db
-from models import User, School
+from models import Favorite, User, School, StagingSchool
+from schemas import SchoolOut
 from auth import hash_password
 
 # Test database setup
@@ -148,6 +153,43 @@ def sample_schools(db_session):
 # ===== List Schools Tests =====
 
 
+def test_list_schools_fast_path_matches_default_serialization(client, db_session, sample_schools):
+    """Test that the column-selected fast path returns what response_model would."""
+    db_session.add(
+        School(
+            name="Ecole Fran\u00e7aise",
+            curriculum="French",
+            fee_structure={"annual": 52000, "currency": "QAR"},
+            facilities=["Pool", "Library"],
+            latitude=25.3,
+            status="published",
+        )
+    )
+    db_session.commit()
+
+    response = client.get("/api/schools/?page_size=100")
+    assert response.status_code == 200
+
+    schools = (
+        db_session.query(School)
+        .filter(School.status == "published")
+        .order_by(School.name)
+        .all()
+    )
+    adapter = TypeAdapter(List[SchoolOut])
+    expected = adapter.dump_python(
+        adapter.validate_python(schools, from_attributes=True), mode="json"
+    )
+    body = {"total": len(schools), "page": 1, "page_size": 100, "results": expected}
+    assert response.content == json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode()
+
+    # The OpenAPI schema still documents the response model
+    schema = client.get("/openapi.json").json()["paths"]["/api/schools/"]["get"]
+    assert schema["responses"]["200"]["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/SchoolListResponse"
+    }
+
+
 def test_list_schools_default(client, sample_schools):
     """Test listing schools with default parameters."""
     response = client.get("/api/schools/")
@@ -379,3 +421,160 @@ def test_create_school_with_invalid_coordinates(client, admin_token):
         headers={"Authorization": f"Bearer {admin_token}"},
     )
     assert response.status_code == 422
+
+
+# ===== Batch Staging Acceptance Tests =====
+
+
+@pytest.fixture
+def staging_schools(db_session):
+    """Create staging schools with a spread of completeness scores."""
+    rows = [
+        StagingSchool(name="Staged High", curriculum="British", completeness_score=90),
+        StagingSchool(name="Staged Mid", curriculum="IB", completeness_score=75),
+        StagingSchool(name="Staged Low", completeness_score=30),
+        StagingSchool(
+            name="Staged Duplicate",
+            completeness_score=95,
+            status="possible_duplicate",
+        ),
+    ]
+    for row in rows:
+        db_session.add(row)
+    db_session.commit()
+    return rows
+
+
+def test_list_staging_fast_path(client, admin_token, staging_schools):
+    """Test that staging rows are listed in id order with every StagingOut field."""
+    response = client.get(
+        "/api/schools/staging/list?limit=3",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [row["name"] for row in data] == ["Staged High", "Staged Mid", "Staged Low"]
+    assert data[0]["status"] == "staging"
+    assert data[2]["curriculum"] is None
+
+
+def test_accept_staging_batch_by_filter(client, admin_token, db_session, staging_schools):
+    """Test promoting staging schools by score and status."""
+    response = client.post(
+        "/api/schools/staging/accept-batch",
+        json={"min_score": 70, "status": "staging"},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["matched"] == 2
+    assert data["accepted"] == 2
+    assert data["removed"] == 2
+
+    published = db_session.query(School).filter(School.status == "published").all()
+    assert {s.name for s in published} == {"Staged High", "Staged Mid"}
+    assert {s.completeness_score for s in published} == {90, 75}
+    remaining = {s.name for s in db_session.query(StagingSchool).all()}
+    assert remaining == {"Staged Low", "Staged Duplicate"}
+
+
+def test_accept_staging_batch_by_ids_is_retry_safe(
+    client, admin_token, db_session, staging_schools
+):
+    """Test that repeating an id-based batch does not duplicate schools."""
+    ids = [staging_schools[0].id, staging_schools[2].id]
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    first = client.post(
+        "/api/schools/staging/accept-batch", json={"ids": ids}, headers=headers
+    )
+    assert first.status_code == 200
+    assert first.json() == {"requested": 2, "matched": 2, "accepted": 2, "removed": 2}
+
+    retry = client.post(
+        "/api/schools/staging/accept-batch", json={"ids": ids}, headers=headers
+    )
+    assert retry.status_code == 200
+    assert retry.json()["accepted"] == 0
+    assert db_session.query(School).count() == 2
+
+
+def test_accept_staging_batch_requires_selection(client, admin_token, staging_schools):
+    """Test that an empty selection is rejected instead of accepting everything."""
+    response = client.post(
+        "/api/schools/staging/accept-batch",
+        json={},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 400
+
+
+def test_accept_staging_batch_as_regular_user(client, user_token, staging_schools):
+    """Test that regular users cannot batch-accept staging schools."""
+    response = client.post(
+        "/api/schools/staging/accept-batch",
+        json={"min_score": 0},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert response.status_code == 403
+
+
+# ===== Favorite Status Tests =====
+
+
+@pytest.fixture
+def favorites(db_session, regular_user, sample_schools):
+    """Save the first two sample schools for the regular user."""
+    for school in sample_schools[:2]:
+        db_session.add(Favorite(user_id=regular_user.id, school_id=school.id))
+    db_session.commit()
+    return [school.id for school in sample_schools[:2]]
+
+
+def test_check_favorites_batch(client, user_token, sample_schools, favorites):
+    """Test that one request answers favorite status for a whole page of schools."""
+    school_ids = [school.id for school in sample_schools] + [9999]
+    response = client.post(
+        "/api/favorites/check",
+        json={"school_ids": school_ids},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"favorited": sorted(favorites)}
+
+    assert client.post("/api/favorites/check", json={"school_ids": [1]}).status_code == 401
+
+
+def test_list_schools_marks_favorites_when_signed_in(client, user_token, favorites):
+    """Test that is_favorited is only added for authenticated requests."""
+    anonymous = client.get("/api/schools/").json()["results"]
+    assert all("is_favorited" not in school for school in anonymous)
+
+    # An expired or invalid token is served anonymously rather than rejected
+    invalid = client.get("/api/schools/", headers={"Authorization": "Bearer nope"})
+    assert invalid.status_code == 200
+
+    results = client.get(
+        "/api/schools/", headers={"Authorization": f"Bearer {user_token}"}
+    ).json()["results"]
+    assert {s["id"] for s in results if s["is_favorited"]} == set(favorites)
+    assert len(results) == len(anonymous)
+
+
+def test_list_favorites_includes_school_summaries(
+    client, user_token, db_session, regular_user, favorites
+):
+    """Test that the favorites list renders from one call, deleted schools included."""
+    db_session.add(Favorite(user_id=regular_user.id, school_id=9999))
+    db_session.commit()
+
+    response = client.get(
+        "/api/favorites/", headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert response.status_code == 200
+    by_school = {f["school_id"]: f["school"] for f in response.json()}
+    assert by_school.pop(9999) is None
+    assert set(by_school) == set(favorites)
+    summary = by_school[favorites[0]]
+    assert summary["name"] == "British International School"
+    assert summary["curriculum"] == "British" and summary["total_reviews"] == 0
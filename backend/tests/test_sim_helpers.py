@@ -7,6 +7,7 @@ from sqlalchemy.orm import sessionmaker
 from datetime import date
 
 from main import app
+from api import test_helpers
 from db import Base, get_db
 from models import Booking
 
@@ -55,6 +56,14 @@ def client(db_session):
 @pytest.fixture(autouse=True)
 def enable_test_endpoints(monkeypatch):
     monkeypatch.setenv("ENABLE_TEST_ENDPOINTS", "1")
+    # main only mounts the router when the flag is set at import time
+    routes = list(app.router.routes)
+    if not any(r.path.startswith("/api/test/") for r in routes):
+        app.include_router(test_helpers.router)
+        app.openapi_schema = None
+    yield
+    app.router.routes[:] = routes
+    app.openapi_schema = None
 
 
 def test_create_teacher_and_simulate_payment(client, db_session):
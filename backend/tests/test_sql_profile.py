@@ -0,0 +1,126 @@
+"""
+Tests for SQL profiling: fingerprints, slow-query log and X-Debug-Profile.
+"""
+
+import json
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import metrics
+import sql_profile
+from main import app
+from db import Base, get_db
+from models import User, School
+from auth import hash_password
+
+
+SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test_sql_profile.db"
+engine = create_engine(
+    SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+sql_profile.instrument_engine(engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def client(test_db):
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+def _login(client, email, is_admin):
+    db = TestingSessionLocal()
+    db.add(
+        User(
+            email=email,
+            hashed_password=hash_password("secret123"),
+            full_name="Test User",
+            is_active=True,
+            is_admin=is_admin,
+        )
+    )
+    db.add(School(name=f"School for {email}", status="published"))
+    db.commit()
+    db.close()
+    response = client.post(
+        "/api/auth/login", json={"email": email, "password": "secret123"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    a = sql_profile.fingerprint("SELECT * FROM schools WHERE id = 1 AND name = 'A''s'")
+    b = sql_profile.fingerprint("SELECT *\n  FROM schools WHERE id = 22 AND name = 'B'")
+    assert a == b == "SELECT * FROM schools WHERE id = ? AND name = ?"
+
+    assert sql_profile.fingerprint("SELECT 1 FROM t WHERE id IN (?, ?, ?)") == (
+        "SELECT ? FROM t WHERE id IN (...)"
+    )
+
+
+def test_debug_profile_header_for_admin_only(client):
+    admin = _login(client, "admin@test.com", True)
+    user = _login(client, "user@test.com", False)
+
+    response = client.get("/api/schools/", headers={**admin, "X-Debug-Profile": "1"})
+    assert response.status_code == 200
+    profile = json.loads(response.headers["x-debug-profile"])
+    assert profile["statements"] == 4  # user lookup + count + page + favorite status
+    assert profile["total_ms"] >= profile["sql_ms"]
+    assert any("FROM schools" in q["sql"] for q in profile["top"])
+    assert response.headers["server-timing"].startswith("sql;dur=")
+
+    for headers in ({**user, "X-Debug-Profile": "1"}, {"X-Debug-Profile": "1"}, admin):
+        response = client.get("/api/schools/", headers=headers)
+        assert response.status_code == 200
+        assert "x-debug-profile" not in response.headers
+
+
+def test_slow_queries_logged_with_route(client, monkeypatch, caplog):
+    monkeypatch.setattr(sql_profile, "SLOW_QUERY_MS", 0)
+    with caplog.at_level(logging.WARNING, logger="doha_backend.sql"):
+        client.get("/api/schools/1")
+    messages = [r.getMessage() for r in caplog.records if r.name == "doha_backend.sql"]
+    assert any("route=/api/schools/{school_id}" in m for m in messages)
+
+
+def test_query_stats_endpoint(client):
+    sql_profile.reset_stats()
+    admin = _login(client, "admin@test.com", True)
+    client.get("/api/schools/", headers=admin)
+
+    response = client.get("/api/admin/sql/queries", params={"order_by": "count"}, headers=admin)
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats and all(s["count"] >= 1 for s in stats)
+    assert any("FROM schools" in s["fingerprint"] for s in stats)
+
+    user = _login(client, "user@test.com", False)
+    assert client.get("/api/admin/sql/queries", headers=user).status_code == 403
+
+
+def test_profiling_shares_the_metrics_engine_events():
+    # One before/after pair per engine: statements are timed once, for both
+    assert event.contains(engine, "after_cursor_execute", metrics._after_cursor_execute)
+    assert len(engine.dispatch.before_cursor_execute) == 1
+    assert len(engine.dispatch.after_cursor_execute) == 1
@@ -0,0 +1,141 @@
+"""
+Tests for the database bootstrap command, the startup schema check and the
+startup-time report.
+"""
+
+import pytest
+from alembic import command
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import (
+    Column, DateTime, Float, Integer, MetaData, String, Table, create_engine, inspect, text,
+)
+
+import migrations
+from startup import FirstRequestMiddleware, StartupReport
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'startup.db'}")
+    yield engine
+    engine.dispose()
+
+
+def revision(engine):
+    with engine.connect() as conn:
+        return migrations.current_revision(conn)
+
+
+def test_head_revision_matches_alembic():
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory.from_config(migrations._config())
+    assert migrations.head_revision() == script.get_current_head()
+
+
+def test_bootstrap_creates_stamps_and_upgrades(engine):
+    head = migrations.head_revision()
+    assert migrations.bootstrap(engine) == "created"
+    assert revision(engine) == head
+    assert migrations.bootstrap(engine) == "upgraded"  # nothing pending, no-op
+
+    # Downgrade to before the payouts migration and upgrade again
+    with engine.begin() as conn:
+        command.downgrade(migrations._config(conn), "8d3f61a2c5e7")
+    assert revision(engine) == "8d3f61a2c5e7"
+    assert not inspect(engine).has_table("teacher_payouts")
+    assert migrations.bootstrap(engine) == "upgraded"
+    assert revision(engine) == head
+    columns = {c["name"] for c in inspect(engine).get_columns("teachers")}
+    assert "stripe_account_id" in columns
+    assert inspect(engine).has_table("teacher_payouts")
+
+
+def baseline_schema(engine):
+    """The schema the baseline's create_all on boot produced, stamped at 972641930c9c."""
+    assert migrations.bootstrap(engine) == "created"
+    with engine.begin() as conn:
+        command.downgrade(migrations._config(conn), migrations.LEGACY_REVISION)
+    # That create_all also made teacher_payouts and teachers.stripe_account_id
+    legacy = MetaData()
+    Table(
+        "teacher_payouts",
+        legacy,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("teacher_id", Integer, nullable=False, index=True),
+        Column("amount", Float, nullable=False),
+        Column("currency", String(10)),
+        Column("status", String(30)),
+        Column("stripe_transfer_id", String(255)),
+        Column("created_at", DateTime(timezone=True)),
+        Column("processed_at", DateTime(timezone=True)),
+    )
+    legacy.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE teachers ADD COLUMN stripe_account_id VARCHAR(255)"))
+
+
+def test_bootstrap_upgrades_legacy_create_all_database(engine):
+    baseline_schema(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE alembic_version"))
+    assert revision(engine) is None
+
+    assert migrations.bootstrap(engine) == "stamped"
+    assert revision(engine) == migrations.head_revision()
+    school_columns = {c["name"] for c in inspect(engine).get_columns("schools")}
+    assert {"average_rating", "total_reviews", "rating_counts"} <= school_columns
+    payout_columns = {c["name"] for c in inspect(engine).get_columns("teacher_payouts")}
+    assert {"run_id", "idempotency_key"} <= payout_columns
+    assert inspect(engine).has_table("revenue_daily")
+
+
+def test_bootstrap_upgrades_database_stamped_before_payouts(engine):
+    baseline_schema(engine)
+
+    assert migrations.bootstrap(engine) == "upgraded"
+    assert revision(engine) == migrations.head_revision()
+    columns = {c["name"] for c in inspect(engine).get_columns("teacher_payouts")}
+    assert {"run_id", "idempotency_key"} <= columns
+
+
+def test_verify_schema_modes_and_cache(engine, caplog):
+    with pytest.raises(migrations.SchemaOutOfDate, match="run_migrations"):
+        migrations.verify_schema(engine, mode="strict")
+    assert migrations.verify_schema(engine, mode="warn")["up_to_date"] is False
+    assert "expected" in caplog.text
+    assert migrations.verify_schema(engine, mode="off") == {}
+
+    # The result is cached per worker: migrating afterwards is not noticed
+    # until restart, and checking again does not touch the database.
+    migrations.bootstrap(engine)
+    hits = migrations.check_schema.cache_info().hits
+    assert migrations.verify_schema(engine, mode="warn")["up_to_date"] is False
+    assert migrations.check_schema.cache_info().hits == hits + 1
+    migrations.check_schema.cache_clear()
+    assert migrations.verify_schema(engine, mode="strict")["up_to_date"] is True
+
+
+def test_startup_report_times_first_request_only():
+    report = StartupReport()
+    with report.phase("startup"):
+        pass
+
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        return {"id": item_id}
+
+    app.add_middleware(FirstRequestMiddleware, report=report)
+    client = TestClient(app)
+    client.get("/items/1")
+    first_ms = report.as_dict()["phases_ms"]["first_request"]
+    client.get("/items/2")
+
+    result = report.as_dict()
+    assert result["first_request"] == "GET /items/1"
+    assert result["phases_ms"]["first_request"] == first_ms
+    assert set(result["phases_ms"]) == {"startup", "first_request"}
+    assert report.summary().startswith("Startup: startup ")
@@ -0,0 +1,180 @@
+"""
+Tests for incremental website verification against a local HTTP server.
+"""
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from aiohttp import web
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db import Base
+from models import School, WebsiteCheck
+from scripts import verify_websites
+
+
+SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///:memory:"
+engine = create_engine(
+    SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session(test_db):
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = TestingSessionLocal(bind=connection)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(verify_websites, "BACKOFF_BASE", 0.01)
+
+
+class FakeSite:
+    """Local server recording hits and the peak number of in-flight requests."""
+
+    def __init__(self):
+        self.hits = []
+        self.in_flight = 0
+        self.peak = 0
+        self.throttled = False
+
+    async def handle(self, request):
+        self.hits.append((request.method, request.path, request.headers.get("If-None-Match")))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.02)
+            if request.path == "/throttled" and not self.throttled:
+                self.throttled = True
+                return web.Response(status=429, headers={"Retry-After": "0"})
+            if request.path == "/head-not-allowed" and request.method == "HEAD":
+                return web.Response(status=405)
+            if request.path == "/gone":
+                return web.Response(status=404)
+            if request.headers.get("If-None-Match") == '"v1"':
+                return web.Response(status=304, headers={"ETag": '"v1"'})
+            return web.Response(text="ok", headers={"ETag": '"v1"'})
+        finally:
+            self.in_flight -= 1
+
+
+async def run_against_site(site, coro_factory):
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", site.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    tcp = web.TCPSite(runner, "127.0.0.1", 0)
+    await tcp.start()
+    port = tcp._server.sockets[0].getsockname()[1]
+    try:
+        return await coro_factory(f"http://127.0.0.1:{port}")
+    finally:
+        await runner.cleanup()
+
+
+def test_verification_records_results_and_skips_fresh(db_session):
+    site = FakeSite()
+
+    async def scenario(base):
+        schools = [
+            School(name="Reachable", website=f"{base}/home"),
+            School(name="Throttled", website=f"{base}/throttled"),
+            School(name="Head Rejected", website=f"{base}/head-not-allowed"),
+            School(name="Gone", website=f"{base}/gone"),
+            School(name="No Website"),
+        ]
+        db_session.add_all(schools)
+        db_session.commit()
+
+        first = await verify_websites.verify_stale_websites(
+            db_session, workers=4, per_host=1, batch_size=2
+        )
+        hits_after_first = len(site.hits)
+        second = await verify_websites.verify_stale_websites(db_session, workers=4)
+        assert len(site.hits) == hits_after_first
+        return schools, first, second
+
+    schools, first, second = asyncio.run(run_against_site(site, scenario))
+
+    assert first == {"checked": 5, "valid": 3, "fixed": 2, "errors": 0}
+    assert second["checked"] == 0
+    assert site.peak == 1  # per-host limit respected
+
+    checks = {c.school_id: c for c in db_session.query(WebsiteCheck)}
+    reachable, throttled, head_rejected, gone, missing = schools
+    assert checks[reachable.id].status_code == 200
+    assert checks[reachable.id].etag == '"v1"'
+    assert checks[reachable.id].final_url.endswith("/home")
+    assert checks[throttled.id].is_reachable  # retried after backoff
+    assert checks[head_rejected.id].status_code == 200
+    assert checks[gone.id].status_code == 404
+    assert not checks[gone.id].is_reachable
+
+    db_session.expire_all()
+    assert "google.com/search" in db_session.get(School, gone.id).website
+    assert "google.com/search" in db_session.get(School, missing.id).website
+
+
+def test_forced_recheck_sends_stored_etag(db_session):
+    site = FakeSite()
+
+    async def scenario(base):
+        school = School(name="Cached", website=f"{base}/page")
+        db_session.add(school)
+        db_session.commit()
+        await verify_websites.verify_stale_websites(db_session, workers=1)
+        await verify_websites.verify_stale_websites(db_session, stale_after=None)
+        return school
+
+    school = asyncio.run(run_against_site(site, scenario))
+
+    assert site.hits[-1] == ("HEAD", "/page", '"v1"')
+    check = db_session.query(WebsiteCheck).filter_by(school_id=school.id).one()
+    assert check.status_code == 304
+    assert check.is_reachable
+    assert check.etag == '"v1"'
+
+
+def test_changed_website_is_rechecked(db_session):
+    site = FakeSite()
+
+    async def scenario(base):
+        school = School(name="Moved", website=f"{base}/old")
+        db_session.add(school)
+        db_session.commit()
+        await verify_websites.verify_stale_websites(db_session)
+        school.website = f"{base}/new"
+        db_session.commit()
+        moved = await verify_websites.verify_stale_websites(
+            db_session, stale_after=timedelta(days=30)
+        )
+        assert site.hits[-1][1] == "/new"
+        school.website = None
+        db_session.commit()
+        cleared = await verify_websites.verify_stale_websites(
+            db_session, stale_after=timedelta(days=30)
+        )
+        return school, moved, cleared
+
+    school, moved, cleared = asyncio.run(run_against_site(site, scenario))
+
+    assert moved["checked"] == 1
+    assert cleared["checked"] == 1
+    db_session.expire_all()
+    assert "google.com/search" in db_session.get(School, school.id).website
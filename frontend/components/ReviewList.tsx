@@ -1,5 +1,5 @@
 import { useEffect, useState, useCallback } from 'react';
-import { reviewsAPI, Review } from '../lib/api';
+import { reviewsAPI, Review, ReviewSummary } from '../lib/api';
 
 interface ReviewListProps {
   schoolId: number;
@@ -7,14 +7,19 @@ interface ReviewListProps {
 
 export const ReviewList: React.FC<ReviewListProps> = ({ schoolId }) => {
   const [reviews, setReviews] = useState<Review[]>([]);
+  const [summary, setSummary] = useState<ReviewSummary | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
 
   const fetchReviews = useCallback(async () => {
     try {
       setLoading(true);
-      const data = await reviewsAPI.getForSchool(schoolId);
-      setReviews(data);
+      const data = await reviewsAPI.getForSchool(schoolId, { summary: true });
+      setReviews(data.results);
+      setSummary(data.summary || null);
+      setNextCursor(data.next_cursor);
     } catch (err) {
       console.error('Failed to fetch reviews:', err);
       setError('Failed to load reviews');
@@ -23,6 +28,20 @@ export const ReviewList: React.FC<ReviewListProps> = ({ schoolId }) => {
     }
   }, [schoolId]);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const data = await reviewsAPI.getForSchool(schoolId, { cursor: nextCursor });
+      setReviews((current) => [...current, ...data.results]);
+      setNextCursor(data.next_cursor);
+    } catch (err) {
+      console.error('Failed to fetch more reviews:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchReviews();
   }, [fetchReviews]);
@@ -64,8 +83,10 @@ export const ReviewList: React.FC<ReviewListProps> = ({ schoolId }) => {
     );
   }
 
-  const averageRating =
-    reviews.reduce((sum, review) => sum + review.rating, 0) / reviews.length;
+  const reviewCount = summary ? summary.count : reviews.length;
+  const averageRating = summary
+    ? summary.average_rating
+    : reviews.reduce((sum, review) => sum + review.rating, 0) / reviews.length;
 
   return (
     <div className="space-y-6">
@@ -80,7 +101,7 @@ export const ReviewList: React.FC<ReviewListProps> = ({ schoolId }) => {
           </div>
           <div>
             <p className="text-lg font-semibold text-gray-900">
-              {reviews.length} {reviews.length === 1 ? 'Review' : 'Reviews'}
+              {reviewCount} {reviewCount === 1 ? 'Review' : 'Reviews'}
             </p>
             <p className="text-gray-600">Average rating from users</p>
           </div>
@@ -110,6 +131,18 @@ export const ReviewList: React.FC<ReviewListProps> = ({ schoolId }) => {
           </div>
         ))}
       </div>
+
+      {nextCursor && (
+        <div className="text-center">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="px-4 py-2 border border-primary-600 text-primary-700 rounded-lg hover:bg-primary-50 disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Show more reviews'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
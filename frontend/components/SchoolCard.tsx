@@ -11,13 +11,18 @@ interface SchoolCardProps {
 
 export const SchoolCard: React.FC<SchoolCardProps> = ({ school }) => {
   const { user } = useAuth();
-  const [isFavorited, setIsFavorited] = useState(false);
+  const [isFavorited, setIsFavorited] = useState(school.is_favorited ?? false);
   const [loadingFav, setLoadingFav] = useState(false);
 
   useEffect(() => {
     let mounted = true;
     const check = async () => {
       if (!user) return;
+      // Lists fetched with a token already carry the status
+      if (school.is_favorited !== undefined) {
+        setIsFavorited(school.is_favorited);
+        return;
+      }
       try {
         const token = localStorage.getItem('access_token') || '';
         const fav = await favoritesAPI.check(school.id, token);
@@ -30,7 +35,7 @@ export const SchoolCard: React.FC<SchoolCardProps> = ({ school }) => {
     return () => {
       mounted = false;
     };
-  }, [user, school.id]);
+  }, [user, school.id, school.is_favorited]);
 
   const toggleFavorite = async (e: React.MouseEvent) => {
     e.preventDefault();
@@ -45,6 +45,7 @@ export interface School {
   facilities?: string[];
   photos?: string[];
   status?: string;
+  is_favorited?: boolean; // only on lists fetched with a token
 }
 
 export interface SchoolListResponse {
@@ -67,10 +68,14 @@ export interface SchoolFilters {
 // API functions
 export const schoolsAPI = {
   /**
-   * List schools with optional filters
+   * List schools with optional filters. With a token, each result
+   * includes is_favorited for the signed-in user.
    */
-  async list(filters?: SchoolFilters): Promise<SchoolListResponse> {
-    const response = await apiClient.get('/api/schools/', { params: filters });
+  async list(filters?: SchoolFilters, token?: string): Promise<SchoolListResponse> {
+    const response = await apiClient.get('/api/schools/', {
+      params: filters,
+      headers: token ? { Authorization: `Bearer ${token}` } : undefined,
+    });
     return response.data;
   },
 
@@ -128,6 +133,18 @@ export interface Review {
   updated_at?: string;
 }
 
+export interface ReviewSummary {
+  count: number;
+  average_rating: number;
+  histogram: number[]; // approved reviews per rating, 1 to 5 stars
+}
+
+export interface SchoolReviewPage {
+  results: Review[];
+  next_cursor: string | null;
+  summary?: ReviewSummary | null;
+}
+
 export interface ReviewCreate {
   school_id: number;
   rating: number;
@@ -147,10 +164,14 @@ export const reviewsAPI = {
   },
 
   /**
-   * Get approved reviews for a school (public)
+   * Get a page of approved reviews for a school (public).
+   * Pass the previous page's next_cursor to continue.
    */
-  async getForSchool(schoolId: number): Promise<Review[]> {
-    const response = await apiClient.get(`/api/reviews/school/${schoolId}`);
+  async getForSchool(
+    schoolId: number,
+    params: { cursor?: string; limit?: number; summary?: boolean } = {}
+  ): Promise<SchoolReviewPage> {
+    const response = await apiClient.get(`/api/reviews/school/${schoolId}`, { params });
     return response.data;
   },
 
@@ -174,6 +195,39 @@ export const reviewsAPI = {
     return response.data;
   },
 
+  /**
+   * Moderation queue page, newest first (admin only).
+   * Pass the previous page's next_cursor to continue.
+   */
+  async getModerationQueue(
+    token: string,
+    params: { status?: string; school_id?: number; limit?: number; cursor?: string } = {}
+  ): Promise<{ total: number; results: Review[]; next_cursor: string | null }> {
+    const response = await apiClient.get('/api/reviews/moderation', {
+      params,
+      headers: { Authorization: `Bearer ${token}` },
+    });
+    return response.data;
+  },
+
+  /**
+   * Set the status of many reviews at once (admin only)
+   */
+  async updateStatusBatch(
+    reviewIds: number[],
+    status: string,
+    token: string
+  ): Promise<{ requested: number | null; updated: number; schools: number }> {
+    const response = await apiClient.patch(
+      '/api/reviews/status',
+      { status, ids: reviewIds },
+      {
+        headers: { Authorization: `Bearer ${token}` },
+      }
+    );
+    return response.data;
+  },
+
   /**
    * Update review status (admin only)
    */
@@ -190,11 +244,23 @@ export const reviewsAPI = {
 };
 
 // Favorite Types
+export interface FavoriteSchool {
+  id: number;
+  name: string;
+  type?: string;
+  curriculum?: string;
+  address?: string;
+  photos?: string[];
+  average_rating?: number;
+  total_reviews?: number;
+}
+
 export interface Favorite {
   id: number;
   user_id: number;
   school_id: number;
   created_at: string;
+  school?: FavoriteSchool | null; // null if the school was removed
 }
 
 export interface FavoriteCreate {
@@ -2,14 +2,14 @@ import { useState, useEffect } from 'react';
 import Link from 'next/link';
 import { ProtectedRoute } from '../components/ProtectedRoute';
 import { useAuth } from '../contexts/AuthContext';
-import { reviewsAPI, favoritesAPI, schoolsAPI, Review, Favorite, School } from '../lib/api';
+import { reviewsAPI, favoritesAPI, Review, Favorite, FavoriteSchool } from '../lib/api';
 import { Button } from '../components/Button';
 
 export default function DashboardPage() {
   const { user, logout } = useAuth();
   const [reviews, setReviews] = useState<Review[]>([]);
   const [favorites, setFavorites] = useState<Favorite[]>([]);
-  const [favoriteSchools, setFavoriteSchools] = useState<School[]>([]);
+  const [favoriteSchools, setFavoriteSchools] = useState<FavoriteSchool[]>([]);
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState<'profile' | 'reviews' | 'favorites'>('profile');
 
@@ -34,14 +34,12 @@ export default function DashboardPage() {
       setReviews(reviewsData);
       setFavorites(favoritesData);
 
-      // Fetch school details for favorites
-      if (favoritesData.length > 0) {
-        const schoolPromises = favoritesData.map(fav =>
-          schoolsAPI.get(fav.school_id).catch(() => null)
-        );
-        const schools = await Promise.all(schoolPromises);
-        setFavoriteSchools(schools.filter((s): s is School => s !== null));
-      }
+      // Favorites come with a summary of each school (null if it was removed)
+      setFavoriteSchools(
+        favoritesData
+          .map((fav) => fav.school)
+          .filter((s): s is FavoriteSchool => !!s)
+      );
     } catch (err) {
       console.error('Failed to fetch user data:', err);
     } finally {
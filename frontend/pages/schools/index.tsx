@@ -36,7 +36,11 @@ export default function SchoolsPage() {
     try {
       setLoading(true);
       setError(null);
-      const response = await schoolsAPI.list(filters);
+      // With a token the list also says which schools the user has saved,
+      // so the cards don't each check their favorite status
+      const token =
+        (typeof window !== 'undefined' && localStorage.getItem('access_token')) || undefined;
+      const response = await schoolsAPI.list(filters, token);
       setData(response);
     } catch (err: any) {
       setError(err.message || 'Failed to load schools');
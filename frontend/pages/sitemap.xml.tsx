@@ -21,6 +21,18 @@ const candidateApiBases = () => {
   return list;
 };
 
+async function fetchTextFromCandidates(path: string) {
+  for (const base of candidateApiBases()) {
+    try {
+      const resp = await fetch(`${base.replace(/\/$/, '')}${path}`);
+      if (resp.ok) return resp.text();
+    } catch (e) {
+      console.warn(`sitemap: fetch failed for ${base}${path}`, e);
+    }
+  }
+  return null;
+}
+
 async function fetchJsonFromCandidates(path: string) {
   const candidates = candidateApiBases();
   for (const base of candidates) {
@@ -36,7 +48,26 @@ async function fetchJsonFromCandidates(path: string) {
   return null;
 }
 
+// The sitemap protocol requires absolute <loc>s; older backends without
+// SITE_URL return site-relative ones.
+const hasOnlyAbsoluteLocs = (xml: string) => {
+  const locs = xml.match(/<loc>[^<]*<\/loc>/g) || [];
+  return locs.length > 0 && locs.every(loc => /^<loc>https?:\/\//.test(loc));
+};
+
 export const getServerSideProps: GetServerSideProps = async ({ res }) => {
+  // The backend renders and caches the sitemap (invalidated when posts or
+  // schools change); building it here is the fallback for older backends
+  // and for backends without SITE_URL.
+  const cached = await fetchTextFromCandidates('/api/sitemap.xml');
+  if (cached && hasOnlyAbsoluteLocs(cached)) {
+    res.setHeader('Content-Type', 'application/xml');
+    res.setHeader('Cache-Control', 'public, max-age=300');
+    res.write(cached);
+    res.end();
+    return { props: {} };
+  }
+
   const siteBase = process.env.NEXT_PUBLIC_BASE_URL || '';
 
   if (!siteBase) {